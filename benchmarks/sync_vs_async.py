@@ -0,0 +1,97 @@
+"""
+Throughput benchmark of the sync and async page objects on the same flow.
+
+The flow opens a fresh context, searches the product listing, reads the
+results and opens the cart. The sync path runs the flows one after another
+(like a single pytest worker); the async path runs them concurrently from
+one process with ``asyncio.gather``.
+
+Usage:
+    python -m benchmarks.sync_vs_async --flows 20 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+
+def parse_args():
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flows", type=int, default=20, help="number of flows per path")
+    parser.add_argument("--concurrency", type=int, default=10, help="concurrent flows on the async path")
+    parser.add_argument("--search", default="Laptop", help="search term used by the flow")
+    parser.add_argument("--base-url", help="application URL (defaults to BASE_URL)")
+    parser.add_argument("--browser", default="chromium", help="browser to launch")
+    return parser.parse_args()
+
+
+def run_sync(args) -> float:
+    """Run the flows serially with the sync page objects and return the wall time."""
+    from playwright.sync_api import sync_playwright
+    from pages.cart_page import CartPage
+    from pages.product_page import ProductPage
+
+    with sync_playwright() as playwright:
+        browser = getattr(playwright, args.browser).launch(headless=True)
+        started = time.perf_counter()
+        for _ in range(args.flows):
+            context = browser.new_context()
+            page = context.new_page()
+            product_page = ProductPage(page)
+            product_page.navigate()
+            product_page.search_product(args.search)
+            product_page.get_products()
+            CartPage(page).navigate()
+            context.close()
+        elapsed = time.perf_counter() - started
+        browser.close()
+    return elapsed
+
+
+async def run_async(args) -> float:
+    """Run the flows concurrently with the async page objects and return the wall time."""
+    from playwright.async_api import async_playwright
+    from pages.aio import AsyncCartPage, AsyncProductPage
+
+    async with async_playwright() as playwright:
+        browser = await getattr(playwright, args.browser).launch(headless=True)
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def flow():
+            async with semaphore:
+                context = await browser.new_context()
+                page = await context.new_page()
+                product_page = AsyncProductPage(page)
+                await product_page.navigate()
+                await product_page.search_product(args.search)
+                await product_page.get_products()
+                await AsyncCartPage(page).navigate()
+                await context.close()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(flow() for _ in range(args.flows)))
+        elapsed = time.perf_counter() - started
+        await browser.close()
+    return elapsed
+
+
+def main():
+    """Run both paths and print their throughput."""
+    args = parse_args()
+    if args.base_url:
+        # Page objects read BASE_URL when they are created
+        os.environ["BASE_URL"] = args.base_url
+
+    sync_seconds = run_sync(args)
+    async_seconds = asyncio.run(run_async(args))
+
+    print(f"{'path':<8}{'flows':>8}{'seconds':>10}{'flows/s':>10}")
+    for name, seconds in (("sync", sync_seconds), ("async", async_seconds)):
+        print(f"{name:<8}{args.flows:>8}{seconds:>10.2f}{args.flows / seconds:>10.2f}")
+    print(f"async speedup: {sync_seconds / async_seconds:.2f}x (concurrency {args.concurrency})")
+
+
+if __name__ == "__main__":
+    main()
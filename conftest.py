@@ -3,18 +3,147 @@ Pytest configuration and fixtures for Playwright tests.
 """
 
 import pytest
-from playwright.sync_api import sync_playwright, Page, Browser
+import time
+from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext
+from fake_app import FakeApp
+from pages.base_page import get_base_url
 from pages.login_page import LoginPage
 from pages.product_page import ProductPage
 from pages.cart_page import CartPage
 from pages.checkout_page import CheckoutPage
+from utils import browser_servers, checkpoints, flight_recorder, handle_leaks, impact, result_cache, network_replay, resource_policy, scheduling, session_stats, start_state_pool, state_reset
+from utils.app_build import get_build
+from utils.async_runner import AsyncRunner
+from utils.auth_state import AuthStateCache, load_personas
+from utils.browser_pool import BrowserPool, format_summary
+from utils import browser_daemon
+from utils.browser_servers import LocalBrowserServer, RemoteBrowserPool
+from utils.cart_seeding import CartSeeder, load_product_titles
+from utils.checkpoints import CheckpointCache
+from utils.flight_recorder import FlightRecorder
+from utils.result_cache import ResultCache
+from utils.network_replay import MODES, SCOPES, HarRecorder, HarReplayer
+from utils.resource_policy import ResourcePolicy, block, learn_sizes, stub
+from utils.scheduling import DurationStore, LptScheduling, marker_factor, write_marker_factors
+from utils.start_state_pool import StartStatePool
+from utils.state_reset import STRATEGIES, clear_context_state, origin_of
+from pages import instrumentation, readiness, web_vitals
+from pages.start_states import START_STATES
+from pages.aio.base_page import AsyncBasePage
+from pages.base_page import BasePage, add_navigation_hook, remove_navigation_hook
+from pages.web_vitals import INIT_SCRIPT, Budget, WebVitalsCollector
 import os
+import shutil
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-BASE_URL = os.getenv("BASE_URL", "https://demo.ecommerce.local")
+# Serve the bundled fake storefront instead of BASE_URL (also --fake-app)
+FAKE_APP = os.getenv("FAKE_APP", "false").lower() == "true"
+BROWSER_NAME = os.getenv("BROWSER", "chromium")
+HEADLESS = os.getenv("HEADLESS", "true").lower() != "false"
+# Recycle the worker's browser after this many contexts (0 = never)
+BROWSER_MAX_CONTEXTS = int(os.getenv("BROWSER_MAX_CONTEXTS", "200"))
+# Recycle the worker's browser once its processes use this much memory (0 = never)
+BROWSER_MAX_RSS_MB = int(os.getenv("BROWSER_MAX_RSS_MB", "1500"))
+# Connect to Playwright browser servers instead of launching a browser: comma-separated
+# ws:// endpoints, or "local:N" to start N servers on this machine; also --browser-servers
+BROWSER_SERVERS = os.getenv("BROWSER_SERVERS", "")
+# Use the warm browser of a daemon kept between runs (python -m utils.browser_daemon):
+# "auto" when one is running, "start" to start one if not, or "off"; also --browser-daemon
+BROWSER_DAEMON = os.getenv("BROWSER_DAEMON", "auto")
+BROWSER_DAEMON_IDLE_TIMEOUT = int(os.getenv("BROWSER_DAEMON_IDLE_TIMEOUT", str(browser_daemon.DEFAULT_IDLE_TIMEOUT)))
+# Saved login states are reused for this many seconds
+AUTH_STATE_TTL = int(os.getenv("AUTH_STATE_TTL", "1800"))
+# Page that bounces to /login once a saved session stops working
+AUTH_PROBE_PATH = os.getenv("AUTH_PROBE_PATH", "/dashboard")
+# How state is reset between tests: "context", "storage" or "navigate"
+RESET_STRATEGY = os.getenv("RESET_STRATEGY", "context")
+# How cart_with_items builds carts: "ui" (the product pages), "api" (needs CART_API_PATH,
+# falls back to the product pages on a 404) or "storage"
+CART_SEED_MODE = os.getenv("CART_SEED_MODE", "ui")
+CART_API_PATH = os.getenv("CART_API_PATH", "/api/cart/items")
+CART_STORAGE_KEY = os.getenv("CART_STORAGE_KEY", "cart")
+# Network traffic: "live", "record" (to HAR files) or "replay" (from them); also --network-mode
+NETWORK_MODE = os.getenv("NETWORK_MODE", "live")
+# One HAR per test "module" or per "route"; also --har-scope
+HAR_SCOPE = os.getenv("HAR_SCOPE", "module")
+HAR_DIR = os.getenv("HAR_DIR", os.path.join(os.path.dirname(__file__), "har"))
+# Block resources no test looks at: "on" or "off"; also --resource-policy
+RESOURCE_POLICY = os.getenv("RESOURCE_POLICY", "on")
+# Global resource rules; page objects add their own in front (RESOURCE_POLICY)
+RESOURCE_RULES = (
+    stub("script", url="*googletagmanager.com/*"),
+    stub("script", url="*google-analytics.com/*"),
+    block(url="*doubleclick.net/*"),
+    block(url="*facebook.net/*"),
+    block(url="*hotjar.com/*"),
+    block("font", "media"),
+)
+RESOURCE_SIZES_CACHE_KEY = "resource_policy/sizes"
+# Time every page object method (also --instrument); costs nothing when off
+INSTRUMENT = os.getenv("INSTRUMENT", "false").lower() == "true"
+INSTRUMENT_JSON = os.getenv("INSTRUMENT_JSON", os.path.join("reports", "instrumentation.json"))
+# Collect web vitals after every navigate() (also --web-vitals)
+WEB_VITALS = os.getenv("WEB_VITALS", "false").lower() == "true"
+WEB_VITALS_DIR = os.getenv("WEB_VITALS_DIR", os.path.join("reports", "web-vitals"))
+# Per-route web vitals budgets ("*" applies to every route)
+WEB_VITALS_BUDGETS = {
+    "*": (
+        Budget("ttfb", warn=800, fail=1800),
+        Budget("lcp", warn=2500, fail=4000),
+        Budget("cls", warn=0.1, fail=0.25),
+    ),
+    "/products": (Budget("transfer", warn=2_000_000),),
+    "/checkout": (Budget("lcp", warn=2000),),
+}
+# Keep recent events in memory and write them only when a test fails; off by default, since it
+# wraps every page object call: "off", "actions", "network" or "dom" (see utils/flight_recorder.py);
+# also --flight-recorder
+FLIGHT_RECORDER = os.getenv("FLIGHT_RECORDER", "off")
+# Memory cap of each test's recording
+FLIGHT_RECORDER_MAX_KB = int(os.getenv("FLIGHT_RECORDER_MAX_KB", "1024"))
+FLIGHT_RECORDER_DIR = os.getenv("FLIGHT_RECORDER_DIR", os.path.join("reports", "failures"))
+# Count the JS handles a test leaves alive on its page: "report", "fail" or "off" (also --handle-leaks)
+HANDLE_LEAKS = os.getenv("HANDLE_LEAKS", "report")
+# Record which page object methods and locators each test uses (also --record-impact)
+IMPACT_RECORD = os.getenv("IMPACT_RECORD", "false").lower() == "true"
+IMPACT_INDEX = os.getenv("IMPACT_INDEX", os.path.join(os.path.dirname(__file__), ".impact", "index.json"))
+# Run every test even if it passed before and nothing it depends on changed (also --force-run)
+FORCE_RUN = os.getenv("FORCE_RUN", "false").lower() == "true"
+# Cached passes are reused for this many seconds
+RESULT_CACHE_MAX_AGE = int(os.getenv("RESULT_CACHE_MAX_AGE", "86400"))
+# Keep a warm page parked per start_state marker and reset it between tests (also --start-states)
+START_STATE_REUSE = os.getenv("START_STATE_REUSE", "false").lower() == "true"
+# Restore multi-step start states from checkpoints saved on disk: "on" or "off"; also --checkpoints
+CHECKPOINTS = os.getenv("CHECKPOINTS", "on")
+# Saved checkpoints are reused for this many seconds
+CHECKPOINT_TTL = int(os.getenv("CHECKPOINT_TTL", "1800"))
+CHECKPOINT_DIR = os.path.join(os.path.dirname(__file__), ".checkpoints")
+# How xdist hands out tests: "lpt" (longest first, from recorded durations) or "xdist"; also --schedule
+TEST_SCHEDULE = os.getenv("TEST_SCHEDULE", "lpt")
+AUTH_STATE_DIR = os.path.join(os.path.dirname(__file__), ".auth")
+PERSONAS = load_personas(os.path.join(os.path.dirname(__file__), "fixtures", "test_users.json"))
+# Product titles by SKU, to find the products of a seeded cart on the product pages
+PRODUCT_TITLES = load_product_titles(os.path.join(os.path.dirname(__file__), "fixtures", "test_products.json"))
+
+# Reports of a test's setup, call and teardown phases, so fixtures can tell whether it failed
+PHASE_REPORTS = pytest.StashKey[dict]()
+
+# Result key of a test (see utils/result_cache.py), and whether it is skipped as a cached pass
+RESULT_KEY = pytest.StashKey[str]()
+CACHED_PASS = pytest.StashKey[bool]()
+
+# Durations of this run's tests, kept by the controller (pytest_runtest_logreport has no config)
+_duration_store = None
+
+
+@pytest.fixture(scope="session")
+def base_url() -> str:
+    """Provide the URL of the application under test."""
+    return get_base_url()
 
 
 @pytest.fixture(scope="session")
@@ -27,28 +156,327 @@ def browser_context_args():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def playwright_instance():
-    """Provide a Playwright instance."""
+    """Provide a Playwright instance shared by all tests in this worker."""
+    started = time.perf_counter()
     playwright = sync_playwright().start()
+    session_stats.add("browser_pool", "driver_starts")
+    session_stats.add("browser_pool", "driver_start_seconds", time.perf_counter() - started)
     yield playwright
     playwright.stop()
 
 
+@pytest.fixture(scope="session")
+def browser_pool(request, playwright_instance) -> BrowserPool:
+    """Provide the worker's browser pool, or its pool of browser servers (see --browser-servers)."""
+    endpoints = getattr(request.config, "browser_server_endpoints", [])
+    if endpoints:
+        pool = RemoteBrowserPool(playwright_instance, endpoints, browser_name=BROWSER_NAME)
+    else:
+        pool = BrowserPool(
+            playwright_instance,
+            browser_name=BROWSER_NAME,
+            launch_options={"headless": HEADLESS},
+            max_contexts=BROWSER_MAX_CONTEXTS,
+            max_rss_mb=BROWSER_MAX_RSS_MB,
+        )
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def browser(browser_pool: BrowserPool) -> Browser:
+    """Provide the worker's current Playwright browser instance."""
+    return browser_pool.browser
+
+
+def reset_strategy(request) -> str:
+    """Get the state reset strategy for a test (see utils/state_reset.py)."""
+    marker = request.node.get_closest_marker("reset")
+    strategy = marker.args[0] if marker else RESET_STRATEGY
+    if strategy not in STRATEGIES:
+        raise pytest.UsageError(f"Unknown reset strategy {strategy!r}, expected one of {STRATEGIES}")
+    return strategy
+
+
+def start_state(request):
+    """Get the start state a test declares with @pytest.mark.start_state, if any."""
+    marker = request.node.get_closest_marker("start_state")
+    if marker is None:
+        return None
+    if marker.args[0] not in START_STATES:
+        raise pytest.UsageError(
+            f"Unknown start state {marker.args[0]!r}, expected one of {tuple(START_STATES)}"
+        )
+    return START_STATES[marker.args[0]]
+
+
+def parks_start_state(request) -> bool:
+    """Check whether a test gets its start state from a parked page."""
+    return (
+        request.config.getoption("start_states")
+        and start_state(request) is not None
+        and request.config.getoption("network_mode") == "live"
+        and not request.node.get_closest_marker("allow_resources")
+        # Logins and seeded carts change the context the state was parked in
+        and not {"login_as", "cart_with_items"} & set(request.fixturenames)
+    )
+
+
+@pytest.fixture(scope="session")
+def checkpoint_cache(base_url: str) -> CheckpointCache:
+    """Provide the saved checkpoints of start states, for the build of the app under test."""
+    return CheckpointCache(CHECKPOINT_DIR, get_build(base_url), ttl_seconds=CHECKPOINT_TTL)
+
+
+def enter_start_state(request, page: Page, state) -> None:
+    """Bring the page of a new context into a start state, from a checkpoint when the state has one."""
+    if state.checkpoint and request.config.getoption("checkpoints") == "on":
+        request.getfixturevalue("checkpoint_cache").enter(page, state)
+    else:
+        state.setup(page)
+
+
+@pytest.fixture(scope="session")
+def network(request):
+    """Provide the HAR recorder or replayer, or None when the network is live."""
+    mode = request.config.getoption("network_mode")
+    scope = request.config.getoption("har_scope")
+    if mode == "record":
+        network = HarRecorder(HAR_DIR, scope)
+    elif mode == "replay":
+        network = HarReplayer(HAR_DIR, scope)
+    else:
+        network = None
+    yield network
+    if network is not None:
+        network.close()
+
+
 @pytest.fixture
-def browser(playwright_instance):
-    """Provide a Playwright browser instance."""
-    browser = playwright_instance.chromium.launch(headless=True)
-    yield browser
-    browser.close()
+def context(request, browser_pool: BrowserPool, browser_context_args, base_url: str, network) -> BrowserContext:
+    """Provide a clean browser context for each test."""
+    # Logins, seeded carts and restored checkpoints install init scripts,
+    # which would outlive a reused context
+    state = start_state(request)
+    installs_scripts = bool({"login_as", "cart_with_items"} & set(request.fixturenames)) or (
+        state is not None and state.checkpoint
+    )
+    if parks_start_state(request):
+        # Parked contexts outlive the test; the start state pool closes them
+        yield request.getfixturevalue("parked_start_states").context(state)
+    elif network is not None:
+        # Traffic is recorded and replayed per context, so each test needs its own
+        test_id = request.node.nodeid
+        owner = request.node.module.__name__.rsplit(".", 1)[-1]
+        context = browser_pool.new_context(**browser_context_args, **network.context_args(test_id))
+        network.attach(context, test_id, owner)
+        yield context
+        context.close()
+        network.finish(test_id, owner)
+    elif reset_strategy(request) == "storage" and not installs_scripts:
+        context = browser_pool.shared_context(**browser_context_args)
+        yield context
+        clear_context_state(context, [origin_of(base_url)])
+        for open_page in context.pages:
+            open_page.close()
+    else:
+        context = browser_pool.new_context(**browser_context_args)
+        yield context
+        context.close()
+
+
+@pytest.fixture(scope="session")
+def resource_sizes(request) -> dict:
+    """Provide the response sizes seen in earlier runs, to estimate what blocking saves."""
+    cache = getattr(request.config, "cache", None)
+    return cache.get(RESOURCE_SIZES_CACHE_KEY, {}) if cache is not None else {}
+
+
+def prepare_page(request, page: Page, resource_sizes: dict, stats_key: str, allow_resources: bool = False) -> None:
+    """Install the resource policy (or learn resource sizes) and the web vitals script on a new page."""
+    if request.config.getoption("resource_policy") == "on" and not allow_resources:
+        avoided = ResourcePolicy(RESOURCE_RULES, resource_sizes).install(page)
+        session_stats.section("resources").setdefault("tests", {})[stats_key] = avoided
+    else:
+        learned = {}
+        learn_sizes(page, learned)
+        # A list, so sizes from several workers are not added up when merged
+        request.addfinalizer(
+            lambda: session_stats.section("resources").setdefault("sizes", []).extend(learned.items())
+        )
+    if request.config.getoption("web_vitals"):
+        page.add_init_script(INIT_SCRIPT)
+
+
+async def prepare_async_context(request, context, resource_sizes: dict, stats_key: str) -> None:
+    """Set up a context of the async runner the way prepare_page sets up a sync page."""
+    if request.config.getoption("resource_policy") == "on":
+        handle, avoided = ResourcePolicy(RESOURCE_RULES, resource_sizes).handler()
+        await context.route("**/*", handle)
+        session_stats.section("resources").setdefault("tests", {})[stats_key] = avoided
+    else:
+        learned = {}
+        learn_sizes(context, learned)
+        request.addfinalizer(
+            lambda: session_stats.section("resources").setdefault("sizes", []).extend(learned.items())
+        )
+    if request.config.getoption("web_vitals"):
+        await context.add_init_script(INIT_SCRIPT)
+
+
+@pytest.fixture(scope="session")
+def parked_start_states(
+    request, browser_pool: BrowserPool, browser_context_args, resource_sizes: dict
+) -> StartStatePool:
+    """Provide the worker's pages parked in start states (see --start-states)."""
+    pool = StartStatePool(
+        browser_pool,
+        browser_context_args,
+        prepare=lambda page, name: prepare_page(request, page, resource_sizes, f"start_state[{name}]"),
+        setup=lambda page, state: enter_start_state(request, page, state),
+    )
+    yield pool
+    pool.close()
 
 
 @pytest.fixture
-def page(browser):
-    """Provide a browser page for each test."""
-    page = browser.new_page()
+def page(request, context: BrowserContext, browser_pool: BrowserPool, resource_sizes: dict):
+    """Provide a browser page for each test, in its start state if it declares one."""
+    state = start_state(request)
+    parked = parks_start_state(request)
+    if parked:
+        page = request.getfixturevalue("parked_start_states").checkout(state)
+    else:
+        page = context.new_page()
+        prepare_page(
+            request,
+            page,
+            resource_sizes,
+            request.node.nodeid,
+            allow_resources=request.node.get_closest_marker("allow_resources") is not None,
+        )
+    collector = None
+    if request.config.getoption("web_vitals"):
+        collector = WebVitalsCollector(request.node.nodeid, WEB_VITALS_BUDGETS)
+        add_navigation_hook(collector)
+    recorder = None
+    if request.config.getoption("flight_recorder") != "off":
+        recorder = FlightRecorder(
+            request.node.nodeid, request.config.getoption("flight_recorder"), FLIGHT_RECORDER_MAX_KB * 1024
+        )
+        recorder.start(page)
+    if state is not None:
+        # Start states are module code of pages/start_states.py
+        impact.depend(f"pages.start_states:{impact.MODULE_CODE}")
+    if state is not None and not parked:
+        try:
+            enter_start_state(request, page, state)
+        except Exception:
+            if recorder is not None:
+                recorder.stop()
+                recorder.dump(FLIGHT_RECORDER_DIR, "setup failed")
+            raise
+    leak_check = request.config.getoption("handle_leaks")
+    live_handles = handle_leaks.count_live_handles(page) if leak_check != "off" else 0
     yield page
-    page.close()
+    if collector is not None:
+        remove_navigation_hook(collector)
+    if recorder is not None:
+        recorder.stop()
+        if any(report.failed for report in request.node.stash.get(PHASE_REPORTS, {}).values()):
+            recorder.dump(FLIGHT_RECORDER_DIR, "failed")
+    leaked = handle_leaks.check(page, request.node.nodeid, live_handles) if leak_check != "off" else 0
+    # Parked pages stay open for the next test; pages of a reused context are
+    # needed to clear its storage, and the context fixture closes them
+    if not parked and not browser_pool.is_shared(context):
+        page.close()
+    failures = []
+    if collector is not None:
+        failures.extend(f"web vitals budget: {violation}" for violation in collector.violations)
+    if leaked and leak_check == "fail":
+        failures.append(f"{leaked} JS handles left alive; use Locators instead of ElementHandles")
+    if failures:
+        pytest.fail("\n".join(failures), pytrace=False)
+
+
+@pytest.fixture(scope="module")
+def validation_results(request, browser_pool: BrowserPool, browser_context_args, resource_sizes: dict, network):
+    """Provide a function that runs a form's validation cases on one page load, once per module.
+
+    ``validation_results(start_state, cases)`` brings a page into the start
+    state and submits its page object's form once per case (see
+    BasePage.run_validation_cases), so each case can be its own test.
+    """
+    results = {}
+
+    def _validation_results(state_name: str, cases: dict) -> dict:
+        key = (state_name, tuple(cases))
+        if key not in results:
+            state = START_STATES[state_name]
+            test_id = f"{request.module.__name__}::validation[{state_name}]"
+            owner = request.module.__name__.rsplit(".", 1)[-1]
+            context_args = network.context_args(test_id) if network is not None else {}
+            context = browser_pool.new_context(**browser_context_args, **context_args)
+            if network is not None:
+                network.attach(context, test_id, owner)
+            try:
+                page = context.new_page()
+                prepare_page(request, page, resource_sizes, test_id)
+                enter_start_state(request, page, state)
+                results[key] = state.page_class(page).run_validation_cases(cases)
+            finally:
+                context.close()
+                if network is not None:
+                    network.finish(test_id, owner)
+            session_stats.add("validation", "page_loads")
+            session_stats.add("validation", "cases", len(cases))
+        return results[key]
+
+    return _validation_results
+
+
+@pytest.fixture(scope="session")
+def aio_runner(request, browser_context_args) -> AsyncRunner:
+    """Provide the worker's async Playwright browser on its own event loop thread."""
+    runner = AsyncRunner(
+        browser_name=BROWSER_NAME,
+        launch_options={"headless": HEADLESS},
+        context_args=browser_context_args,
+        endpoints=getattr(request.config, "browser_server_endpoints", []),
+    )
+    yield runner
+    runner.close()
+
+
+@pytest.fixture
+def aio(request, aio_runner: AsyncRunner, resource_sizes: dict) -> AsyncRunner:
+    """Provide the async runner; contexts created by the test are prepared like sync ones and closed afterwards."""
+    # Recording and replaying traffic, and the flight recorder, hook into sync contexts only
+    network_mode = request.config.getoption("network_mode")
+    if network_mode != "live":
+        pytest.skip(f"async contexts are not recorded or replayed (--network-mode {network_mode})")
+    if request.config.getoption("flight_recorder") != "off":
+        pytest.skip("the flight recorder does not watch async contexts (--flight-recorder)")
+
+    async def prepare(context):
+        await prepare_async_context(request, context, resource_sizes, request.node.nodeid)
+
+    aio_runner.prepare_context = prepare
+    collector = None
+    if request.config.getoption("web_vitals"):
+        collector = WebVitalsCollector(request.node.nodeid, WEB_VITALS_BUDGETS)
+        add_navigation_hook(collector)
+    yield aio_runner
+    if collector is not None:
+        remove_navigation_hook(collector)
+    aio_runner.run(aio_runner.close_contexts())
+    aio_runner.prepare_context = None
+    if collector is not None and collector.violations:
+        pytest.fail(
+            "\n".join(f"web vitals budget: {violation}" for violation in collector.violations), pytrace=False
+        )
 
 
 @pytest.fixture
@@ -75,26 +503,623 @@ def checkout_page(page: Page) -> CheckoutPage:
     return CheckoutPage(page)
 
 
+@pytest.fixture(scope="session")
+def auth_cache(browser_pool: BrowserPool, browser_context_args, base_url: str) -> AuthStateCache:
+    """Provide the login-state cache shared by all workers."""
+
+    def login(email: str, password: str) -> BrowserContext:
+        context = browser_pool.new_context(**browser_context_args)
+        login_page = LoginPage(context.new_page())
+        login_page.navigate()
+        login_page.login(email, password)
+        if login_page.get_url().rstrip("/").endswith("/login"):
+            context.close()
+            raise RuntimeError(f"Could not log in as {email}: {login_page.get_error_message()}")
+        return context
+
+    return AuthStateCache(
+        AUTH_STATE_DIR,
+        login,
+        ttl_seconds=AUTH_STATE_TTL,
+        probe_url=f"{base_url}{AUTH_PROBE_PATH}",
+    )
+
+
 @pytest.fixture
-def authenticated_page(page: Page, login_page: LoginPage) -> Page:
+def login_as(page: Page, auth_cache: AuthStateCache, network):
+    """Provide a function that logs the test's page in as a persona."""
+
+    def _login_as(persona: str = "default") -> Page:
+        if isinstance(network, HarReplayer):
+            # The recorded pages already show the logged-in user
+            return page
+        credentials = PERSONAS[persona]
+        auth_cache.apply(page.context, credentials["email"], credentials["password"])
+        return page
+
+    return _login_as
+
+
+@pytest.fixture
+def authenticated_page(login_as) -> Page:
     """Provide an authenticated page (user already logged in)."""
-    login_page.navigate()
-    login_page.login("testuser@example.com", "TestPassword123!")
-    return page
+    return login_as("default")
+
+
+@pytest.fixture
+def cart_with_items(context: BrowserContext, product_page: ProductPage, cart_page: CartPage, base_url: str, network):
+    """Provide a function that builds a cart and opens it.
+
+    Items are SKUs, (SKU, quantity) pairs or {"sku", "quantity"} dicts.
+    Seeded through the API or localStorage, the cart page is the only page
+    loaded.
+    """
+
+    def add_through_ui(sku: str, quantity: int) -> None:
+        for _ in range(quantity):
+            product_page.navigate()
+            product_page.search_product(PRODUCT_TITLES.get(sku, sku))
+            if not product_page.get_product_count():
+                raise RuntimeError(f"Seeding {sku}: no product found on the product pages")
+            product_page.add_first_product_to_cart()
+
+    def _cart_with_items(*items) -> CartPage:
+        seeder = CartSeeder(
+            context,
+            base_url,
+            mode=CART_SEED_MODE,
+            api_path=CART_API_PATH,
+            storage_key=CART_STORAGE_KEY,
+            add_through_ui=add_through_ui,
+        )
+        if not isinstance(network, HarReplayer):
+            # Replayed cart pages already show the items seeded while recording
+            seeder.seed(items)
+        cart_page.navigate()
+        return cart_page
+
+    return _cart_with_items
 
 
 @pytest.fixture(autouse=True)
-def reset_app(page: Page):
+def reset_app(request):
     """Reset application state before each test."""
-    # Navigate to home page to ensure clean state
-    page.goto(BASE_URL, wait_until="networkidle")
+    if "page" in request.fixturenames:
+        if reset_strategy(request) == "navigate" and start_state(request) is None:
+            # Navigate to home page to ensure clean state
+            request.getfixturevalue("page").goto(
+                request.getfixturevalue("base_url"), wait_until="domcontentloaded"
+            )
+        else:
+            # The context fixture already handed out a clean context, or the
+            # page fixture brings the page into the test's start state
+            state_reset.navigation_avoided()
     yield
-    # Cleanup after test (optional)
+
+
+def pytest_addoption(parser):
+    """Add command line options."""
+    parser.addoption(
+        "--fake-app",
+        action="store_true",
+        default=FAKE_APP,
+        help="run against the bundled fake storefront instead of BASE_URL",
+    )
+    parser.addoption(
+        "--browser-servers",
+        default=BROWSER_SERVERS,
+        help='comma-separated ws:// endpoints of Playwright browser servers, or "local:N" to start N here',
+    )
+    parser.addoption(
+        "--browser-daemon",
+        choices=("auto", "start", "off"),
+        default=BROWSER_DAEMON,
+        help="connect to a warm browser daemon if one runs (auto), start one if not (start), or never",
+    )
+    parser.addoption(
+        "--network-mode",
+        choices=MODES,
+        default=NETWORK_MODE,
+        help="live traffic, record it to HAR files, or replay it from them",
+    )
+    parser.addoption(
+        "--instrument",
+        action="store_true",
+        default=INSTRUMENT,
+        help="time every page object method per test and report the slowest steps",
+    )
+    parser.addoption(
+        "--instrument-json",
+        default=INSTRUMENT_JSON,
+        help="where --instrument writes the timings",
+    )
+    parser.addoption(
+        "--web-vitals",
+        action="store_true",
+        default=WEB_VITALS,
+        help="collect web vitals after every navigate() and check them against budgets",
+    )
+    parser.addoption(
+        "--flight-recorder",
+        choices=("off", *flight_recorder.DETAILS),
+        default=FLIGHT_RECORDER,
+        help="keep recent actions, network events or DOM snapshots in memory and write them when a test fails",
+    )
+    parser.addoption(
+        "--handle-leaks",
+        choices=handle_leaks.MODES,
+        default=HANDLE_LEAKS,
+        help="count the JS handles each test leaves alive on its page, and report or fail those tests",
+    )
+    parser.addoption(
+        "--force-run",
+        action="store_true",
+        default=FORCE_RUN,
+        help="run every test, even unchanged ones that passed on the same app build",
+    )
+    parser.addoption(
+        "--record-impact",
+        action="store_true",
+        default=IMPACT_RECORD,
+        help="record the page object methods and locators each test uses into the impact index",
+    )
+    parser.addoption(
+        "--affected-since",
+        metavar="GIT_REV",
+        help="only run tests whose page objects, locators or test code changed since a git revision",
+    )
+    parser.addoption(
+        "--resource-policy",
+        choices=("on", "off"),
+        default=RESOURCE_POLICY,
+        help="block resources no test looks at (off also learns their sizes)",
+    )
+    parser.addoption(
+        "--start-states",
+        action="store_true",
+        default=START_STATE_REUSE,
+        help="run tests of the same start_state together on a warm page reset between them",
+    )
+    parser.addoption(
+        "--checkpoints",
+        choices=("on", "off"),
+        default=CHECKPOINTS,
+        help="restore multi-step start states from checkpoints saved on disk",
+    )
+    parser.addoption(
+        "--schedule",
+        choices=("lpt", "xdist"),
+        default=TEST_SCHEDULE,
+        help="with -n, hand out the longest tests first (lpt) or use xdist's own --dist",
+    )
+    parser.addoption(
+        "--har-scope",
+        choices=SCOPES,
+        default=HAR_SCOPE,
+        help="write one HAR per test module or per route (first URL path segment)",
+    )
 
 
 def pytest_configure(config):
-    """Configure pytest with custom markers."""
+    """Configure pytest with custom markers and start the fake storefront."""
     config.addinivalue_line("markers", "smoke: Smoke tests for critical paths")
     config.addinivalue_line("markers", "regression: Full regression test suite")
     config.addinivalue_line("markers", "ui: UI-specific tests")
     config.addinivalue_line("markers", "slow: Tests that take longer to execute")
+    config.addinivalue_line(
+        "markers", "reset(strategy): State reset strategy: context, storage or navigate"
+    )
+    config.addinivalue_line(
+        "markers", "allow_resources: Load every resource (e.g. for visual tests)"
+    )
+    config.addinivalue_line(
+        "markers", "start_state(name): Start the test in a named state (see pages/start_states.py)"
+    )
+
+    # All three listen through one method wrapper (utils/method_hooks.py); the timings
+    # come last, so they sit closest to the methods and leave out the other listeners
+    if config.getoption("flight_recorder") != "off":
+        flight_recorder.record_actions(BasePage, AsyncBasePage)
+    if config.getoption("record_impact"):
+        impact.record_dependencies(BasePage, AsyncBasePage)
+    if config.getoption("instrument"):
+        instrumentation.instrument(BasePage, AsyncBasePage)
+
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is not None:
+        # xdist workers use the controller's fake storefront and browser servers
+        if workerinput.get("fake_app_url"):
+            os.environ["BASE_URL"] = workerinput["fake_app_url"]
+        config.browser_server_endpoints = workerinput.get("browser_server_endpoints", [])
+        config.impact_changes = workerinput.get("impact_changes")
+        return
+    if config.getoption("fake_app"):
+        config.fake_app = FakeApp().start()
+        os.environ["BASE_URL"] = config.fake_app.url
+    config.run_started = time.time()
+    config.impact_changes = None
+    if config.getoption("affected_since"):
+        try:
+            changed, config.impact_unanalysed = impact.changed_symbols(
+                os.path.dirname(__file__), config.getoption("affected_since")
+            )
+        except ValueError as error:
+            raise pytest.UsageError(str(error))
+        config.impact_symbols = sorted(changed)
+        config.impact_run_all = impact.behaviour_changes(config.impact_unanalysed)
+        # Fail safe: a change the analysis cannot see may affect any test, so none is deselected
+        if not config.impact_run_all:
+            config.impact_changes = config.impact_symbols
+    config.browser_server_endpoints = start_browser_servers(config)
+    if not config.browser_server_endpoints:
+        config.browser_daemon = connect_browser_daemon(config)
+        if config.browser_daemon is not None:
+            config.browser_server_endpoints = [config.browser_daemon.ws_endpoint]
+    global _duration_store
+    config.duration_store = _duration_store = DurationStore(getattr(config, "cache", None))
+    if getattr(config.option, "numprocesses", None):
+        # Workers write the marker estimates of the tests they collect here
+        config.marker_factors_dir = tempfile.mkdtemp(prefix="marker-factors-")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """Point an xdist worker at the controller's fake storefront."""
+    fake_app = getattr(node.config, "fake_app", None)
+    if fake_app is not None:
+        node.workerinput["fake_app_url"] = fake_app.url
+    node.workerinput["marker_factors_dir"] = getattr(node.config, "marker_factors_dir", "")
+    node.workerinput["browser_server_endpoints"] = node.config.browser_server_endpoints
+    node.workerinput["impact_changes"] = node.config.impact_changes
+
+
+def start_browser_servers(config) -> list:
+    """Get the endpoints of --browser-servers, starting local servers for "local:N"."""
+    value = config.getoption("browser_servers").strip()
+    if not value.startswith("local:"):
+        return [endpoint.strip() for endpoint in value.split(",") if endpoint.strip()]
+    try:
+        count = int(value[len("local:"):])
+    except ValueError:
+        raise pytest.UsageError(f"Expected local:N for --browser-servers, got {value!r}")
+    config.local_browser_servers = []
+    for _ in range(count):
+        server = LocalBrowserServer(BROWSER_NAME, {"headless": HEADLESS}).start()
+        config.local_browser_servers.append(server)
+    return [server.ws_endpoint for server in config.local_browser_servers]
+
+
+def connect_browser_daemon(config):
+    """Connect to the warm browser daemon (starting it with --browser-daemon start), or None."""
+    mode = config.getoption("browser_daemon")
+    if mode == "off":
+        return None
+    path = browser_daemon.socket_path(BROWSER_NAME, HEADLESS)
+    lease = browser_daemon.connect(path)
+    if lease is None and mode == "start":
+        lease = browser_daemon.spawn(path, BROWSER_NAME, HEADLESS, BROWSER_DAEMON_IDLE_TIMEOUT)
+    return lease
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    """Hand out the longest tests first when running with --dist load."""
+    if config.getoption("schedule") != "lpt" or config.getvalue("dist") != "load":
+        return None
+    config.lpt_scheduler = LptScheduling(
+        config, log, store=config.duration_store, factors_dir=config.marker_factors_dir
+    )
+    return config.lpt_scheduler
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config, items):
+    """Select the affected tests, group them by start state, and tell the scheduler which are slow."""
+    if config.impact_changes is not None:
+        select_affected(config, items)
+    if config.getoption("start_states"):
+        group_by_start_state(items)
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is not None and workerinput.get("marker_factors_dir"):
+        write_marker_factors(
+            workerinput["marker_factors_dir"],
+            workerinput["workerid"],
+            {item.nodeid: marker_factor(marker.name for marker in item.iter_markers()) for item in items},
+        )
+
+
+def select_affected(config, items) -> None:
+    """Deselect the tests the changes since --affected-since cannot affect (see utils/impact.py)."""
+    index = impact.ImpactIndex(IMPACT_INDEX)
+    changed = set(config.impact_changes)
+    selected, deselected = [], []
+    for item in items:
+        affected = impact.is_affected(item.nodeid, index.dependencies(item.nodeid), changed)
+        (selected if affected else deselected).append(item)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+    config.impact_selection = (len(selected), len(selected) + len(deselected))
+
+
+def group_by_start_state(items) -> None:
+    """Move the tests of each start state next to the first one, keeping them on one xdist worker."""
+    first_index = {}
+    order = {}
+    for index, item in enumerate(items):
+        marker = item.get_closest_marker("start_state")
+        if marker is None:
+            order[item.nodeid] = (index, index)
+            continue
+        name = marker.args[0]
+        order[item.nodeid] = (first_index.setdefault(name, index), index)
+        # Used by --dist loadgroup
+        item.add_marker(pytest.mark.xdist_group(f"start_state_{name}"))
+    items.sort(key=lambda item: order[item.nodeid])
+
+
+def pytest_runtest_logreport(report):
+    """Record how long each test took, per worker (on the controller, or without xdist)."""
+    if _duration_store is not None and not getattr(report, "cached", False):
+        node = getattr(report, "node", None)
+        worker = node.gateway.id if node is not None else "main"
+        _duration_store.add(report.nodeid, report.duration, worker)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Keep the report of each phase on the test item."""
+    report = yield
+    if item.stash.get(CACHED_PASS, False):
+        report.cached = True
+    item.stash.setdefault(PHASE_REPORTS, {})[report.when] = report
+    if report.when == "teardown":
+        record_result(item)
+    return report
+
+
+def get_result_cache(config):
+    """Get the result cache of the run, or None when results must not be reused."""
+    if not hasattr(config, "result_cache"):
+        config.result_cache = None
+        measuring = ("record_impact", "instrument", "web_vitals")
+        if not (
+            config.getoption("force_run")
+            or config.getoption("network_mode") == "record"
+            # These runs are about what the tests do, not whether they pass
+            or any(config.getoption(option) for option in measuring)
+            or getattr(config, "cache", None) is None
+        ):
+            cache = ResultCache(
+                config.cache,
+                get_build(get_base_url()),
+                result_settings(config),
+                os.path.join(os.path.dirname(__file__), "fixtures"),
+                max_age_seconds=RESULT_CACHE_MAX_AGE,
+            )
+            if cache.enabled:
+                config.result_cache = cache
+    return config.result_cache
+
+
+def result_settings(config) -> str:
+    """Describe the run settings that change what a test does, for the result key."""
+    settings = {
+        "base_url": get_base_url(),
+        "browser": BROWSER_NAME,
+        "headless": HEADLESS,
+        "network_mode": config.getoption("network_mode"),
+        "reset": RESET_STRATEGY,
+        "cart_seed": CART_SEED_MODE,
+        "cart_api": CART_API_PATH,
+        "resource_policy": config.getoption("resource_policy"),
+        "start_states": config.getoption("start_states"),
+        "checkpoints": config.getoption("checkpoints"),
+        "browser_servers": config.getoption("browser_servers"),
+    }
+    return ";".join(f"{name}={value}" for name, value in settings.items())
+
+
+def record_result(item) -> None:
+    """Store the pass of a test that ran, or forget its cached pass when it did not pass."""
+    results = get_result_cache(item.config)
+    key = item.stash.get(RESULT_KEY, None)
+    if results is None or key is None or item.stash.get(CACHED_PASS, False):
+        return
+    reports = item.stash.get(PHASE_REPORTS, {})
+    if "call" in reports and all(report.passed for report in reports.values()) and not hasattr(
+        reports["call"], "wasxfail"
+    ):
+        results.store(item.nodeid, key, sum(report.duration for report in reports.values()))
+    elif any(report.failed or report.skipped for report in reports.values()):
+        results.forget(item.nodeid)
+
+
+def pytest_collection_finish(session):
+    """Skip the selected tests that are unchanged since they passed, before any fixture is set up."""
+    results = get_result_cache(session.config)
+    if results is None:
+        return
+    for item in session.items:
+        key = results.key(item)
+        if key is None:
+            continue
+        item.stash[RESULT_KEY] = key
+        if results.hit(item.nodeid, key):
+            item.stash[CACHED_PASS] = True
+            item.add_marker(pytest.mark.skip(reason="cached pass: unchanged since it last passed"))
+
+
+def pytest_report_teststatus(report, config):
+    """Show cached passes as such."""
+    if getattr(report, "cached", False):
+        if report.when == "setup":
+            return "cached", "c", "CACHED PASS"
+        return "", "", ""
+    return None
+
+
+def pytest_runtest_logstart(nodeid, location):
+    """Attribute page object timings to the test that is starting."""
+    instrumentation.set_current_test(nodeid)
+    impact.set_current_test(nodeid)
+
+
+def pytest_unconfigure(config):
+    """Stop the fake storefront and browser servers, undo the instrumentation and remove the marker estimates."""
+    instrumentation.uninstrument()
+    impact.stop_recording()
+    flight_recorder.stop_recording_actions()
+    global _duration_store
+    _duration_store = None
+    marker_factors_dir = getattr(config, "marker_factors_dir", None)
+    if marker_factors_dir:
+        shutil.rmtree(marker_factors_dir, ignore_errors=True)
+    for server in getattr(config, "local_browser_servers", []):
+        server.stop()
+    if getattr(config, "browser_daemon", None) is not None:
+        # The daemon counts its idle time from here
+        config.browser_daemon.close()
+    fake_app = getattr(config, "fake_app", None)
+    if fake_app is not None:
+        fake_app.stop()
+
+
+def pytest_sessionfinish(session):
+    """Hand this worker's stats to the xdist controller, or save what the run learned."""
+    config = session.config
+    if config.getoption("instrument"):
+        session_stats.merge({instrumentation.STATS_SECTION: instrumentation.collect()})
+    if config.getoption("record_impact"):
+        session_stats.merge({impact.STATS_SECTION: impact.collect()})
+    workeroutput = getattr(config, "workeroutput", None)
+    if workeroutput is not None:
+        workeroutput["session_stats"] = session_stats.snapshot()
+        return
+    config.duration_store.save()
+    recorded = session_stats.section(impact.STATS_SECTION).pop("tests", {})
+    if recorded:
+        index = impact.ImpactIndex(IMPACT_INDEX)
+        index.update(recorded)
+        index.prune(os.path.dirname(__file__))
+        index.save()
+        session_stats.add(impact.STATS_SECTION, "recorded", len(recorded))
+    learned = session_stats.section("resources").pop("sizes", [])
+    if learned and getattr(config, "cache", None) is not None:
+        sizes = config.cache.get(RESOURCE_SIZES_CACHE_KEY, {})
+        sizes.update(dict(learned))
+        config.cache.set(RESOURCE_SIZES_CACHE_KEY, sizes)
+    samples = session_stats.section(web_vitals.STATS_SECTION).get("samples")
+    if samples:
+        config.web_vitals_file = web_vitals.write_run_file(samples, WEB_VITALS_DIR)
+    if config.getoption("instrument"):
+        instrumentation.export_json(
+            session_stats.section(instrumentation.STATS_SECTION), config.getoption("instrument_json")
+        )
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Collect the stats of a finished xdist worker."""
+    session_stats.merge(getattr(node, "workeroutput", {}).get("session_stats", {}))
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Report run-wide stats at the end of the session."""
+    stats = session_stats.snapshot()
+    if "browser_pool" in stats:
+        terminalreporter.write_sep("-", "browser pool")
+        terminalreporter.write_line(format_summary(stats["browser_pool"]))
+    config = terminalreporter.config
+    if config.getoption("affected_since"):
+        line = (
+            f"impact: {len(config.impact_symbols)} page object and test symbols changed since "
+            f"{config.getoption('affected_since')}"
+        )
+        if config.impact_run_all:
+            line += f"; every test selected, since these changes are not analysed: {', '.join(config.impact_run_all)}"
+        elif getattr(config, "impact_selection", None):
+            line += ", {} of {} tests affected".format(*config.impact_selection)
+        terminalreporter.write_line(line)
+    if stats.get(impact.STATS_SECTION, {}).get("recorded"):
+        terminalreporter.write_line(
+            f"impact: dependencies of {stats[impact.STATS_SECTION]['recorded']} test functions saved to {IMPACT_INDEX}"
+        )
+    if stats.get(result_cache.STATS_SECTION):
+        terminalreporter.write_line(
+            result_cache.format_summary(stats[result_cache.STATS_SECTION], get_build(get_base_url()))
+        )
+    lease = getattr(config, "browser_daemon", None)
+    if lease is not None:
+        server = stats.get(browser_servers.STATS_SECTION, {}).get(lease.ws_endpoint, {})
+        terminalreporter.write_line(
+            browser_daemon.format_summary(lease, server.get("connects", 0), server.get("connect_seconds", 0.0))
+        )
+    elif stats.get(browser_servers.STATS_SECTION):
+        terminalreporter.write_sep("-", "browser servers")
+        wall_seconds = time.time() - terminalreporter.config.run_started
+        for line in browser_servers.format_summary(stats[browser_servers.STATS_SECTION], wall_seconds):
+            terminalreporter.write_line(line)
+    if "auth_cache" in stats:
+        auth = stats["auth_cache"]
+        terminalreporter.write_line(
+            f"auth cache: {auth.get('logins', 0)} UI logins, {auth.get('hits', 0)} cache hits, "
+            f"{auth.get('stale_sessions', 0)} stale sessions refreshed"
+        )
+    if stats.get(flight_recorder.STATS_SECTION, {}).get("tests"):
+        terminalreporter.write_line(
+            flight_recorder.format_summary(stats[flight_recorder.STATS_SECTION], FLIGHT_RECORDER_DIR)
+        )
+    if handle_leaks.STATS_SECTION in stats:
+        for line in handle_leaks.format_summary(stats[handle_leaks.STATS_SECTION]):
+            terminalreporter.write_line(line)
+    if checkpoints.STATS_SECTION in stats:
+        terminalreporter.write_line(checkpoints.format_summary(stats[checkpoints.STATS_SECTION]))
+    if state_reset.STATS_SECTION in stats or "context_reuses" in stats.get("browser_pool", {}):
+        terminalreporter.write_line(
+            state_reset.format_summary(
+                stats.get(state_reset.STATS_SECTION, {}), stats.get("browser_pool", {}).get("context_reuses", 0)
+            )
+        )
+    if "validation" in stats:
+        terminalreporter.write_line(
+            f"validation: {stats['validation']['cases']} cases checked on "
+            f"{stats['validation']['page_loads']} page loads"
+        )
+    if "forms" in stats:
+        terminalreporter.write_sep("-", "form fills")
+        for form_name, form in sorted(stats["forms"].items()):
+            terminalreporter.write_line(
+                f"{form_name}: {form['fills']} fills, avg {form['seconds'] / form['fills'] * 1000:.0f} ms, "
+                f"{form['fallback_fields']}/{form['fields']} fields filled one by one"
+            )
+    if "network" in stats:
+        for line in network_replay.format_summary(stats["network"]):
+            terminalreporter.write_line(line)
+    if stats.get("resources", {}).get("tests"):
+        terminalreporter.write_sep("-", "resource policy")
+        for line in resource_policy.format_summary(stats["resources"]):
+            terminalreporter.write_line(line)
+    if stats.get(instrumentation.STATS_SECTION, {}).get("tests"):
+        terminalreporter.write_sep("-", "page object timings")
+        for line in instrumentation.format_summary(stats[instrumentation.STATS_SECTION]):
+            terminalreporter.write_line(line)
+        terminalreporter.write_line(f"timings written to {terminalreporter.config.getoption('instrument_json')}")
+    if stats.get(web_vitals.STATS_SECTION, {}).get("samples"):
+        terminalreporter.write_sep("-", "web vitals")
+        for line in web_vitals.format_summary(stats[web_vitals.STATS_SECTION]):
+            terminalreporter.write_line(line)
+        terminalreporter.write_line(f"samples written to {terminalreporter.config.web_vitals_file}")
+    scheduler = getattr(terminalreporter.config, "lpt_scheduler", None)
+    if scheduler is not None and scheduler.predicted_makespan is not None:
+        terminalreporter.write_sep("-", "scheduling")
+        for line in scheduling.format_summary(scheduler):
+            terminalreporter.write_line(line)
+    if stats.get(start_state_pool.STATS_SECTION):
+        terminalreporter.write_sep("-", "start states")
+        for line in start_state_pool.format_summary(stats[start_state_pool.STATS_SECTION]):
+            terminalreporter.write_line(line)
+    if "readiness" in stats:
+        terminalreporter.write_sep("-", "page readiness")
+        for line in readiness.format_summary(stats["readiness"]):
+            terminalreporter.write_line(line)
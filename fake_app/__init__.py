@@ -0,0 +1,10 @@
+"""
+Local stand-in of the demo ecommerce application.
+
+Runs in-process on an ephemeral port so the suite can run hermetically,
+without depending on the remote demo host.
+"""
+
+from fake_app.server import FakeApp
+
+__all__ = ["FakeApp"]
@@ -0,0 +1,31 @@
+"""
+Run the fake storefront from the command line.
+
+Usage:
+    python -m fake_app --port 8000
+"""
+
+import argparse
+import time
+
+from fake_app import FakeApp
+
+
+def main():
+    """Serve the fake storefront until interrupted."""
+    parser = argparse.ArgumentParser(description="Serve the fake demo ecommerce application.")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="port to listen on (0 picks a free one)")
+    args = parser.parse_args()
+
+    with FakeApp(args.host, args.port) as app:
+        print(f"Serving the fake storefront at {app.url}", flush=True)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+HTTP server of the fake storefront.
+
+Serves /login, /products, /cart and /checkout (plus the pages they link to
+and a small JSON cart API) from memory, with no network access needed.
+"""
+
+import datetime
+import json
+import threading
+from http import cookies
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from fake_app import views
+from fake_app.store import Store
+
+SESSION_COOKIE = "sid"
+QUERY_FIELDS = ("search", "category", "price_min", "price_max", "sort")
+
+
+class FakeAppHandler(BaseHTTPRequestHandler):
+    """Routes requests to the views and the store."""
+
+    server_version = "FakeEcommerce/1.0"
+    protocol_version = "HTTP/1.1"
+
+    # Routing
+
+    def do_GET(self):
+        """Handle GET requests."""
+        path = self._path()
+        routes = {
+            "/": lambda: self._html(views.home_page(self.session["user"])),
+            "/login": lambda: self._html(views.login_page()),
+            "/register": lambda: self._html(views.simple_page("Create Account", "Registration form")),
+            "/forgot-password": lambda: self._html(
+                views.simple_page("Forgot Password", "Enter your email to reset your password")
+            ),
+            "/dashboard": self._dashboard,
+            "/products": self._products,
+            "/cart": self._cart,
+            "/checkout": self._checkout_form,
+            "/order-confirmation": self._confirmation,
+            "/api/cart": self._api_cart,
+        }
+        if path in routes:
+            routes[path]()
+        elif path.startswith("/product/"):
+            self._product_detail(unquote(path[len("/product/"):]))
+        elif path.startswith("/static/img/") and path.endswith(".svg"):
+            sku = unquote(path[len("/static/img/"):-len(".svg")])
+            self._send(200, views.product_image(sku).encode(), "image/svg+xml", cache=True)
+        else:
+            self._html(views.simple_page("Not Found", f"No page at {path}"), status=404)
+
+    def do_HEAD(self):
+        """Handle HEAD requests like GET requests, without the body."""
+        self.do_GET()
+
+    def do_POST(self):
+        """Handle POST requests."""
+        routes = {
+            "/login": self._login,
+            "/cart/add": self._cart_add,
+            "/cart/update": self._cart_update,
+            "/cart/remove": self._cart_remove,
+            "/checkout": self._checkout_submit,
+            "/api/cart/items": self._api_add_item,
+        }
+        handler = routes.get(self._path())
+        if handler is None:
+            self._json(404, {"error": "Not found"})
+        else:
+            handler()
+
+    # Pages
+
+    def _login(self):
+        """Log the session in or show the form with an error."""
+        form = self._form()
+        email, password = form.get("email", ""), form.get("password", "")
+        error = self.store.login(self.session, email, password)
+        if error:
+            self._html(views.login_page(error, email))
+        else:
+            self._redirect("/dashboard")
+
+    def _dashboard(self):
+        """Show the dashboard, or bounce anonymous visitors to /login."""
+        if not self.session["user"]:
+            self._redirect("/login")
+        else:
+            self._html(views.simple_page("Dashboard", "Welcome back!", self.session["user"]))
+
+    def _products(self):
+        """Show the product listing for the search, filter and sort query."""
+        query = {field: self._query().get(field, "") for field in QUERY_FIELDS}
+        products = self.store.search(**query)
+        self._html(views.products_page(products, self.store.categories(), query, self.session["user"]))
+
+    def _product_detail(self, sku: str):
+        """Show a product detail page."""
+        product = self.store.products.get(sku)
+        if product is None:
+            self._html(views.simple_page("Not Found", f"No product {sku}"), status=404)
+        else:
+            self._html(views.product_detail_page(product, self.session["user"]))
+
+    def _cart(self):
+        """Show the shopping cart."""
+        self._html(
+            views.cart_page(
+                self.store.cart_lines(self.session), self.store.cart_totals(self.session), self.session["user"]
+            )
+        )
+
+    def _cart_add(self):
+        """Add a product to the cart and go back to where the form was."""
+        form = self._form()
+        self.store.add_to_cart(self.session, form.get("sku", ""), _to_int(form.get("quantity"), 1))
+        next_url = form.get("next", "/products")
+        self._redirect(next_url if next_url.startswith("/") else "/products")
+
+    def _cart_update(self):
+        """Change the quantity of a cart line."""
+        form = self._form()
+        self.store.set_quantity(self.session, form.get("sku", ""), _to_int(form.get("quantity"), 1))
+        self._redirect("/cart")
+
+    def _cart_remove(self):
+        """Remove a line from the cart."""
+        self.store.set_quantity(self.session, self._form().get("sku", ""), 0)
+        self._redirect("/cart")
+
+    def _checkout_form(self, form: Optional[Dict[str, str]] = None, error: Optional[str] = None):
+        """Show the checkout form, optionally with submitted values and an error."""
+        form = form or {}
+        self._html(
+            views.checkout_page(
+                self.store.cart_lines(self.session),
+                self.store.cart_totals(self.session, form.get("shipping_method", "standard")),
+                form,
+                self.session["user"],
+                error,
+            )
+        )
+
+    def _checkout_submit(self):
+        """Validate the checkout form and place the order."""
+        form = self._form()
+        error = self.store.validate_checkout(self.session, form)
+        if error:
+            self._checkout_form(form, error)
+        else:
+            self._redirect(f"/order-confirmation?order={self.store.place_order(self.session)}")
+
+    def _confirmation(self):
+        """Show the order confirmation."""
+        self._html(views.confirmation_page(self._query().get("order", ""), self.session["user"]))
+
+    # JSON API
+
+    def _api_cart(self):
+        """Return the cart as JSON."""
+        self._json(200, self._cart_payload())
+
+    def _api_add_item(self):
+        """Add a {"sku", "quantity"} item to the cart."""
+        try:
+            item = json.loads(self._body() or b"{}")
+        except ValueError:
+            self._json(400, {"error": "Invalid JSON"})
+            return
+        if not self.store.add_to_cart(self.session, str(item.get("sku", "")), _to_int(item.get("quantity"), 1)):
+            self._json(404, {"error": f"Unknown SKU {item.get('sku')!r}"})
+            return
+        self._json(201, self._cart_payload())
+
+    def _cart_payload(self) -> dict:
+        """Build the JSON representation of the cart."""
+        return {
+            "items": [
+                {"sku": line["sku"], "quantity": line["quantity"], "line_total": str(line["line_total"])}
+                for line in self.store.cart_lines(self.session)
+            ],
+            "total": str(self.store.cart_totals(self.session)["total"]),
+        }
+
+    # Plumbing
+
+    @property
+    def store(self) -> Store:
+        """Get the store shared by all requests."""
+        return self.server.store
+
+    @property
+    def session(self) -> dict:
+        """Get the request's session, creating one (and its cookie) if needed."""
+        if not hasattr(self, "_session"):
+            jar = cookies.SimpleCookie(self.headers.get("Cookie", ""))
+            sent_id = jar[SESSION_COOKIE].value if SESSION_COOKIE in jar else None
+            self._session_id, self._session = self.store.session(sent_id)
+            self._new_session = self._session_id != sent_id
+        return self._session
+
+    def _path(self) -> str:
+        """Get the request path without query string or trailing slash."""
+        return urlsplit(self.path).path.rstrip("/") or "/"
+
+    def _query(self) -> Dict[str, str]:
+        """Get the query string parameters."""
+        return {key: values[0] for key, values in parse_qs(urlsplit(self.path).query).items()}
+
+    def _body(self) -> bytes:
+        """Read the request body."""
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _form(self) -> Dict[str, str]:
+        """Parse a form-encoded request body."""
+        parsed = parse_qs(self._body().decode(), keep_blank_values=True)
+        return {key: values[0] for key, values in parsed.items()}
+
+    def _html(self, html: str, status: int = 200):
+        """Send an HTML response."""
+        self._send(status, html.encode(), "text/html; charset=utf-8")
+
+    def _json(self, status: int, payload: dict):
+        """Send a JSON response."""
+        self._send(status, json.dumps(payload).encode(), "application/json")
+
+    def _redirect(self, location: str):
+        """Send a 303 redirect."""
+        self.send_response(303)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        self._common_headers()
+        self.end_headers()
+
+    def _send(self, status: int, body: bytes, content_type: str, cache: bool = False):
+        """Send a response with a body."""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "max-age=3600" if cache else "no-store")
+        self._common_headers()
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _common_headers(self):
+        """Send the build id and, for new visitors, the session cookie."""
+        self.send_header("X-App-Build", self.store.build)
+        self.session  # Make sure every visitor gets a session cookie
+        if self._new_session:
+            self.send_header("Set-Cookie", f"{SESSION_COOKIE}={self._session_id}; Path=/; HttpOnly; SameSite=Lax")
+
+    def log_message(self, format, *args):
+        """Keep test output quiet."""
+
+
+def _to_int(value, default: int) -> int:
+    """Convert a form or JSON value to an int."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class FakeApp:
+    """Runs the fake storefront on a background thread."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, today: Optional[datetime.date] = None):
+        """Configure the server; port 0 picks a free ephemeral port."""
+        self.host = host
+        self.port = port
+        self.store = Store(today)
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Get the base URL of the running server."""
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "FakeApp":
+        """Start serving in a daemon thread."""
+        self._server = ThreadingHTTPServer((self.host, self.port), FakeAppHandler)
+        self._server.daemon_threads = True
+        self._server.store = self.store
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-app", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeApp":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
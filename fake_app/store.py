@@ -0,0 +1,253 @@
+"""
+In-memory state and business rules of the fake storefront.
+
+Everything is deterministic: the catalogue comes from
+fixtures/test_products.json, the users from fixtures/test_users.json, and
+card expiry dates are checked against a fixed reference date.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import re
+import secrets
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+
+TAX_RATE = Decimal("0.08")
+SHIPPING_METHODS = OrderedDict(
+    [("standard", Decimal("0.00")), ("express", Decimal("14.99")), ("overnight", Decimal("29.99"))]
+)
+COUNTRIES = OrderedDict([("US", "United States"), ("CA", "Canada"), ("GB", "United Kingdom")])
+SORT_OPTIONS = OrderedDict(
+    [
+        ("", "Featured"),
+        ("price_asc", "Price: Low to High"),
+        ("price_desc", "Price: High to Low"),
+        ("rating", "Top Rated"),
+        ("name", "Name"),
+    ]
+)
+
+_EMAIL = re.compile(r"^[^@\s]+@[^@\s]+\.[A-Za-z]{2,}$")
+_PHONE = re.compile(r"^\+?[\d\s().-]+$")
+_ZIP = re.compile(r"^[A-Za-z0-9 -]{3,10}$")
+_EXPIRY = re.compile(r"^(0[1-9]|1[0-2])/(\d{2})$")
+_CVV = re.compile(r"^\d{3,4}$")
+
+
+def _load_json(name: str):
+    """Load a JSON file from the fixtures directory."""
+    with open(os.path.join(FIXTURES_DIR, name)) as fixture_file:
+        return json.load(fixture_file)
+
+
+def _source_build() -> str:
+    """Get a build id that changes with the storefront's code or its fixture data."""
+    digest = hashlib.sha256()
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    paths = [os.path.join(app_dir, name) for name in os.listdir(app_dir) if name.endswith(".py")]
+    paths += [os.path.join(FIXTURES_DIR, name) for name in os.listdir(FIXTURES_DIR) if name.endswith(".json")]
+    for path in sorted(paths):
+        with open(path, "rb") as source_file:
+            digest.update(os.path.basename(path).encode() + b"\0" + source_file.read())
+    return digest.hexdigest()[:12]
+
+
+def _parse_decimal(text: str) -> Optional[Decimal]:
+    """Parse a price filter value, ignoring anything that is not a number."""
+    try:
+        return Decimal(text.strip())
+    except ArithmeticError:
+        return None
+
+
+def _luhn_valid(number: str) -> bool:
+    """Check a card number with the Luhn algorithm."""
+    total = 0
+    for index, digit in enumerate(reversed(number)):
+        value = int(digit)
+        if index % 2:
+            value *= 2
+            if value > 9:
+                value -= 9
+        total += value
+    return total % 10 == 0
+
+
+class Store:
+    """Catalogue, users, sessions and carts of the fake storefront."""
+
+    def __init__(self, today: Optional[datetime.date] = None):
+        """Load the catalogue and users; ``today`` is used for card expiry checks."""
+        self.today = today or datetime.date(2024, 6, 1)
+        self.products = OrderedDict(
+            (product["sku"], dict(product, price=Decimal(product["price"])))
+            for product in _load_json("test_products.json")
+        )
+        self.users = {
+            persona["email"].lower(): persona["password"]
+            for persona in _load_json("test_users.json").values()
+        }
+        self.build = _source_build()
+        self._sessions: Dict[str, dict] = {}
+        self._orders = 0
+        self._lock = threading.Lock()
+
+    # Sessions
+
+    def session(self, session_id: Optional[str]) -> Tuple[str, dict]:
+        """Get a session by id, creating a new one if it does not exist."""
+        with self._lock:
+            if session_id not in self._sessions:
+                session_id = secrets.token_hex(16)
+                self._sessions[session_id] = {"user": None, "cart": OrderedDict()}
+            return session_id, self._sessions[session_id]
+
+    def login(self, session: dict, email: str, password: str) -> Optional[str]:
+        """Log a session in; returns an error message or None on success."""
+        if not email and not password:
+            return "Email and password are required"
+        if not email:
+            return "Email is required"
+        if not password:
+            return "Password is required"
+        expected = self.users.get(email.strip().lower())
+        if expected is None:
+            return "Invalid credentials: user not found"
+        if password != expected:
+            return "Invalid credentials: incorrect password"
+        session["user"] = email.strip().lower()
+        return None
+
+    # Catalogue
+
+    def search(
+        self,
+        search: str = "",
+        category: str = "",
+        price_min: str = "",
+        price_max: str = "",
+        sort: str = "",
+    ) -> List[dict]:
+        """Find products matching a search term and filters."""
+        term = search.strip().lower()
+        products = [
+            product
+            for product in self.products.values()
+            if (not term or term in product["title"].lower())
+            and (not category or product["category"] == category)
+        ]
+        minimum, maximum = _parse_decimal(price_min), _parse_decimal(price_max)
+        if minimum is not None:
+            products = [product for product in products if product["price"] >= minimum]
+        if maximum is not None:
+            products = [product for product in products if product["price"] <= maximum]
+
+        if sort == "price_asc":
+            products.sort(key=lambda product: product["price"])
+        elif sort == "price_desc":
+            products.sort(key=lambda product: product["price"], reverse=True)
+        elif sort == "rating":
+            products.sort(key=lambda product: product["rating"], reverse=True)
+        elif sort == "name":
+            products.sort(key=lambda product: product["title"])
+        return products
+
+    def categories(self) -> List[str]:
+        """Get the product categories in catalogue order."""
+        return list(OrderedDict.fromkeys(product["category"] for product in self.products.values()))
+
+    # Cart
+
+    def add_to_cart(self, session: dict, sku: str, quantity: int = 1) -> bool:
+        """Add a product to a session's cart; returns False for unknown SKUs."""
+        if sku not in self.products or quantity < 1:
+            return False
+        with self._lock:
+            session["cart"][sku] = session["cart"].get(sku, 0) + quantity
+        return True
+
+    def set_quantity(self, session: dict, sku: str, quantity: int) -> None:
+        """Change the quantity of a cart line; 0 removes it."""
+        with self._lock:
+            if quantity < 1:
+                session["cart"].pop(sku, None)
+            elif sku in session["cart"]:
+                session["cart"][sku] = quantity
+
+    def cart_lines(self, session: dict) -> List[dict]:
+        """Get the cart lines with their product data and line totals."""
+        with self._lock:
+            items = list(session["cart"].items())
+        return [
+            dict(self.products[sku], quantity=quantity, line_total=self.products[sku]["price"] * quantity)
+            for sku, quantity in items
+        ]
+
+    def cart_totals(self, session: dict, shipping_method: str = "standard") -> Dict[str, Decimal]:
+        """Get the subtotal, tax, shipping and total of a session's cart."""
+        subtotal = sum((line["line_total"] for line in self.cart_lines(session)), Decimal("0.00"))
+        tax = (subtotal * TAX_RATE).quantize(Decimal("0.01"))
+        shipping = SHIPPING_METHODS.get(shipping_method, Decimal("0.00")) if subtotal else Decimal("0.00")
+        return {"subtotal": subtotal, "tax": tax, "shipping": shipping, "total": subtotal + tax + shipping}
+
+    # Checkout
+
+    def validate_checkout(self, session: dict, form: Dict[str, str]) -> Optional[str]:
+        """Validate a checkout form; returns the first error message or None."""
+        required = (
+            ("first_name", "First name"),
+            ("last_name", "Last name"),
+            ("email", "Email"),
+            ("phone", "Phone number"),
+            ("address", "Address"),
+            ("city", "City"),
+            ("state", "State"),
+            ("zip", "ZIP code"),
+        )
+        for field, label in required:
+            if not form.get(field, "").strip():
+                return f"{label} is required"
+            if field == "email" and not _EMAIL.match(form["email"].strip()):
+                return "Invalid email address"
+            if field == "phone" and (
+                not _PHONE.match(form["phone"]) or len(re.sub(r"\D", "", form["phone"])) < 7
+            ):
+                return "Invalid phone number"
+            if field == "zip" and not _ZIP.match(form["zip"].strip()):
+                return "Invalid ZIP code"
+        if form.get("country", "US") not in COUNTRIES:
+            return "Unsupported country"
+        if form.get("shipping_method", "standard") not in SHIPPING_METHODS:
+            return "Unsupported shipping method"
+
+        card_number = re.sub(r"[\s-]", "", form.get("card_number", ""))
+        if not card_number:
+            return "Card number is required"
+        if not card_number.isdigit() or not 13 <= len(card_number) <= 19 or not _luhn_valid(card_number):
+            return "Invalid card number"
+        expiry = _EXPIRY.match(form.get("expiry", "").strip())
+        if not expiry:
+            return "Invalid card expiry date (use MM/YY)"
+        month, year = int(expiry.group(1)), 2000 + int(expiry.group(2))
+        if (year, month) < (self.today.year, self.today.month):
+            return "Card has expired"
+        if not _CVV.match(form.get("cvv", "").strip()):
+            return "Invalid CVV security code"
+
+        if not session["cart"]:
+            return "Your cart is empty"
+        return None
+
+    def place_order(self, session: dict) -> str:
+        """Turn the session's cart into an order and return the order number."""
+        with self._lock:
+            self._orders += 1
+            session["cart"].clear()
+            return f"ORD-{self._orders:06d}"
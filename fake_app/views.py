@@ -0,0 +1,240 @@
+"""
+HTML rendering of the fake storefront.
+
+The markup uses exactly the class names, field names and button labels the
+page objects in ``pages`` rely on.
+"""
+
+from decimal import Decimal
+from html import escape
+from typing import Dict, List, Optional
+from urllib.parse import quote, urlencode
+
+from fake_app.store import COUNTRIES, SHIPPING_METHODS, SORT_OPTIONS
+
+_STYLE = """
+body { font-family: sans-serif; margin: 0 auto; max-width: 960px; padding: 16px; }
+nav a { margin-right: 12px; }
+.alert-danger { color: #a00; border: 1px solid #a00; padding: 8px; }
+.alert-success { color: #070; border: 1px solid #070; padding: 8px; }
+.product-item, .cart-item { border: 1px solid #ddd; margin: 8px 0; padding: 8px; cursor: pointer; }
+.product-image { width: 64px; height: 64px; }
+label { display: block; margin: 4px 0; }
+"""
+
+
+def money(amount: Decimal) -> str:
+    """Format an amount as "$1,299.99"."""
+    return f"${amount:,.2f}"
+
+
+def layout(title: str, body: str, user: Optional[str] = None) -> str:
+    """Wrap page content in the common layout."""
+    account = f"Signed in as {escape(user)}" if user else '<a href="/login">Sign In</a>'
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{escape(title)} - Demo Ecommerce</title>
+<style>{_STYLE}</style>
+</head>
+<body>
+<nav><a href="/">Home</a><a href="/products">Products</a><a href="/cart">Cart</a>{account}</nav>
+<main>
+<h1>{escape(title)}</h1>
+{body}
+</main>
+</body>
+</html>"""
+
+
+def alerts(error: Optional[str] = None, success: Optional[str] = None) -> str:
+    """Render the error and success messages."""
+    html = ""
+    if error:
+        html += f'<div class="alert alert-danger" role="alert">{escape(error)}</div>'
+    if success:
+        html += f'<div class="alert alert-success" role="alert">{escape(success)}</div>'
+    return html
+
+
+def _options(choices: Dict[str, str], selected: str) -> str:
+    """Render <option> elements."""
+    return "".join(
+        f'<option value="{escape(value)}"{" selected" if value == selected else ""}>{escape(label)}</option>'
+        for value, label in choices.items()
+    )
+
+
+def home_page(user: Optional[str]) -> str:
+    """Render the home page."""
+    return layout("Welcome", '<p><a href="/products">Browse products</a></p>', user)
+
+
+def login_page(error: Optional[str] = None, email: str = "") -> str:
+    """Render the login form."""
+    body = f"""{alerts(error)}
+<form method="post" action="/login" novalidate>
+<label>Email <input type="email" name="email" value="{escape(email)}"></label>
+<label>Password <input type="password" name="password"></label>
+<button type="submit">Sign In</button>
+</form>
+<p><a href="/register">Create Account</a> <a href="/forgot-password">Forgot Password</a></p>"""
+    return layout("Sign In", body)
+
+
+def simple_page(title: str, text: str, user: Optional[str] = None) -> str:
+    """Render a page with a single paragraph."""
+    return layout(title, f"<p>{escape(text)}</p>", user)
+
+
+def products_page(
+    products: List[dict], categories: List[str], query: Dict[str, str], user: Optional[str]
+) -> str:
+    """Render the product listing with its search, filter and sort form."""
+    category_choices = {"": "All categories", **{category: category for category in categories}}
+    back_to = "/products" + (f"?{urlencode(query)}" if any(query.values()) else "")
+    items = "".join(
+        f"""<div class="product-item" data-sku="{escape(product['sku'])}"
+ onclick="if (!event.target.closest('form')) location.href = '/product/{quote(product['sku'])}'">
+<img class="product-image" src="/static/img/{quote(product['sku'])}.svg" alt="">
+<h2 class="product-title">{escape(product['title'])}</h2>
+<div class="product-price">{money(product['price'])}</div>
+<div class="product-rating">{product['rating']:.1f} out of 5</div>
+<form method="post" action="/cart/add">
+<input type="hidden" name="sku" value="{escape(product['sku'])}">
+<input type="hidden" name="next" value="{escape(back_to)}">
+<button type="submit">Add to Cart</button>
+</form>
+</div>"""
+        for product in products
+    )
+    if not products:
+        items = '<p class="no-results">No products found</p>'
+    body = f"""<form method="get" action="/products" id="filters">
+<input type="search" name="search" value="{escape(query.get('search', ''))}" placeholder="Search products">
+<button type="submit">Search</button>
+<select name="category">{_options(category_choices, query.get('category', ''))}</select>
+<input type="number" name="price_min" value="{escape(query.get('price_min', ''))}" placeholder="Min price">
+<input type="number" name="price_max" value="{escape(query.get('price_max', ''))}" placeholder="Max price">
+<button type="submit">Apply Filters</button>
+<select name="sort" onchange="this.form.submit()">{_options(SORT_OPTIONS, query.get('sort', ''))}</select>
+</form>
+<div class="product-list">{items}</div>"""
+    return layout("Products", body, user)
+
+
+def product_detail_page(product: dict, user: Optional[str]) -> str:
+    """Render a product detail page."""
+    body = f"""<div class="product-detail" data-sku="{escape(product['sku'])}">
+<img class="product-image" src="/static/img/{quote(product['sku'])}.svg" alt="">
+<p class="product-price">{money(product['price'])}</p>
+<p class="product-rating">{product['rating']:.1f} out of 5</p>
+<form method="post" action="/cart/add">
+<input type="hidden" name="sku" value="{escape(product['sku'])}">
+<input type="hidden" name="next" value="/product/{quote(product['sku'])}">
+<button type="submit">Add to Cart</button>
+</form>
+</div>"""
+    return layout(product["title"], body, user)
+
+
+def _totals(totals: Dict[str, Decimal], shipping: bool = False) -> str:
+    """Render the cart totals."""
+    shipping_row = f'<p>Shipping: <span class="shipping">{money(totals["shipping"])}</span></p>' if shipping else ""
+    return f"""<p>Subtotal: <span class="subtotal">{money(totals['subtotal'])}</span></p>
+<p>Tax: <span class="tax">{money(totals['tax'])}</span></p>
+{shipping_row}<p>Total: <span class="total">{money(totals['total'])}</span></p>"""
+
+
+def cart_page(lines: List[dict], totals: Dict[str, Decimal], user: Optional[str]) -> str:
+    """Render the shopping cart."""
+    items = "".join(
+        f"""<div class="cart-item" data-sku="{escape(line['sku'])}">
+<span class="item-title">{escape(line['title'])}</span>
+<span class="item-price">{money(line['price'])}</span>
+x <span class="item-quantity">{line['quantity']}</span>
+= <span class="item-total">{money(line['line_total'])}</span>
+<form method="post" action="/cart/update">
+<input type="hidden" name="sku" value="{escape(line['sku'])}">
+<input type="number" name="quantity" value="{line['quantity']}" min="0">
+<button type="submit">Update</button>
+</form>
+<form method="post" action="/cart/remove">
+<input type="hidden" name="sku" value="{escape(line['sku'])}">
+<button type="submit">Remove</button>
+</form>
+</div>"""
+        for line in lines
+    )
+    if not lines:
+        items = '<p class="empty-cart-message">Your cart is empty</p>'
+    body = f"""<div class="cart-items">{items}</div>
+<div class="cart-totals">{_totals(totals)}</div>
+<form method="get" action="/checkout"><button type="submit">Proceed to Checkout</button></form>
+<form method="get" action="/products"><button type="submit">Continue Shopping</button></form>"""
+    return layout("Shopping Cart", body, user)
+
+
+def checkout_page(
+    lines: List[dict],
+    totals: Dict[str, Decimal],
+    form: Dict[str, str],
+    user: Optional[str],
+    error: Optional[str] = None,
+) -> str:
+    """Render the checkout form with the order summary."""
+
+    def field(name: str, label: str, input_type: str = "text") -> str:
+        return (
+            f'<label>{label} <input type="{input_type}" name="{name}" '
+            f'value="{escape(form.get(name, ""))}"></label>'
+        )
+
+    shipping_methods = {method: method.title() for method in SHIPPING_METHODS}
+    summary_lines = "".join(
+        f"<li>{escape(line['title'])} x {line['quantity']}: {money(line['line_total'])}</li>"
+        for line in lines
+    )
+    body = f"""{alerts(error)}
+<form method="post" action="/checkout" id="checkout" novalidate>
+<fieldset><legend>Shipping address</legend>
+{field("first_name", "First name")}
+{field("last_name", "Last name")}
+{field("email", "Email", "email")}
+{field("phone", "Phone", "tel")}
+{field("address", "Address")}
+{field("city", "City")}
+{field("state", "State")}
+{field("zip", "ZIP code")}
+<label>Country <select name="country">{_options(COUNTRIES, form.get("country", "US"))}</select></label>
+</fieldset>
+<fieldset><legend>Shipping method</legend>
+<select name="shipping_method">{_options(shipping_methods, form.get("shipping_method", "standard"))}</select>
+</fieldset>
+<fieldset><legend>Payment</legend>
+{field("card_number", "Card number")}
+{field("expiry", "Expiry (MM/YY)")}
+{field("cvv", "CVV")}
+</fieldset>
+<button type="submit">Place Order</button>
+</form>
+<form method="get" action="/cart"><button type="submit">Back to Cart</button></form>
+<aside class="order-summary">
+<h2>Order summary</h2>
+<ul>{summary_lines or "<li>No items</li>"}</ul>
+{_totals(totals, shipping=True)}
+</aside>"""
+    return layout("Checkout", body, user)
+
+
+def confirmation_page(order: str, user: Optional[str]) -> str:
+    """Render the order confirmation."""
+    body = alerts(success=f"Order placed successfully. Your order number is {order}.")
+    return layout("Order Confirmation", body, user)
+
+
+def product_image(sku: str) -> str:
+    """Render a small placeholder product image."""
+    return f"""<svg xmlns="http://www.w3.org/2000/svg" width="64" height="64" viewBox="0 0 64 64">
+<rect width="64" height="64" fill="#ccd"/><text x="4" y="36" font-size="8">{escape(sku)}</text></svg>"""
@@ -0,0 +1,13 @@
+"""
+Load generation with the page objects as virtual users.
+
+Runs the login, search, add-to-cart and checkout flow the functional tests
+exercise as concurrent virtual users spread over worker processes, and
+reports per-step latency percentiles.
+"""
+
+from loadgen.flows import STEPS, UserSettings
+from loadgen.histogram import LatencyHistogram
+from loadgen.runner import LoadSettings, run
+
+__all__ = ["STEPS", "LatencyHistogram", "LoadSettings", "UserSettings", "run"]
@@ -0,0 +1,91 @@
+"""
+Run virtual users from the command line.
+
+Usage:
+    python -m loadgen --users 20 --processes 4 --ramp-up 10 --think 0.5 2
+    python -m loadgen --fake-app --users 5 --iterations 3
+"""
+
+import argparse
+import os
+import time
+
+from loadgen.flows import UserSettings
+from loadgen.runner import LoadSettings, format_summary, run
+from pages.base_page import get_base_url
+from utils.auth_state import load_personas
+
+PERSONAS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "test_users.json"
+)
+
+
+def parse_args():
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10, help="number of virtual users")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--iterations", type=int, default=1, help="flows per user")
+    parser.add_argument("--duration", type=float, help="keep each user busy this many seconds instead")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="seconds until all users have started")
+    parser.add_argument(
+        "--think", type=float, nargs=2, default=(0.0, 0.0), metavar=("MIN", "MAX"), help="think time between steps"
+    )
+    parser.add_argument("--search", default="Laptop", help="search term used by the flow")
+    parser.add_argument("--persona", default="default", help="user persona from fixtures/test_users.json")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between streamed histograms")
+    parser.add_argument("--output", default=os.path.join("reports", "loadgen.jsonl"), help="JSONL output file")
+    parser.add_argument("--base-url", help="application URL (defaults to BASE_URL)")
+    parser.add_argument("--fake-app", action="store_true", help="run against the bundled fake storefront")
+    parser.add_argument("--browser", default="chromium", help="browser to launch")
+    parser.add_argument("--headed", action="store_true", help="show the browsers")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the think times")
+    return parser.parse_args()
+
+
+def main():
+    """Generate the load and print the per-step latencies."""
+    args = parse_args()
+    credentials = load_personas(PERSONAS_PATH)[args.persona]
+    user = UserSettings(
+        email=credentials["email"],
+        password=credentials["password"],
+        search=args.search,
+        iterations=args.iterations,
+        duration=args.duration,
+        think_min=args.think[0],
+        think_max=args.think[1],
+    )
+
+    fake_app = None
+    if args.fake_app:
+        from fake_app import FakeApp
+
+        fake_app = FakeApp().start()
+    base_url = fake_app.url if fake_app else args.base_url or get_base_url()
+    settings = LoadSettings(
+        base_url=base_url,
+        user=user,
+        users=args.users,
+        processes=args.processes,
+        ramp_up=args.ramp_up,
+        interval=args.interval,
+        browser=args.browser,
+        headless=not args.headed,
+        seed=args.seed,
+    )
+
+    started = time.monotonic()
+    try:
+        totals = run(settings, args.output)
+    finally:
+        if fake_app is not None:
+            fake_app.stop()
+    seconds = time.monotonic() - started
+    print(f"{args.users} users on {base_url} in {seconds:.1f}s, histograms in {args.output}")
+    for line in format_summary(totals, seconds):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
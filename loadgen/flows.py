@@ -0,0 +1,120 @@
+"""
+The virtual user flow, built from the async page objects.
+
+Each iteration opens a fresh context, logs in, searches, adds the first
+result to the cart and checks out, timing every step. A failed step is
+counted as an error and ends the iteration, since the page is then in an
+unknown state.
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from playwright.async_api import Browser
+
+from pages.aio import AsyncCheckoutPage, AsyncLoginPage, AsyncProductPage
+
+STEPS = ("login", "search", "add_to_cart", "checkout")
+
+# Passes the fake storefront's validation (see fake_app/store.py)
+CHECKOUT_DETAILS = {
+    "first_name": "Load",
+    "last_name": "Tester",
+    "email": "load.tester@example.com",
+    "phone": "555-1234",
+    "address": "1 Test Street",
+    "city": "New York",
+    "state": "NY",
+    "zip_code": "10001",
+    "card_number": "4111111111111111",
+    "expiry": "12/30",
+    "cvv": "123",
+}
+
+
+@dataclass(frozen=True)
+class UserSettings:
+    """What every virtual user does."""
+
+    email: str
+    password: str
+    search: str = "Laptop"
+    iterations: int = 1
+    # Keep iterating until this many seconds after the user started (overrides iterations)
+    duration: Optional[float] = None
+    think_min: float = 0.0
+    think_max: float = 0.0
+
+
+async def run_user(
+    browser: Browser,
+    user_index: int,
+    settings: UserSettings,
+    record: Callable[[str, Optional[float]], None],
+    seed: int = 0,
+) -> None:
+    """Run one virtual user's iterations.
+
+    ``record(step, ms)`` is called after every step, with ``ms`` None when
+    the step failed.
+    """
+    rng = random.Random(seed * 100003 + user_index)
+    started = time.monotonic()
+    iteration = 0
+    while (
+        time.monotonic() - started < settings.duration
+        if settings.duration is not None
+        else iteration < settings.iterations
+    ):
+        iteration += 1
+        context = await browser.new_context()
+        try:
+            await _iteration(await context.new_page(), settings, record, rng)
+        finally:
+            await context.close()
+
+
+async def _iteration(page, settings: UserSettings, record, rng: random.Random) -> None:
+    """Run the steps of one iteration."""
+    login_page = AsyncLoginPage(page)
+    product_page = AsyncProductPage(page)
+    checkout_page = AsyncCheckoutPage(page)
+
+    async def login():
+        await login_page.navigate()
+        await login_page.login(settings.email, settings.password)
+        if page.url.rstrip("/").endswith("/login"):
+            raise AssertionError(f"Login failed: {await login_page.get_error_message()}")
+
+    async def search():
+        await product_page.navigate()
+        await product_page.search_product(settings.search)
+        if not await product_page.get_product_count():
+            raise AssertionError(f"No products found for {settings.search!r}")
+
+    async def checkout():
+        await checkout_page.navigate()
+        await checkout_page.complete_checkout(**CHECKOUT_DETAILS)
+        if not await checkout_page.get_success_message():
+            raise AssertionError(f"Checkout failed: {await checkout_page.get_error_message()}")
+
+    steps = (login, search, product_page.add_first_product_to_cart, checkout)
+    for name, step in zip(STEPS, steps):
+        if not await _timed(name, step, record):
+            return
+        await asyncio.sleep(rng.uniform(settings.think_min, settings.think_max))
+
+
+async def _timed(name: str, step: Callable[[], Awaitable[None]], record) -> bool:
+    """Run and time a step; returns whether it succeeded."""
+    started = time.perf_counter()
+    try:
+        await step()
+    except Exception:
+        record(name, None)
+        return False
+    record(name, (time.perf_counter() - started) * 1000)
+    return True
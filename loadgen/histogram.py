@@ -0,0 +1,85 @@
+"""
+Latency histograms with logarithmic buckets.
+
+A sample lands in the bucket ``ceil(log(ms) / log(GROWTH))``, so percentiles
+are accurate to about 2% whatever the latency range, the memory use does not
+grow with the number of samples, and histograms from several processes merge
+by adding up their bucket counts.
+"""
+
+import math
+from typing import Dict
+
+GROWTH = 1.02
+# Latencies below this are counted in the lowest bucket
+_MIN_MS = 0.01
+
+
+class LatencyHistogram:
+    """Counts latencies in logarithmic buckets; failures are counted but not timed."""
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms: float) -> None:
+        """Count a successful step that took ``ms`` milliseconds."""
+        bucket = math.ceil(math.log(max(ms, _MIN_MS)) / math.log(GROWTH))
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def record_error(self) -> None:
+        """Count a failed step."""
+        self.errors += 1
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add another histogram's samples to this one."""
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += other.count
+        self.errors += other.errors
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentile(self, percent: float) -> float:
+        """Get the latency (upper bucket bound, in ms) below which ``percent`` % of samples fall."""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(GROWTH ** bucket, self.max_ms)
+        return self.max_ms
+
+    @property
+    def mean_ms(self) -> float:
+        """Get the mean latency of the successful steps."""
+        return self.total_ms / self.count if self.count else 0.0
+
+    def to_dict(self) -> dict:
+        """Get a JSON-friendly representation."""
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": self.total_ms,
+            "max_ms": self.max_ms,
+            "buckets": {str(bucket): count for bucket, count in sorted(self.buckets.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        """Rebuild a histogram from ``to_dict`` output."""
+        histogram = cls()
+        histogram.buckets = {int(bucket): count for bucket, count in data["buckets"].items()}
+        histogram.count = data["count"]
+        histogram.errors = data["errors"]
+        histogram.total_ms = data["total_ms"]
+        histogram.max_ms = data["max_ms"]
+        return histogram
@@ -0,0 +1,171 @@
+"""
+Runs virtual users across worker processes and collects their latencies.
+
+Users are spread round-robin over the worker processes; each process runs
+its users concurrently on one asyncio loop, one browser context per user,
+and starts user ``i`` after ``i * ramp_up / users`` seconds. Processes send
+their per-step histograms to the parent every interval, and the parent
+appends one JSONL record per step and interval, then a total per step.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import time
+import traceback
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from loadgen.flows import STEPS, UserSettings, run_user
+from loadgen.histogram import LatencyHistogram
+
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass(frozen=True)
+class LoadSettings:
+    """How much load to generate, and where."""
+
+    base_url: str
+    user: UserSettings
+    users: int = 1
+    processes: int = 1
+    ramp_up: float = 0.0
+    interval: float = 5.0
+    browser: str = "chromium"
+    headless: bool = True
+    seed: int = 0
+
+
+def run(settings: LoadSettings, output_path: str) -> Dict[str, LatencyHistogram]:
+    """Generate the load, stream the histograms to ``output_path`` and return the totals per step."""
+    processes = max(1, min(settings.processes, settings.users))
+    # Playwright does not survive a fork, so workers start from scratch
+    mp_context = multiprocessing.get_context("spawn")
+    messages = mp_context.Queue()
+    workers = [
+        mp_context.Process(
+            target=worker_main,
+            args=(index, list(range(index, settings.users, processes)), settings, messages),
+            name=f"loadgen-{index}",
+        )
+        for index in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+
+    totals = {step: LatencyHistogram() for step in STEPS}
+    errors: List[str] = []
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "w") as output:
+        started = time.monotonic()
+        interval = {step: LatencyHistogram() for step in STEPS}
+        next_flush = started + settings.interval
+        running = len(workers)
+        while running:
+            try:
+                kind, payload = messages.get(timeout=max(0.0, next_flush - time.monotonic()))
+            except queue.Empty:
+                kind, payload = None, None
+                if not any(worker.is_alive() for worker in workers):
+                    errors.append("A worker process exited without reporting back")
+                    running = 0
+            if kind == "stats":
+                for step, data in payload.items():
+                    interval[step].merge(LatencyHistogram.from_dict(data))
+            elif kind == "error":
+                errors.append(payload)
+            elif kind == "done":
+                running -= 1
+            if time.monotonic() >= next_flush or not running:
+                _write(output, "interval", time.monotonic() - started, interval)
+                for step, histogram in interval.items():
+                    totals[step].merge(histogram)
+                interval = {step: LatencyHistogram() for step in STEPS}
+                next_flush += settings.interval
+        _write(output, "total", time.monotonic() - started, totals)
+
+    for worker in workers:
+        worker.join()
+    if errors:
+        raise RuntimeError("Load generation failed:\n" + "\n".join(errors))
+    return totals
+
+
+def worker_main(index: int, user_indexes: List[int], settings: LoadSettings, messages) -> None:
+    """Entry point of a worker process."""
+    try:
+        # Page objects take the application URL from the environment
+        os.environ["BASE_URL"] = settings.base_url
+        asyncio.run(_run_worker(user_indexes, settings, messages))
+    except Exception:
+        messages.put(("error", f"worker {index}: {traceback.format_exc()}"))
+    finally:
+        messages.put(("done", None))
+
+
+async def _run_worker(user_indexes: List[int], settings: LoadSettings, messages) -> None:
+    """Run a worker's users and report their histograms every interval."""
+    from playwright.async_api import async_playwright
+
+    histograms = {step: LatencyHistogram() for step in STEPS}
+
+    def record(step: str, ms: Optional[float]) -> None:
+        if ms is None:
+            histograms[step].record_error()
+        else:
+            histograms[step].record(ms)
+
+    def flush() -> None:
+        messages.put(("stats", {step: histogram.to_dict() for step, histogram in histograms.items()}))
+        for step in STEPS:
+            histograms[step] = LatencyHistogram()
+
+    async def user(user_index: int) -> None:
+        await asyncio.sleep(user_index * settings.ramp_up / settings.users)
+        await run_user(browser, user_index, settings.user, record, settings.seed)
+
+    async with async_playwright() as playwright:
+        browser = await getattr(playwright, settings.browser).launch(headless=settings.headless)
+        users = asyncio.gather(*(user(user_index) for user_index in user_indexes))
+        while not users.done():
+            await asyncio.wait([users], timeout=settings.interval)
+            flush()
+        await users
+        await browser.close()
+
+
+def _write(output, kind: str, elapsed: float, histograms: Dict[str, LatencyHistogram]) -> None:
+    """Append one JSONL record per step."""
+    for step, histogram in histograms.items():
+        record = {
+            "type": kind,
+            "elapsed": round(elapsed, 3),
+            "step": step,
+            "count": histogram.count,
+            "errors": histogram.errors,
+            **{f"p{percent}": round(histogram.percentile(percent), 1) for percent in PERCENTILES},
+            "histogram": histogram.to_dict()["buckets"],
+        }
+        output.write(json.dumps(record) + "\n")
+    output.flush()
+
+
+def format_summary(totals: Dict[str, LatencyHistogram], seconds: float) -> List[str]:
+    """Format the totals as a table."""
+    lines = [
+        f"{'step':<12}{'count':>8}{'errors':>8}{'per s':>8}{'mean':>9}"
+        + "".join(f"{f'p{percent}':>9}" for percent in PERCENTILES)
+        + f"{'max':>9}"
+    ]
+    for step, histogram in totals.items():
+        lines.append(
+            f"{step:<12}{histogram.count:>8}{histogram.errors:>8}{histogram.count / seconds:>8.2f}"
+            f"{histogram.mean_ms:>9.0f}"
+            + "".join(f"{histogram.percentile(percent):>9.0f}" for percent in PERCENTILES)
+            + f"{histogram.max_ms:>9.0f}"
+        )
+    lines.append("latencies in ms")
+    return lines
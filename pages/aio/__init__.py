@@ -0,0 +1,14 @@
+"""
+Async Page Object Models for the ecommerce application.
+
+They mirror the sync page objects in ``pages`` and share their locators, so
+many pages can be driven concurrently from one process with asyncio.
+"""
+
+from pages.aio.base_page import AsyncBasePage
+from pages.aio.login_page import AsyncLoginPage
+from pages.aio.product_page import AsyncProductPage
+from pages.aio.cart_page import AsyncCartPage
+from pages.aio.checkout_page import AsyncCheckoutPage
+
+__all__ = ["AsyncBasePage", "AsyncLoginPage", "AsyncProductPage", "AsyncCartPage", "AsyncCheckoutPage"]
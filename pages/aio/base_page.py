@@ -0,0 +1,211 @@
+"""
+Async Base Page class containing common methods for all async page objects.
+
+The methods mirror BasePage one for one. They cannot be shared: a sync
+method cannot await, and an async one cannot call Playwright's sync API,
+so every step that touches the page exists twice. What does not touch the
+page is shared instead: the locators and class defaults (``shares_locators``),
+the in-page scripts and form helpers (``pages.scripts``), the readiness
+conditions and the navigation hooks.
+"""
+
+import inspect
+import time
+from typing import Dict, List, Optional, Union
+from playwright.async_api import Locator, Page, TimeoutError as PlaywrightTimeoutError
+from pages.base_page import (
+    BasePage,
+    READINESS_BASELINE,
+    VALIDATION_ERROR_TIMEOUT_MS,
+    get_base_url,
+    navigation_hooks,
+)
+from pages.readiness import ReadyCondition, measure_async
+from pages.scripts import (
+    BROWSER_VALIDATION_SCRIPT,
+    EXTRACT_ITEMS_SCRIPT,
+    FILL_FORM_SCRIPT,
+    RESET_FORM_SCRIPT,
+    is_select,
+    record_form_fill,
+)
+from utils.resource_policy import use_page_rules
+
+# A selector declared on a page object class, or a Locator built from one
+Target = Union[str, Locator]
+
+
+def shares_locators(sync_page_class):
+    """Copy the locators and readiness condition of a sync page object.
+
+    Locators are declared once, on the sync page object, and the async
+    variant picks up every upper-case class attribute from it. It also
+    checks that every public method of the sync page object has an async
+    counterpart, so the two APIs cannot drift apart.
+    """
+
+    def decorator(async_page_class):
+        for klass in reversed(sync_page_class.__mro__):
+            for name, value in vars(klass).items():
+                if name.isupper():
+                    setattr(async_page_class, name, value)
+        missing = [
+            name
+            for name in dir(sync_page_class)
+            if not name.startswith("_")
+            and callable(getattr(sync_page_class, name))
+            and not hasattr(async_page_class, name)
+        ]
+        if missing:
+            raise TypeError(f"{async_page_class.__name__} is missing {', '.join(sorted(missing))}")
+        async_page_class.sync_page_class = sync_page_class
+        return async_page_class
+
+    return decorator
+
+
+# READY, RESOURCE_POLICY and the FORM defaults come from BasePage
+@shares_locators(BasePage)
+class AsyncBasePage:
+    """Base class for all async page objects."""
+
+    def __init__(self, page: Page):
+        """Initialize the page object with an async Playwright Page instance."""
+        self.page = page
+        self.base_url = get_base_url()
+
+    async def navigate(self, path: str = ""):
+        """Navigate to a specific path and wait until the page is ready."""
+        url = f"{self.base_url}{path}"
+        await self.wait_until_ready(lambda: self.page.goto(url, wait_until="commit"))
+        for hook in navigation_hooks():
+            result = hook(self, path)
+            if inspect.isawaitable(result):
+                await result
+
+    async def wait_until_ready(self, action, ready: Optional[ReadyCondition] = None) -> None:
+        """Run an async action and wait for a readiness condition (default: READY)."""
+        use_page_rules(self.page, self.RESOURCE_POLICY)
+        await measure_async(
+            self.page,
+            self.sync_page_class.__name__,
+            ready or self.READY,
+            action,
+            baseline=READINESS_BASELINE,
+        )
+
+    def locator(self, target: Target) -> Locator:
+        """Bind a selector to the page; the Locator finds its element again on every action."""
+        return target if isinstance(target, Locator) else self.page.locator(target)
+
+    async def fill(self, target: Target, text: str) -> None:
+        """Fill a text input field."""
+        await self.locator(target).fill(text)
+
+    async def fill_form(self, fields: Dict[str, str], form_name: str = "form") -> None:
+        """Fill a whole form, mapping field selectors to values, in one round trip."""
+        started = time.perf_counter()
+        pending = await self.page.evaluate(FILL_FORM_SCRIPT, list(fields.items()))
+        for selector, tag_name in pending:
+            if is_select(selector, tag_name):
+                await self.select_option(selector, fields[selector])
+            else:
+                await self.fill(selector, fields[selector])
+        record_form_fill(
+            f"{type(self).__name__}.{form_name}", len(fields), len(pending), time.perf_counter() - started
+        )
+
+    async def submit_form(self, fields: Dict[str, str], form_name: str = "form") -> str:
+        """Fill FORM and submit it with its own button; returns the error the page shows ("" if accepted)."""
+        form = self.locator(self.FORM)
+        await form.evaluate(RESET_FORM_SCRIPT, self.ERROR_MESSAGE)
+        await self.fill_form(fields, form_name)
+        blocked = await form.evaluate(BROWSER_VALIDATION_SCRIPT)
+        error = self.locator(self.ERROR_MESSAGE).first
+        if blocked is not None:
+            # Nothing is sent, but the page's own handlers see the attempt
+            await self.click(self.FORM_SUBMIT)
+            return ((await self.get_text(error)).strip() if await self.is_visible(error) else "") or blocked
+        await self.wait_until_ready(lambda: self.click(self.FORM_SUBMIT), self.SUBMITTED)
+        try:
+            await error.wait_for(timeout=VALIDATION_ERROR_TIMEOUT_MS)
+        except PlaywrightTimeoutError:
+            return ""
+        return (await self.get_text(error)).strip()
+
+    async def run_validation_cases(self, cases: Dict[str, Dict[str, str]]) -> Dict[str, str]:
+        """Submit FORM once per case through the page's own form; returns each case's error message."""
+        errors = {}
+        for name, fields in cases.items():
+            if not await self.is_visible(self.FORM):
+                await self.navigate()
+            errors[name] = await self.submit_form(
+                {self.FORM_FIELDS[field]: value for field, value in fields.items()}, "validation"
+            )
+        return errors
+
+    async def click(self, target: Target) -> None:
+        """Click on an element."""
+        await self.locator(target).click()
+
+    async def get_text(self, target: Target) -> str:
+        """Get text content of an element."""
+        return await self.locator(target).text_content() or ""
+
+    async def is_visible(self, target: Target) -> bool:
+        """Check if an element is visible."""
+        return await self.locator(target).is_visible()
+
+    async def is_enabled(self, target: Target) -> bool:
+        """Check if an element is enabled."""
+        return await self.locator(target).is_enabled()
+
+    async def count(self, target: Target) -> int:
+        """Count the elements matching a selector."""
+        return await self.locator(target).count()
+
+    async def wait_for_element(self, target: Target, timeout: int = 5000) -> None:
+        """Wait for an element to be visible."""
+        await self.locator(target).wait_for(timeout=timeout)
+
+    async def get_attribute(self, target: Target, attribute: str) -> str:
+        """Get an attribute value from an element."""
+        return await self.locator(target).get_attribute(attribute) or ""
+
+    async def extract_items(self, items: Target, fields: Dict[str, str]) -> List[Dict[str, str]]:
+        """Read named fields from every item matching a selector in one round trip."""
+        return await self.locator(items).evaluate_all(EXTRACT_ITEMS_SCRIPT, fields)
+
+    async def select_option(self, target: Target, value: str) -> None:
+        """Select an option from a dropdown."""
+        await self.locator(target).select_option(value)
+
+    def get_url(self) -> str:
+        """Get the current page URL."""
+        return self.page.url
+
+    async def wait_for_navigation(self, ready: Optional[ReadyCondition] = None) -> None:
+        """Wait for a navigation to load and for a readiness condition (default: READY)."""
+        await self.wait_until_ready(
+            lambda: self.page.wait_for_load_state("domcontentloaded"), ready
+        )
+
+    async def refresh(self) -> None:
+        """Refresh the current page."""
+        await self.page.reload()
+
+    async def go_back(self) -> None:
+        """Navigate back to the previous page."""
+        await self.page.go_back()
+
+    async def get_title(self) -> str:
+        """Get the page title."""
+        return await self.page.title()
+
+    def accept_alert(self) -> None:
+        """Accept a JavaScript alert."""
+        self.page.on("dialog", lambda dialog: dialog.accept())
+
+    def dismiss_alert(self) -> None:
+        """Dismiss a JavaScript alert."""
+        self.page.on("dialog", lambda dialog: dialog.dismiss())
@@ -0,0 +1,84 @@
+"""
+Async Shopping Cart Page Object Model.
+"""
+
+from typing import List
+from pages.aio.base_page import AsyncBasePage, shares_locators
+from pages.cart_page import CartPage
+from pages.readiness import LoadStateReady, UrlReady
+from pages.records import CartItemRecord
+
+
+@shares_locators(CartPage)
+class AsyncCartPage(AsyncBasePage):
+    """Async page object for the shopping cart page."""
+
+    async def navigate(self):
+        """Navigate to the cart page."""
+        await super().navigate("/cart")
+
+    async def get_cart_item_count(self) -> int:
+        """Get the number of items in the cart."""
+        return await self.count(self.CART_ITEMS)
+
+    async def get_subtotal(self) -> str:
+        """Get the subtotal amount."""
+        return await self.get_text(self.SUBTOTAL)
+
+    async def get_tax(self) -> str:
+        """Get the tax amount."""
+        return await self.get_text(self.TAX)
+
+    async def get_total(self) -> str:
+        """Get the total amount."""
+        return await self.get_text(self.TOTAL)
+
+    async def remove_first_item(self) -> None:
+        """Remove the first item from the cart."""
+        remove_button = self.locator(self.CART_ITEMS).first.locator(self.REMOVE_BUTTON)
+        if await remove_button.count():
+            await self.wait_until_ready(remove_button.click, self.CART_UPDATED)
+
+    async def update_item_quantity(self, item_index: int, new_quantity: str) -> None:
+        """Update the quantity of a specific item."""
+        item = self.locator(self.CART_ITEMS).nth(item_index)
+        if await item.count():
+            await self.fill(item.locator(self.QUANTITY_INPUT), new_quantity)
+            await self.wait_until_ready(item.locator(self.UPDATE_QUANTITY_BUTTON).click, self.CART_UPDATED)
+
+    async def is_cart_empty(self) -> bool:
+        """Check if the cart is empty."""
+        return await self.is_visible(self.EMPTY_CART_MESSAGE)
+
+    async def click_checkout(self) -> None:
+        """Click the checkout button."""
+        await self.click(self.CHECKOUT_BUTTON)
+        await self.wait_for_navigation(UrlReady("**/checkout*"))
+
+    async def click_continue_shopping(self) -> None:
+        """Click the continue shopping button."""
+        await self.click(self.CONTINUE_SHOPPING_BUTTON)
+        await self.wait_for_navigation(LoadStateReady("domcontentloaded"))
+
+    async def get_items(self) -> List[CartItemRecord]:
+        """Get all items in the cart, read from the page in one round trip."""
+        rows = await self.extract_items(
+            self.CART_ITEMS,
+            {
+                "title": self.ITEM_TITLE,
+                "price_text": self.ITEM_PRICE,
+                "quantity_text": self.ITEM_QUANTITY,
+                "line_total_text": self.ITEM_TOTAL,
+            },
+        )
+        return [CartItemRecord(**row) for row in rows]
+
+    async def get_first_item_price(self) -> str:
+        """Get the price of the first item in the cart."""
+        items = await self.get_items()
+        return items[0].price_text if items else ""
+
+    async def get_first_item_quantity(self) -> str:
+        """Get the quantity of the first item in the cart."""
+        items = await self.get_items()
+        return items[0].quantity_text if items else ""
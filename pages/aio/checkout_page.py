@@ -0,0 +1,101 @@
+"""
+Async Checkout Page Object Model.
+"""
+
+from pages.aio.base_page import AsyncBasePage, shares_locators
+from pages.checkout_page import CheckoutPage
+from pages.readiness import UrlReady
+
+
+@shares_locators(CheckoutPage)
+class AsyncCheckoutPage(AsyncBasePage):
+    """Async page object for the checkout page."""
+
+    # Field mappings do no I/O, so they are shared with the sync page object
+    _shipping_fields = CheckoutPage._shipping_fields
+    _payment_fields = CheckoutPage._payment_fields
+
+    async def navigate(self):
+        """Navigate to the checkout page."""
+        await super().navigate("/checkout")
+
+    async def fill_shipping_address(
+        self,
+        first_name: str,
+        last_name: str,
+        email: str,
+        phone: str,
+        address: str,
+        city: str,
+        state: str,
+        zip_code: str,
+        country: str = "US",
+    ) -> None:
+        """Fill in the shipping address form."""
+        await self.fill_form(
+            self._shipping_fields(
+                first_name, last_name, email, phone, address, city, state, zip_code, country
+            ),
+            "shipping",
+        )
+
+    async def fill_payment_info(self, card_number: str, expiry: str, cvv: str) -> None:
+        """Fill in the payment information."""
+        await self.fill_form(self._payment_fields(card_number, expiry, cvv), "payment")
+
+    async def select_shipping_method(self, method: str) -> None:
+        """Select a shipping method."""
+        await self.select_option(self.SHIPPING_METHOD, method)
+
+    async def place_order(self) -> None:
+        """Click the place order button."""
+        await self.wait_until_ready(lambda: self.click(self.PLACE_ORDER_BUTTON), self.SUBMITTED)
+
+    async def click_back_to_cart(self) -> None:
+        """Click the back to cart button."""
+        await self.click(self.BACK_TO_CART_BUTTON)
+        await self.wait_for_navigation(UrlReady("**/cart*"))
+
+    async def get_error_message(self) -> str:
+        """Get error message if checkout fails."""
+        if await self.is_visible(self.ERROR_MESSAGE):
+            return await self.get_text(self.ERROR_MESSAGE)
+        return ""
+
+    async def get_success_message(self) -> str:
+        """Get success message after order placement."""
+        if await self.is_visible(self.SUCCESS_MESSAGE):
+            return await self.get_text(self.SUCCESS_MESSAGE)
+        return ""
+
+    async def is_order_summary_visible(self) -> bool:
+        """Check if the order summary is visible."""
+        return await self.is_visible(self.ORDER_SUMMARY)
+
+    async def has_order_items(self) -> bool:
+        """Check if the order summary lists any items."""
+        return await self.is_order_summary_visible() and not await self.is_visible(self.EMPTY_ORDER_SUMMARY)
+
+    async def complete_checkout(
+        self,
+        first_name: str,
+        last_name: str,
+        email: str,
+        phone: str,
+        address: str,
+        city: str,
+        state: str,
+        zip_code: str,
+        card_number: str,
+        expiry: str,
+        cvv: str,
+        shipping_method: str = "standard",
+    ) -> None:
+        """Complete the entire checkout process."""
+        fields = self._shipping_fields(
+            first_name, last_name, email, phone, address, city, state, zip_code
+        )
+        fields[self.SHIPPING_METHOD] = shipping_method
+        fields.update(self._payment_fields(card_number, expiry, cvv))
+        await self.fill_form(fields, "checkout")
+        await self.place_order()
@@ -0,0 +1,55 @@
+"""
+Async Login Page Object Model.
+"""
+
+from pages.aio.base_page import AsyncBasePage, shares_locators
+from pages.login_page import LoginPage
+from pages.readiness import UrlReady
+
+
+@shares_locators(LoginPage)
+class AsyncLoginPage(AsyncBasePage):
+    """Async page object for the login page."""
+
+    async def navigate(self):
+        """Navigate to the login page."""
+        await super().navigate("/login")
+
+    async def login(self, email: str, password: str) -> None:
+        """Perform login with given credentials."""
+        await self.fill_form({self.EMAIL_INPUT: email, self.PASSWORD_INPUT: password}, "login")
+        await self.wait_until_ready(lambda: self.click(self.LOGIN_BUTTON), self.SUBMITTED)
+
+    async def get_error_message(self) -> str:
+        """Retrieve error message from login attempt."""
+        if await self.is_visible(self.ERROR_MESSAGE):
+            return await self.get_text(self.ERROR_MESSAGE)
+        return ""
+
+    async def get_success_message(self) -> str:
+        """Retrieve success message after login."""
+        if await self.is_visible(self.SUCCESS_MESSAGE):
+            return await self.get_text(self.SUCCESS_MESSAGE)
+        return ""
+
+    async def click_register_link(self) -> None:
+        """Click on the register link."""
+        await self.click(self.REGISTER_LINK)
+        await self.wait_for_navigation(UrlReady("**/register*"))
+
+    async def click_forgot_password(self) -> None:
+        """Click on the forgot password link."""
+        await self.click(self.FORGOT_PASSWORD_LINK)
+        await self.wait_for_navigation(UrlReady("**/forgot-password*"))
+
+    async def is_login_button_enabled(self) -> bool:
+        """Check if the login button is enabled."""
+        return await self.is_enabled(self.LOGIN_BUTTON)
+
+    async def is_email_field_visible(self) -> bool:
+        """Check if email input field is visible."""
+        return await self.is_visible(self.EMAIL_INPUT)
+
+    async def is_password_field_visible(self) -> bool:
+        """Check if password input field is visible."""
+        return await self.is_visible(self.PASSWORD_INPUT)
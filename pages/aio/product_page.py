@@ -0,0 +1,86 @@
+"""
+Async Product Page Object Model.
+"""
+
+from typing import List
+from pages.aio.base_page import AsyncBasePage, shares_locators
+from pages.product_page import ProductPage
+from pages.readiness import LoadStateReady
+from pages.records import ProductRecord
+
+
+@shares_locators(ProductPage)
+class AsyncProductPage(AsyncBasePage):
+    """Async page object for the product listing and details page."""
+
+    async def navigate(self):
+        """Navigate to the products page."""
+        await super().navigate("/products")
+
+    async def search_product(self, product_name: str) -> None:
+        """Search for a product by name."""
+        await self.fill(self.SEARCH_INPUT, product_name)
+        await self.wait_until_ready(lambda: self.click(self.SEARCH_BUTTON), self.LISTING_UPDATED)
+
+    async def get_product_count(self) -> int:
+        """Get the number of products displayed."""
+        return await self.count(self.PRODUCT_ITEMS)
+
+    async def get_products(self) -> List[ProductRecord]:
+        """Get all displayed products, read from the page in one round trip."""
+        rows = await self.extract_items(
+            self.PRODUCT_ITEMS,
+            {
+                "title": self.PRODUCT_TITLE,
+                "price_text": self.PRODUCT_PRICE,
+                "rating_text": self.PRODUCT_RATING,
+            },
+        )
+        return [ProductRecord(**row) for row in rows]
+
+    async def get_first_product_title(self) -> str:
+        """Get the title of the first product."""
+        products = await self.get_products()
+        return products[0].title if products else ""
+
+    async def get_first_product_price(self) -> str:
+        """Get the price of the first product."""
+        products = await self.get_products()
+        return products[0].price_text if products else ""
+
+    async def click_first_product(self) -> None:
+        """Click on the first product in the list."""
+        product = self.locator(self.PRODUCT_ITEMS).first
+        if await product.count():
+            await self.click(product)
+            await self.wait_for_navigation(LoadStateReady("domcontentloaded"))
+
+    async def add_first_product_to_cart(self) -> None:
+        """Add the first product to the cart."""
+        await self.wait_until_ready(self.locator(self.ADD_TO_CART_BUTTON).first.click, self.ADDED_TO_CART)
+
+    async def filter_by_category(self, category: str) -> None:
+        """Filter products by category."""
+        await self.select_option(self.FILTER_CATEGORY, category)
+        await self.wait_until_ready(lambda: self.click(self.APPLY_FILTER_BUTTON), self.LISTING_UPDATED)
+
+    async def filter_by_price_range(self, min_price: str, max_price: str) -> None:
+        """Filter products by price range."""
+        await self.fill(self.FILTER_PRICE_MIN, min_price)
+        await self.fill(self.FILTER_PRICE_MAX, max_price)
+        await self.wait_until_ready(lambda: self.click(self.APPLY_FILTER_BUTTON), self.LISTING_UPDATED)
+
+    async def sort_products(self, sort_option: str) -> None:
+        """Sort products by the specified option."""
+        await self.wait_until_ready(
+            lambda: self.select_option(self.SORT_DROPDOWN, sort_option), self.LISTING_UPDATED
+        )
+
+    async def is_no_results_displayed(self) -> bool:
+        """Check if no results message is displayed."""
+        return await self.is_visible(self.NO_RESULTS_MESSAGE)
+
+    async def get_first_product_rating(self) -> str:
+        """Get the rating of the first product."""
+        products = await self.get_products()
+        return products[0].rating_text if products else ""
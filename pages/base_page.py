@@ -2,71 +2,222 @@
 Base Page class containing common methods for all page objects.
 """
 
-from playwright.sync_api import Page
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from playwright.sync_api import Locator, Page, TimeoutError as PlaywrightTimeoutError
+from pages.readiness import LoadStateReady, ReadyCondition, measure
+from pages.scripts import (
+    BROWSER_VALIDATION_SCRIPT,
+    EXTRACT_ITEMS_SCRIPT,
+    FILL_FORM_SCRIPT,
+    RESET_FORM_SCRIPT,
+    is_select,
+    record_form_fill,
+)
+from utils.resource_policy import Rule, use_page_rules
 import os
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
 BASE_URL = os.getenv("BASE_URL", "https://demo.ecommerce.local")
+# Also wait for networkidle after readiness to measure what it would have cost
+READINESS_BASELINE = os.getenv("READINESS_BASELINE", "false").lower() == "true"
+
+# How long a submitted form may take to show its error after the page is ready
+VALIDATION_ERROR_TIMEOUT_MS = 2000
+
+
+# Called as hook(page_object, path) after every navigate() of a sync or async
+# page object, e.g. to collect web vitals; async page objects await what it returns
+_navigation_hooks: List[Callable[["BasePage", str], Optional[Awaitable]]] = []
+
+
+def add_navigation_hook(hook: Callable[["BasePage", str], Optional[Awaitable]]) -> None:
+    """Run a function after every navigate() of a page object."""
+    _navigation_hooks.append(hook)
+
+
+def navigation_hooks() -> List[Callable[["BasePage", str], Optional[Awaitable]]]:
+    """Get the navigation hooks to run, for page objects outside this module."""
+    return list(_navigation_hooks)
+
+
+def remove_navigation_hook(hook: Callable[["BasePage", str], Optional[Awaitable]]) -> None:
+    """Stop running a navigation hook."""
+    _navigation_hooks.remove(hook)
+
+
+# A selector declared on a page object class, or a Locator built from one
+Target = Union[str, Locator]
+
+
+def get_base_url() -> str:
+    """Get the application URL, which a test run may set after import (e.g. --fake-app)."""
+    return os.getenv("BASE_URL", BASE_URL)
 
 
 class BasePage:
     """Base class for all page objects."""
 
+    # What "ready" means for this page; subclasses narrow it down
+    READY: ReadyCondition = LoadStateReady("domcontentloaded")
+
+    # Resource rules applied before the global ones while this page is shown
+    RESOURCE_POLICY: Tuple[Rule, ...] = ()
+
+    # The form run_validation_cases submits, its field selectors by name, the
+    # button that submits it, what to wait for after a submission, and where
+    # the page reports what is wrong with it
+    FORM = ""
+    FORM_FIELDS: Dict[str, str] = {}
+    FORM_SUBMIT = ""
+    SUBMITTED: Optional[ReadyCondition] = None
+    ERROR_MESSAGE = ".alert-danger"
+
     def __init__(self, page: Page):
         """Initialize the page object with a Playwright Page instance."""
         self.page = page
-        self.base_url = BASE_URL
+        self.base_url = get_base_url()
 
     def navigate(self, path: str = ""):
-        """Navigate to a specific path on the application."""
+        """Navigate to a specific path and wait until the page is ready."""
         url = f"{self.base_url}{path}"
-        self.page.goto(url, wait_until="networkidle")
-
-    def fill(self, selector: str, text: str) -> None:
+        self.wait_until_ready(lambda: self.page.goto(url, wait_until="commit"))
+        for hook in _navigation_hooks:
+            hook(self, path)
+
+    def wait_until_ready(self, action, ready: Optional[ReadyCondition] = None) -> None:
+        """Run an action and wait for a readiness condition (default: READY)."""
+        use_page_rules(self.page, self.RESOURCE_POLICY)
+        measure(
+            self.page,
+            type(self).__name__,
+            ready or self.READY,
+            action,
+            baseline=READINESS_BASELINE,
+        )
+
+    def locator(self, target: Target) -> Locator:
+        """Bind a selector to the page.
+
+        A Locator holds no element: it finds its element again on every
+        action, so it can be kept, chained (``nth(i).locator(...)``) and
+        reused across reloads without pinning DOM nodes in the browser.
+        """
+        return target if isinstance(target, Locator) else self.page.locator(target)
+
+    def fill(self, target: Target, text: str) -> None:
         """Fill a text input field."""
-        self.page.fill(selector, text)
-
-    def click(self, selector: str) -> None:
+        self.locator(target).fill(text)
+
+    def fill_form(self, fields: Dict[str, str], form_name: str = "form") -> None:
+        """Fill a whole form, mapping field selectors to values, in one round trip.
+
+        Inputs get ``input`` and ``change`` events and selects a ``change``
+        event, as with typing. Fields that are not attached yet, are disabled
+        or read-only fall back to a regular auto-waiting fill.
+        """
+        started = time.perf_counter()
+        pending = self.page.evaluate(FILL_FORM_SCRIPT, list(fields.items()))
+        for selector, tag_name in pending:
+            if is_select(selector, tag_name):
+                self.select_option(selector, fields[selector])
+            else:
+                self.fill(selector, fields[selector])
+        record_form_fill(
+            f"{type(self).__name__}.{form_name}", len(fields), len(pending), time.perf_counter() - started
+        )
+
+    def submit_form(self, fields: Dict[str, str], form_name: str = "form") -> str:
+        """Fill FORM and submit it with its own button; returns the error the page shows ("" if accepted).
+
+        The form is reset and the last error removed first, so several
+        submissions can run on one page. When the browser's own validation
+        stops the submission, its message is returned unless the page shows
+        one of its own.
+        """
+        form = self.locator(self.FORM)
+        form.evaluate(RESET_FORM_SCRIPT, self.ERROR_MESSAGE)
+        self.fill_form(fields, form_name)
+        blocked = form.evaluate(BROWSER_VALIDATION_SCRIPT)
+        error = self.locator(self.ERROR_MESSAGE).first
+        if blocked is not None:
+            # Nothing is sent, but the page's own handlers see the attempt
+            self.click(self.FORM_SUBMIT)
+            return (self.get_text(error).strip() if self.is_visible(error) else "") or blocked
+        self.wait_until_ready(lambda: self.click(self.FORM_SUBMIT), self.SUBMITTED)
+        try:
+            error.wait_for(timeout=VALIDATION_ERROR_TIMEOUT_MS)
+        except PlaywrightTimeoutError:
+            return ""
+        return self.get_text(error).strip()
+
+    def run_validation_cases(self, cases: Dict[str, Dict[str, str]]) -> Dict[str, str]:
+        """Submit FORM once per case through the page's own form; returns each case's error message.
+
+        Cases map FORM_FIELDS names to values; fields a case leaves out
+        keep the values the form shows. A case the page accepts gets ""
+        and, if the page left the form, it is loaded again for the next case.
+        """
+        errors = {}
+        for name, fields in cases.items():
+            if not self.is_visible(self.FORM):
+                self.navigate()
+            errors[name] = self.submit_form(
+                {self.FORM_FIELDS[field]: value for field, value in fields.items()}, "validation"
+            )
+        return errors
+
+    def click(self, target: Target) -> None:
         """Click on an element."""
-        self.page.click(selector)
+        self.locator(target).click()
 
-    def get_text(self, selector: str) -> str:
+    def get_text(self, target: Target) -> str:
         """Get text content of an element."""
-        return self.page.text_content(selector) or ""
+        return self.locator(target).text_content() or ""
 
-    def is_visible(self, selector: str) -> bool:
+    def is_visible(self, target: Target) -> bool:
         """Check if an element is visible."""
-        return self.page.is_visible(selector)
+        return self.locator(target).is_visible()
 
-    def is_enabled(self, selector: str) -> bool:
+    def is_enabled(self, target: Target) -> bool:
         """Check if an element is enabled."""
-        return self.page.is_enabled(selector)
+        return self.locator(target).is_enabled()
+
+    def count(self, target: Target) -> int:
+        """Count the elements matching a selector."""
+        return self.locator(target).count()
 
-    def wait_for_element(self, selector: str, timeout: int = 5000) -> None:
+    def wait_for_element(self, target: Target, timeout: int = 5000) -> None:
         """Wait for an element to be visible."""
-        self.page.wait_for_selector(selector, timeout=timeout)
+        self.locator(target).wait_for(timeout=timeout)
 
-    def get_attribute(self, selector: str, attribute: str) -> str:
+    def get_attribute(self, target: Target, attribute: str) -> str:
         """Get an attribute value from an element."""
-        return self.page.get_attribute(selector, attribute) or ""
+        return self.locator(target).get_attribute(attribute) or ""
+
+    def extract_items(self, items: Target, fields: Dict[str, str]) -> List[Dict[str, str]]:
+        """Read named fields from every item matching a selector in one round trip.
 
-    def select_option(self, selector: str, value: str) -> None:
+        ``fields`` maps a field name to a selector relative to each item.
+        Missing fields come back as empty strings.
+        """
+        return self.locator(items).evaluate_all(EXTRACT_ITEMS_SCRIPT, fields)
+
+    def select_option(self, target: Target, value: str) -> None:
         """Select an option from a dropdown."""
-        self.page.select_option(selector, value)
+        self.locator(target).select_option(value)
 
     def get_url(self) -> str:
         """Get the current page URL."""
         return self.page.url
 
-    def wait_for_navigation(self) -> None:
-        """Wait for page navigation to complete."""
-        self.page.wait_for_load_state("networkidle")
-
-    def take_screenshot(self, filename: str) -> None:
-        """Take a screenshot of the current page."""
-        self.page.screenshot(path=f"screenshots/{filename}.png")
+    def wait_for_navigation(self, ready: Optional[ReadyCondition] = None) -> None:
+        """Wait for a navigation to load and for a readiness condition (default: READY)."""
+        self.wait_until_ready(
+            lambda: self.page.wait_for_load_state("domcontentloaded"), ready
+        )
 
     def refresh(self) -> None:
         """Refresh the current page."""
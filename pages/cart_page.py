@@ -2,7 +2,10 @@
 Shopping Cart Page Object Model.
 """
 
+from typing import List
 from pages.base_page import BasePage
+from pages.records import CartItemRecord
+from pages.readiness import LoadStateReady, SelectorReady, SubmitReady, UrlReady
 
 
 class CartPage(BasePage):
@@ -10,6 +13,8 @@ class CartPage(BasePage):
 
     # Locators
     CART_ITEMS = ".cart-item"
+    ITEM_TITLE = ".item-title"
+    ITEM_TOTAL = ".item-total"
     ITEM_QUANTITY = ".item-quantity"
     ITEM_PRICE = ".item-price"
     REMOVE_BUTTON = "button:has-text('Remove')"
@@ -22,13 +27,18 @@ class CartPage(BasePage):
     QUANTITY_INPUT = "input[name='quantity']"
     UPDATE_QUANTITY_BUTTON = "button:has-text('Update')"
 
+    # The cart is ready once it shows items or the empty-cart message
+    READY = SelectorReady(f"{CART_ITEMS}, {EMPTY_CART_MESSAGE}")
+    # The cart reloaded after a post, or updated in place with XHR
+    CART_UPDATED = SubmitReady("**/cart/**", f"{CART_ITEMS}, {EMPTY_CART_MESSAGE}")
+
     def navigate(self):
         """Navigate to the cart page."""
         super().navigate("/cart")
 
     def get_cart_item_count(self) -> int:
         """Get the number of items in the cart."""
-        return len(self.page.query_selector_all(self.CART_ITEMS))
+        return self.count(self.CART_ITEMS)
 
     def get_subtotal(self) -> str:
         """Get the subtotal amount."""
@@ -44,22 +54,16 @@ class CartPage(BasePage):
 
     def remove_first_item(self) -> None:
         """Remove the first item from the cart."""
-        items = self.page.query_selector_all(self.CART_ITEMS)
-        if items:
-            remove_button = items[0].query_selector(self.REMOVE_BUTTON)
-            if remove_button:
-                remove_button.click()
+        remove_button = self.locator(self.CART_ITEMS).first.locator(self.REMOVE_BUTTON)
+        if remove_button.count():
+            self.wait_until_ready(remove_button.click, self.CART_UPDATED)
 
     def update_item_quantity(self, item_index: int, new_quantity: str) -> None:
         """Update the quantity of a specific item."""
-        items = self.page.query_selector_all(self.CART_ITEMS)
-        if item_index < len(items):
-            quantity_input = items[item_index].query_selector(self.QUANTITY_INPUT)
-            if quantity_input:
-                quantity_input.fill(new_quantity)
-                update_button = items[item_index].query_selector(self.UPDATE_QUANTITY_BUTTON)
-                if update_button:
-                    update_button.click()
+        item = self.locator(self.CART_ITEMS).nth(item_index)
+        if item.count():
+            self.fill(item.locator(self.QUANTITY_INPUT), new_quantity)
+            self.wait_until_ready(item.locator(self.UPDATE_QUANTITY_BUTTON).click, self.CART_UPDATED)
 
     def is_cart_empty(self) -> bool:
         """Check if the cart is empty."""
@@ -68,25 +72,32 @@ class CartPage(BasePage):
     def click_checkout(self) -> None:
         """Click the checkout button."""
         self.click(self.CHECKOUT_BUTTON)
-        self.wait_for_navigation()
+        self.wait_for_navigation(UrlReady("**/checkout*"))
 
     def click_continue_shopping(self) -> None:
         """Click the continue shopping button."""
         self.click(self.CONTINUE_SHOPPING_BUTTON)
-        self.wait_for_navigation()
+        self.wait_for_navigation(LoadStateReady("domcontentloaded"))
+
+    def get_items(self) -> List[CartItemRecord]:
+        """Get all items in the cart, read from the page in one round trip."""
+        rows = self.extract_items(
+            self.CART_ITEMS,
+            {
+                "title": self.ITEM_TITLE,
+                "price_text": self.ITEM_PRICE,
+                "quantity_text": self.ITEM_QUANTITY,
+                "line_total_text": self.ITEM_TOTAL,
+            },
+        )
+        return [CartItemRecord(**row) for row in rows]
 
     def get_first_item_price(self) -> str:
         """Get the price of the first item in the cart."""
-        items = self.page.query_selector_all(self.CART_ITEMS)
-        if items:
-            price_element = items[0].query_selector(self.ITEM_PRICE)
-            return price_element.text_content() or "" if price_element else ""
-        return ""
+        items = self.get_items()
+        return items[0].price_text if items else ""
 
     def get_first_item_quantity(self) -> str:
         """Get the quantity of the first item in the cart."""
-        items = self.page.query_selector_all(self.CART_ITEMS)
-        if items:
-            quantity_element = items[0].query_selector(self.ITEM_QUANTITY)
-            return quantity_element.text_content() or "" if quantity_element else ""
-        return ""
+        items = self.get_items()
+        return items[0].quantity_text if items else ""
@@ -3,6 +3,7 @@ Checkout Page Object Model.
 """
 
 from pages.base_page import BasePage
+from pages.readiness import SelectorReady, SubmitReady, UrlReady
 
 
 class CheckoutPage(BasePage):
@@ -24,10 +25,33 @@ class CheckoutPage(BasePage):
     PLACE_ORDER_BUTTON = "button:has-text('Place Order')"
     BACK_TO_CART_BUTTON = "button:has-text('Back to Cart')"
     ORDER_SUMMARY = ".order-summary"
+    EMPTY_ORDER_SUMMARY = ".order-summary li:has-text('No items')"
     SHIPPING_METHOD = "select[name='shipping_method']"
     ERROR_MESSAGE = ".alert-danger"
     SUCCESS_MESSAGE = ".alert-success"
 
+    READY = SelectorReady(ORDER_SUMMARY)
+    # A confirmation page, the form with an error, or the order request's answer when sent with XHR
+    SUBMITTED = SubmitReady("**/checkout*")
+
+    FORM = "form#checkout"
+    FORM_FIELDS = {
+        "first_name": FIRST_NAME_INPUT,
+        "last_name": LAST_NAME_INPUT,
+        "email": EMAIL_INPUT,
+        "phone": PHONE_INPUT,
+        "address": ADDRESS_INPUT,
+        "city": CITY_INPUT,
+        "state": STATE_INPUT,
+        "zip_code": ZIP_INPUT,
+        "country": COUNTRY_INPUT,
+        "shipping_method": SHIPPING_METHOD,
+        "card_number": CARD_NUMBER_INPUT,
+        "expiry": CARD_EXPIRY_INPUT,
+        "cvv": CARD_CVV_INPUT,
+    }
+    FORM_SUBMIT = PLACE_ORDER_BUTTON
+
     def navigate(self):
         """Navigate to the checkout page."""
         super().navigate("/checkout")
@@ -45,21 +69,49 @@ class CheckoutPage(BasePage):
         country: str = "US",
     ) -> None:
         """Fill in the shipping address form."""
-        self.fill(self.FIRST_NAME_INPUT, first_name)
-        self.fill(self.LAST_NAME_INPUT, last_name)
-        self.fill(self.EMAIL_INPUT, email)
-        self.fill(self.PHONE_INPUT, phone)
-        self.fill(self.ADDRESS_INPUT, address)
-        self.fill(self.CITY_INPUT, city)
-        self.fill(self.STATE_INPUT, state)
-        self.fill(self.ZIP_INPUT, zip_code)
-        self.select_option(self.COUNTRY_INPUT, country)
+        self.fill_form(
+            self._shipping_fields(
+                first_name, last_name, email, phone, address, city, state, zip_code, country
+            ),
+            "shipping",
+        )
 
     def fill_payment_info(self, card_number: str, expiry: str, cvv: str) -> None:
         """Fill in the payment information."""
-        self.fill(self.CARD_NUMBER_INPUT, card_number)
-        self.fill(self.CARD_EXPIRY_INPUT, expiry)
-        self.fill(self.CARD_CVV_INPUT, cvv)
+        self.fill_form(self._payment_fields(card_number, expiry, cvv), "payment")
+
+    def _shipping_fields(
+        self,
+        first_name: str,
+        last_name: str,
+        email: str,
+        phone: str,
+        address: str,
+        city: str,
+        state: str,
+        zip_code: str,
+        country: str = "US",
+    ) -> dict:
+        """Map the shipping address fields to their values."""
+        return {
+            self.FIRST_NAME_INPUT: first_name,
+            self.LAST_NAME_INPUT: last_name,
+            self.EMAIL_INPUT: email,
+            self.PHONE_INPUT: phone,
+            self.ADDRESS_INPUT: address,
+            self.CITY_INPUT: city,
+            self.STATE_INPUT: state,
+            self.ZIP_INPUT: zip_code,
+            self.COUNTRY_INPUT: country,
+        }
+
+    def _payment_fields(self, card_number: str, expiry: str, cvv: str) -> dict:
+        """Map the payment fields to their values."""
+        return {
+            self.CARD_NUMBER_INPUT: card_number,
+            self.CARD_EXPIRY_INPUT: expiry,
+            self.CARD_CVV_INPUT: cvv,
+        }
 
     def select_shipping_method(self, method: str) -> None:
         """Select a shipping method."""
@@ -67,13 +119,12 @@ class CheckoutPage(BasePage):
 
     def place_order(self) -> None:
         """Click the place order button."""
-        self.click(self.PLACE_ORDER_BUTTON)
-        self.wait_for_navigation()
+        self.wait_until_ready(lambda: self.click(self.PLACE_ORDER_BUTTON), self.SUBMITTED)
 
     def click_back_to_cart(self) -> None:
         """Click the back to cart button."""
         self.click(self.BACK_TO_CART_BUTTON)
-        self.wait_for_navigation()
+        self.wait_for_navigation(UrlReady("**/cart*"))
 
     def get_error_message(self) -> str:
         """Get error message if checkout fails."""
@@ -91,6 +142,10 @@ class CheckoutPage(BasePage):
         """Check if the order summary is visible."""
         return self.is_visible(self.ORDER_SUMMARY)
 
+    def has_order_items(self) -> bool:
+        """Check if the order summary lists any items."""
+        return self.is_order_summary_visible() and not self.is_visible(self.EMPTY_ORDER_SUMMARY)
+
     def complete_checkout(
         self,
         first_name: str,
@@ -107,9 +162,10 @@ class CheckoutPage(BasePage):
         shipping_method: str = "standard",
     ) -> None:
         """Complete the entire checkout process."""
-        self.fill_shipping_address(
+        fields = self._shipping_fields(
             first_name, last_name, email, phone, address, city, state, zip_code
         )
-        self.select_shipping_method(shipping_method)
-        self.fill_payment_info(card_number, expiry, cvv)
+        fields[self.SHIPPING_METHOD] = shipping_method
+        fields.update(self._payment_fields(card_number, expiry, cvv))
+        self.fill_form(fields, "checkout")
         self.place_order()
@@ -0,0 +1,148 @@
+"""
+Opt-in timing of page object methods.
+
+``instrument`` times every public method (and so every ``BasePage``
+primitive) of the page object classes, through the shared method wrapper
+(utils/method_hooks.py), and the timings are aggregated per test, page
+class and method. Timers use ``perf_counter_ns`` and only update an
+in-memory table, so the hot path does no logging or I/O. Nothing is wrapped
+unless instrumentation (or another tool using the wrapper) is turned on, so
+it costs nothing when it is off.
+
+Sync methods record both their total time and their self time (excluding
+the instrumented methods they call). A method calling its own override
+through ``super()`` counts as one call. Async methods may interleave, so
+only their total time is recorded.
+"""
+
+import inspect
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils import method_hooks
+
+STATS_SECTION = "instrumentation"
+
+# (test id, page class, method) -> [calls, total ns, self ns, max ns]
+_timings: Dict[Tuple[str, str, str], List[int]] = {}
+# Frames of the sync methods being timed: [instance id, method, ns spent in instrumented callees]
+_stack: List[list] = []
+_current_test = ""
+
+
+def set_current_test(test_id: str) -> None:
+    """Attribute the following timings to a test."""
+    global _current_test
+    _current_test = test_id
+
+
+def instrument(*base_classes: type) -> int:
+    """Time the public methods of the base classes and their subclasses; returns how many are wrapped."""
+    return method_hooks.watch(base_classes, _time_call)
+
+
+def uninstrument() -> None:
+    """Stop timing the methods."""
+    method_hooks.unwatch(_time_call)
+
+
+def _record(page_class: str, name: str, elapsed: int, self_time: int) -> None:
+    """Add a call to the timings table."""
+    key = (_current_test, page_class, name)
+    timing = _timings.get(key)
+    if timing is None:
+        _timings[key] = [1, elapsed, self_time, elapsed]
+    else:
+        timing[0] += 1
+        timing[1] += elapsed
+        timing[2] += self_time
+        if elapsed > timing[3]:
+            timing[3] = elapsed
+
+
+def _time_call(page_object, name: str, func: Callable, args: tuple, kwargs: dict) -> Optional[Callable[[], None]]:
+    """Start timing a method call; returns what records it when it ends."""
+    page_class = type(page_object).__name__
+    if inspect.iscoroutinefunction(func):
+
+        def record_async() -> None:
+            elapsed = time.perf_counter_ns() - started
+            _record(page_class, name, elapsed, elapsed)
+
+        started = time.perf_counter_ns()
+        return record_async
+
+    if _stack and _stack[-1][0] == id(page_object) and _stack[-1][1] == name:
+        # An override calling the method it overrides through super()
+        return None
+    frame = [id(page_object), name, 0]
+
+    def record() -> None:
+        elapsed = time.perf_counter_ns() - started
+        _stack.pop()
+        if _stack:
+            _stack[-1][2] += elapsed
+        _record(page_class, name, elapsed, elapsed - frame[2])
+
+    _stack.append(frame)
+    started = time.perf_counter_ns()
+    return record
+
+
+def collect() -> dict:
+    """Move the timings into a stats dictionary (see utils/session_stats.py)."""
+    tests: Dict[str, Dict[str, Dict[str, int]]] = {}
+    for (test_id, page_class, name), (calls, total, self_time, longest) in _timings.items():
+        tests.setdefault(test_id, {})[f"{page_class}.{name}"] = {
+            "calls": calls,
+            "total_ns": total,
+            "self_ns": self_time,
+            "max_ns": longest,
+        }
+    _timings.clear()
+    return {"tests": tests}
+
+
+def by_step(stats: dict) -> Dict[str, Dict[str, int]]:
+    """Add up the timings of each page class and method over all tests."""
+    steps: Dict[str, Dict[str, int]] = {}
+    for timings in stats.get("tests", {}).values():
+        for step, timing in timings.items():
+            total = steps.setdefault(step, {"calls": 0, "total_ns": 0, "self_ns": 0, "max_ns": 0})
+            total["calls"] += timing["calls"]
+            total["total_ns"] += timing["total_ns"]
+            total["self_ns"] += timing["self_ns"]
+            total["max_ns"] = max(total["max_ns"], timing["max_ns"])
+    return steps
+
+
+def export_json(stats: dict, path: str) -> None:
+    """Write the timings per test and per step to a JSON file."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as json_file:
+        json.dump({"steps": by_step(stats), "tests": stats.get("tests", {})}, json_file, indent=2, sort_keys=True)
+
+
+def format_summary(stats: dict, limit: int = 15) -> List[str]:
+    """List the steps with the most self time, and the slowest steps of single tests."""
+    steps = sorted(by_step(stats).items(), key=lambda item: item[1]["self_ns"], reverse=True)
+    lines = [f"{'step':<48}{'calls':>7}{'self ms':>10}{'total ms':>10}{'mean ms':>9}{'max ms':>9}"]
+    for step, timing in steps[:limit]:
+        lines.append(
+            f"{step:<48}{timing['calls']:>7}{timing['self_ns'] / 1e6:>10.0f}{timing['total_ns'] / 1e6:>10.0f}"
+            f"{timing['total_ns'] / timing['calls'] / 1e6:>9.1f}{timing['max_ns'] / 1e6:>9.0f}"
+        )
+    per_test = sorted(
+        (
+            (timing["self_ns"], test_id, step)
+            for test_id, timings in stats.get("tests", {}).items()
+            for step, timing in timings.items()
+        ),
+        reverse=True,
+    )
+    if per_test:
+        lines.append("slowest steps by test (self time):")
+        lines.extend(f"  {self_ns / 1e6:>8.0f} ms  {step}  {test_id}" for self_ns, test_id, step in per_test[:limit])
+    return lines
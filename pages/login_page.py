@@ -3,6 +3,7 @@ Login Page Object Model.
 """
 
 from pages.base_page import BasePage
+from pages.readiness import SelectorReady, SubmitReady, UrlReady
 
 
 class LoginPage(BasePage):
@@ -17,16 +18,22 @@ class LoginPage(BasePage):
     SUCCESS_MESSAGE = ".alert-success"
     FORGOT_PASSWORD_LINK = "a:has-text('Forgot Password')"
 
+    READY = SelectorReady(LOGIN_BUTTON)
+    # The post-login page, the form with an error, or the login request's answer when sent with XHR
+    SUBMITTED = SubmitReady("**/login*")
+
+    FORM = "form[action='/login']"
+    FORM_FIELDS = {"email": EMAIL_INPUT, "password": PASSWORD_INPUT}
+    FORM_SUBMIT = LOGIN_BUTTON
+
     def navigate(self):
         """Navigate to the login page."""
         super().navigate("/login")
 
     def login(self, email: str, password: str) -> None:
         """Perform login with given credentials."""
-        self.fill(self.EMAIL_INPUT, email)
-        self.fill(self.PASSWORD_INPUT, password)
-        self.click(self.LOGIN_BUTTON)
-        self.wait_for_navigation()
+        self.fill_form({self.EMAIL_INPUT: email, self.PASSWORD_INPUT: password}, "login")
+        self.wait_until_ready(lambda: self.click(self.LOGIN_BUTTON), self.SUBMITTED)
 
     def get_error_message(self) -> str:
         """Retrieve error message from login attempt."""
@@ -43,12 +50,12 @@ class LoginPage(BasePage):
     def click_register_link(self) -> None:
         """Click on the register link."""
         self.click(self.REGISTER_LINK)
-        self.wait_for_navigation()
+        self.wait_for_navigation(UrlReady("**/register*"))
 
     def click_forgot_password(self) -> None:
         """Click on the forgot password link."""
         self.click(self.FORGOT_PASSWORD_LINK)
-        self.wait_for_navigation()
+        self.wait_for_navigation(UrlReady("**/forgot-password*"))
 
     def is_login_button_enabled(self) -> bool:
         """Check if the login button is enabled."""
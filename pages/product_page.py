@@ -2,7 +2,11 @@
 Product Page Object Model.
 """
 
+from typing import List
 from pages.base_page import BasePage
+from pages.records import ProductRecord
+from pages.readiness import LoadStateReady, SelectorReady, SubmitReady
+from utils.resource_policy import block
 
 
 class ProductPage(BasePage):
@@ -23,6 +27,16 @@ class ProductPage(BasePage):
     NO_RESULTS_MESSAGE = ".no-results"
     PRODUCT_RATING = ".product-rating"
 
+    # The listing is ready once it shows products or the no-results message
+    READY = SelectorReady(f"{PRODUCT_ITEMS}, {NO_RESULTS_MESSAGE}")
+    # The listing answered a search, filter or sort (reloaded, or updated with XHR) and shows its result
+    LISTING_UPDATED = SubmitReady("**/products*", f"{PRODUCT_ITEMS}, {NO_RESULTS_MESSAGE}")
+    # The listing reloaded after the add-to-cart post, or the cart request's answer when sent with XHR
+    ADDED_TO_CART = SubmitReady("**/cart/**")
+
+    # No test looks at the product images
+    RESOURCE_POLICY = (block("image"),)
+
     def navigate(self):
         """Navigate to the products page."""
         super().navigate("/products")
@@ -30,56 +44,60 @@ class ProductPage(BasePage):
     def search_product(self, product_name: str) -> None:
         """Search for a product by name."""
         self.fill(self.SEARCH_INPUT, product_name)
-        self.click(self.SEARCH_BUTTON)
-        self.wait_for_navigation()
+        self.wait_until_ready(lambda: self.click(self.SEARCH_BUTTON), self.LISTING_UPDATED)
 
     def get_product_count(self) -> int:
         """Get the number of products displayed."""
-        return len(self.page.query_selector_all(self.PRODUCT_ITEMS))
+        return self.count(self.PRODUCT_ITEMS)
+
+    def get_products(self) -> List[ProductRecord]:
+        """Get all displayed products, read from the page in one round trip."""
+        rows = self.extract_items(
+            self.PRODUCT_ITEMS,
+            {
+                "title": self.PRODUCT_TITLE,
+                "price_text": self.PRODUCT_PRICE,
+                "rating_text": self.PRODUCT_RATING,
+            },
+        )
+        return [ProductRecord(**row) for row in rows]
 
     def get_first_product_title(self) -> str:
         """Get the title of the first product."""
-        products = self.page.query_selector_all(self.PRODUCT_ITEMS)
-        if products:
-            return self.page.query_selector(f"{self.PRODUCT_ITEMS} {self.PRODUCT_TITLE}").text_content() or ""
-        return ""
+        products = self.get_products()
+        return products[0].title if products else ""
 
     def get_first_product_price(self) -> str:
         """Get the price of the first product."""
-        products = self.page.query_selector_all(self.PRODUCT_ITEMS)
-        if products:
-            price_element = self.page.query_selector(f"{self.PRODUCT_ITEMS} {self.PRODUCT_PRICE}")
-            return price_element.text_content() or "" if price_element else ""
-        return ""
+        products = self.get_products()
+        return products[0].price_text if products else ""
 
     def click_first_product(self) -> None:
         """Click on the first product in the list."""
-        products = self.page.query_selector_all(self.PRODUCT_ITEMS)
-        if products:
-            products[0].click()
-            self.wait_for_navigation()
+        product = self.locator(self.PRODUCT_ITEMS).first
+        if product.count():
+            self.click(product)
+            self.wait_for_navigation(LoadStateReady("domcontentloaded"))
 
     def add_first_product_to_cart(self) -> None:
         """Add the first product to the cart."""
-        self.click(self.ADD_TO_CART_BUTTON)
+        self.wait_until_ready(self.locator(self.ADD_TO_CART_BUTTON).first.click, self.ADDED_TO_CART)
 
     def filter_by_category(self, category: str) -> None:
         """Filter products by category."""
         self.select_option(self.FILTER_CATEGORY, category)
-        self.click(self.APPLY_FILTER_BUTTON)
-        self.wait_for_navigation()
+        self.wait_until_ready(lambda: self.click(self.APPLY_FILTER_BUTTON), self.LISTING_UPDATED)
 
     def filter_by_price_range(self, min_price: str, max_price: str) -> None:
         """Filter products by price range."""
         self.fill(self.FILTER_PRICE_MIN, min_price)
         self.fill(self.FILTER_PRICE_MAX, max_price)
-        self.click(self.APPLY_FILTER_BUTTON)
-        self.wait_for_navigation()
+        self.wait_until_ready(lambda: self.click(self.APPLY_FILTER_BUTTON), self.LISTING_UPDATED)
 
     def sort_products(self, sort_option: str) -> None:
         """Sort products by the specified option."""
-        self.select_option(self.SORT_DROPDOWN, sort_option)
-        self.wait_for_navigation()
+        # The sort dropdown submits the listing form when it changes
+        self.wait_until_ready(lambda: self.select_option(self.SORT_DROPDOWN, sort_option), self.LISTING_UPDATED)
 
     def is_no_results_displayed(self) -> bool:
         """Check if no results message is displayed."""
@@ -87,8 +105,5 @@ class ProductPage(BasePage):
 
     def get_first_product_rating(self) -> str:
         """Get the rating of the first product."""
-        products = self.page.query_selector_all(self.PRODUCT_ITEMS)
-        if products:
-            rating_element = self.page.query_selector(f"{self.PRODUCT_ITEMS} {self.PRODUCT_RATING}")
-            return rating_element.text_content() or "" if rating_element else ""
-        return ""
+        products = self.get_products()
+        return products[0].rating_text if products else ""
@@ -0,0 +1,308 @@
+"""
+Readiness conditions for page objects.
+
+Each page object declares what "ready" means for it (an element being
+visible, a URL being reached, a response arriving), so navigation can resolve
+as soon as that condition holds instead of waiting for the network to go idle.
+Conditions work with both the sync and the async Playwright API.
+"""
+
+import time
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Optional
+
+from playwright.async_api import Page as AsyncPage
+from playwright.sync_api import Page
+
+from utils import session_stats
+
+STATS_SECTION = "readiness"
+
+
+class ReadyCondition(ABC):
+    """Base class for readiness conditions."""
+
+    def run(self, page: Page, action: Callable[[], None], timeout: Optional[float] = None) -> None:
+        """Perform an action and wait until the condition holds."""
+        action()
+        self.wait(page, timeout)
+
+    @abstractmethod
+    def wait(self, page: Page, timeout: Optional[float] = None) -> None:
+        """Wait until the condition holds."""
+
+    async def run_async(
+        self,
+        page: AsyncPage,
+        action: Callable[[], Awaitable[None]],
+        timeout: Optional[float] = None,
+    ) -> None:
+        """Perform an async action and wait until the condition holds."""
+        await action()
+        await self.wait_async(page, timeout)
+
+    @abstractmethod
+    async def wait_async(self, page: AsyncPage, timeout: Optional[float] = None) -> None:
+        """Wait until the condition holds on an async page."""
+
+
+class LoadStateReady(ReadyCondition):
+    """Ready once the document reaches a load state."""
+
+    def __init__(self, state: str = "domcontentloaded"):
+        self.state = state
+
+    def wait(self, page: Page, timeout: Optional[float] = None) -> None:
+        page.wait_for_load_state(self.state, timeout=timeout)
+
+    async def wait_async(self, page: AsyncPage, timeout: Optional[float] = None) -> None:
+        await page.wait_for_load_state(self.state, timeout=timeout)
+
+    def __repr__(self) -> str:
+        return f"LoadStateReady({self.state!r})"
+
+
+class SelectorReady(ReadyCondition):
+    """Ready once an element matching the selector reaches a state."""
+
+    def __init__(self, selector: str, state: str = "visible"):
+        self.selector = selector
+        self.state = state
+
+    def wait(self, page: Page, timeout: Optional[float] = None) -> None:
+        page.wait_for_selector(self.selector, state=self.state, timeout=timeout)
+
+    async def wait_async(self, page: AsyncPage, timeout: Optional[float] = None) -> None:
+        await page.wait_for_selector(self.selector, state=self.state, timeout=timeout)
+
+    def __repr__(self) -> str:
+        return f"SelectorReady({self.selector!r})"
+
+
+class UrlReady(ReadyCondition):
+    """Ready once the page URL matches a glob, regex or predicate."""
+
+    def __init__(self, url, wait_until: str = "domcontentloaded"):
+        self.url = url
+        self.wait_until = wait_until
+
+    def wait(self, page: Page, timeout: Optional[float] = None) -> None:
+        page.wait_for_url(self.url, wait_until=self.wait_until, timeout=timeout)
+
+    async def wait_async(self, page: AsyncPage, timeout: Optional[float] = None) -> None:
+        await page.wait_for_url(self.url, wait_until=self.wait_until, timeout=timeout)
+
+    def __repr__(self) -> str:
+        return f"UrlReady({self.url!r})"
+
+
+class NavigationReady(ReadyCondition):
+    """Ready once the action navigates and the new document reaches a load state.
+
+    Unlike UrlReady, this also works when the page reloads the same URL,
+    e.g. after a form post that redirects back to the page it came from.
+    """
+
+    def __init__(self, wait_until: str = "domcontentloaded"):
+        self.wait_until = wait_until
+
+    def run(self, page: Page, action: Callable[[], None], timeout: Optional[float] = None) -> None:
+        with page.expect_navigation(wait_until=self.wait_until, timeout=timeout):
+            action()
+
+    def wait(self, page: Page, timeout: Optional[float] = None) -> None:
+        page.wait_for_load_state(self.wait_until, timeout=timeout)
+
+    async def run_async(
+        self,
+        page: AsyncPage,
+        action: Callable[[], Awaitable[None]],
+        timeout: Optional[float] = None,
+    ) -> None:
+        async with page.expect_navigation(wait_until=self.wait_until, timeout=timeout):
+            await action()
+
+    async def wait_async(self, page: AsyncPage, timeout: Optional[float] = None) -> None:
+        await page.wait_for_load_state(self.wait_until, timeout=timeout)
+
+    def __repr__(self) -> str:
+        return f"NavigationReady({self.wait_until!r})"
+
+
+class SubmitReady(ReadyCondition):
+    """Ready once the app answered a submission, whether it reloads the page or updates it in place.
+
+    The response to the first request matching the URL glob, regex or
+    predicate is awaited. If that request is a navigation (a form post
+    answered with a redirect or a new page), the new document must then
+    reach ``wait_until``; otherwise the app updates the page with XHR or
+    fetch. Either way, ``selector``, when given, must then be visible.
+    """
+
+    # Marks the current document, so a new one can be told apart
+    _MARK = "() => { window.__submitPending = true; }"
+    _REPLACED = "() => !window.__submitPending"
+
+    def __init__(self, url, selector: Optional[str] = None, wait_until: str = "domcontentloaded"):
+        self.url = url
+        self.selector = selector
+        self.wait_until = wait_until
+
+    def run(self, page: Page, action: Callable[[], None], timeout: Optional[float] = None) -> None:
+        page.evaluate(self._MARK)
+        with page.expect_response(self.url, timeout=timeout) as response_info:
+            action()
+        navigated = response_info.value.request.is_navigation_request()
+        if navigated:
+            # Waiting for a function outlives the old document
+            page.wait_for_function(self._REPLACED, timeout=timeout)
+        self.wait(page, timeout, in_page=not navigated)
+
+    def wait(self, page: Page, timeout: Optional[float] = None, in_page: bool = True) -> None:
+        if not in_page or not self.selector:
+            page.wait_for_load_state(self.wait_until, timeout=timeout)
+        if self.selector:
+            page.wait_for_selector(self.selector, timeout=timeout)
+
+    async def run_async(
+        self,
+        page: AsyncPage,
+        action: Callable[[], Awaitable[None]],
+        timeout: Optional[float] = None,
+    ) -> None:
+        await page.evaluate(self._MARK)
+        async with page.expect_response(self.url, timeout=timeout) as response_info:
+            await action()
+        response = await response_info.value
+        navigated = response.request.is_navigation_request()
+        if navigated:
+            await page.wait_for_function(self._REPLACED, timeout=timeout)
+        await self.wait_async(page, timeout, in_page=not navigated)
+
+    async def wait_async(self, page: AsyncPage, timeout: Optional[float] = None, in_page: bool = True) -> None:
+        if not in_page or not self.selector:
+            await page.wait_for_load_state(self.wait_until, timeout=timeout)
+        if self.selector:
+            await page.wait_for_selector(self.selector, timeout=timeout)
+
+    def __repr__(self) -> str:
+        return f"SubmitReady({self.url!r}, {self.selector!r})"
+
+
+class ResponseReady(ReadyCondition):
+    """Ready once a response matching the URL glob, regex or predicate arrives.
+
+    The response listener is set up before the action runs, so responses
+    that arrive while the action is still in progress are not missed.
+    """
+
+    def __init__(self, url, status: Optional[int] = None):
+        self.url = url
+        self.status = status
+
+    def run(self, page: Page, action: Callable[[], None], timeout: Optional[float] = None) -> None:
+        with page.expect_response(self.url, timeout=timeout) as response_info:
+            action()
+        self._check_status(response_info.value)
+
+    def wait(self, page: Page, timeout: Optional[float] = None) -> None:
+        page.wait_for_response(self.url, timeout=timeout)
+
+    async def run_async(
+        self,
+        page: AsyncPage,
+        action: Callable[[], Awaitable[None]],
+        timeout: Optional[float] = None,
+    ) -> None:
+        async with page.expect_response(self.url, timeout=timeout) as response_info:
+            await action()
+        self._check_status(await response_info.value)
+
+    async def wait_async(self, page: AsyncPage, timeout: Optional[float] = None) -> None:
+        await page.wait_for_response(self.url, timeout=timeout)
+
+    def _check_status(self, response) -> None:
+        """Fail if the response does not have the expected status."""
+        if self.status is not None and response.status != self.status:
+            raise AssertionError(
+                f"Expected status {self.status} from {response.url}, got {response.status}"
+            )
+
+    def __repr__(self) -> str:
+        return f"ResponseReady({self.url!r})"
+
+
+def record_timing(page_name: str, seconds: float, networkidle_extra: Optional[float] = None) -> None:
+    """Record how long a page object waited for readiness.
+
+    ``networkidle_extra`` is the additional time a ``networkidle`` wait took
+    after the page was already ready, when that baseline is being measured.
+    """
+    stats = session_stats.section(STATS_SECTION).setdefault(page_name, {})
+    stats["waits"] = stats.get("waits", 0) + 1
+    stats["seconds"] = stats.get("seconds", 0.0) + seconds
+    if networkidle_extra is not None:
+        stats["baseline_waits"] = stats.get("baseline_waits", 0) + 1
+        stats["networkidle_extra_seconds"] = (
+            stats.get("networkidle_extra_seconds", 0.0) + networkidle_extra
+        )
+
+
+def measure(
+    page: Page,
+    page_name: str,
+    condition: ReadyCondition,
+    action: Callable[[], None],
+    timeout: Optional[float] = None,
+    baseline: bool = False,
+) -> None:
+    """Run an action under a readiness condition and record the timing."""
+    started = time.perf_counter()
+    condition.run(page, action, timeout)
+    elapsed = time.perf_counter() - started
+    extra = None
+    if baseline:
+        idle_started = time.perf_counter()
+        page.wait_for_load_state("networkidle", timeout=timeout)
+        extra = time.perf_counter() - idle_started
+    record_timing(page_name, elapsed, extra)
+
+
+async def measure_async(
+    page: AsyncPage,
+    page_name: str,
+    condition: ReadyCondition,
+    action: Callable[[], Awaitable[None]],
+    timeout: Optional[float] = None,
+    baseline: bool = False,
+) -> None:
+    """Run an async action under a readiness condition and record the timing."""
+    started = time.perf_counter()
+    await condition.run_async(page, action, timeout)
+    elapsed = time.perf_counter() - started
+    extra = None
+    if baseline:
+        idle_started = time.perf_counter()
+        await page.wait_for_load_state("networkidle", timeout=timeout)
+        extra = time.perf_counter() - idle_started
+    record_timing(page_name, elapsed, extra)
+
+
+def format_summary(stats: dict) -> list:
+    """Build the end-of-session report lines for readiness waits."""
+    lines = []
+    for page_name, page_stats in sorted(stats.items()):
+        waits = page_stats.get("waits", 0)
+        line = (
+            f"{page_name}: {waits} readiness waits, "
+            f"avg {page_stats.get('seconds', 0.0) / max(waits, 1) * 1000:.0f} ms"
+        )
+        baseline_waits = page_stats.get("baseline_waits", 0)
+        if baseline_waits:
+            extra = page_stats.get("networkidle_extra_seconds", 0.0)
+            line += (
+                f", networkidle would add avg {extra / baseline_waits * 1000:.0f} ms "
+                f"(~{extra / baseline_waits * waits:.1f}s saved)"
+            )
+        lines.append(line)
+    return lines
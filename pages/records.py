@@ -0,0 +1,77 @@
+"""
+Typed records extracted from listing pages.
+"""
+
+import re
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Optional
+
+_NUMBER = re.compile(r"-?\d[\d,]*(?:\.\d+)?")
+
+
+def parse_money(text: Optional[str]) -> Optional[Decimal]:
+    """Parse an amount like "$1,299.99" into a Decimal (None if there is none)."""
+    match = _NUMBER.search(text or "")
+    if not match:
+        return None
+    try:
+        return Decimal(match.group().replace(",", ""))
+    except InvalidOperation:
+        return None
+
+
+def parse_number(text: Optional[str]) -> Optional[float]:
+    """Parse the first number in a text like "4.5 out of 5"."""
+    match = _NUMBER.search(text or "")
+    return float(match.group().replace(",", "")) if match else None
+
+
+@dataclass(frozen=True)
+class ProductRecord:
+    """A product as shown in the product listing."""
+
+    title: str
+    price_text: str
+    rating_text: str
+
+    @property
+    def price(self) -> Optional[Decimal]:
+        """Get the price as a Decimal."""
+        return parse_money(self.price_text)
+
+    @property
+    def rating(self) -> Optional[float]:
+        """Get the rating as a number."""
+        return parse_number(self.rating_text)
+
+
+@dataclass(frozen=True)
+class CartItemRecord:
+    """An item as shown in the shopping cart."""
+
+    title: str
+    price_text: str
+    quantity_text: str
+    line_total_text: str
+
+    @property
+    def price(self) -> Optional[Decimal]:
+        """Get the unit price as a Decimal."""
+        return parse_money(self.price_text)
+
+    @property
+    def quantity(self) -> Optional[int]:
+        """Get the quantity as an integer."""
+        quantity = parse_number(self.quantity_text)
+        return int(quantity) if quantity is not None else None
+
+    @property
+    def line_total(self) -> Optional[Decimal]:
+        """Get the line total, computing it when the cart does not show one."""
+        shown = parse_money(self.line_total_text)
+        if shown is not None:
+            return shown
+        if self.price is None or self.quantity is None:
+            return None
+        return self.price * self.quantity
@@ -0,0 +1,103 @@
+"""
+In-page scripts and helpers shared by the sync and async page objects.
+
+The scripts run in the browser through ``evaluate``, so the same source
+serves ``pages.base_page`` and ``pages.aio.base_page``; the helpers do not
+touch the page at all.
+"""
+
+from typing import Optional
+
+from utils import session_stats
+
+# Sets several form fields at once, firing the events validation listens to.
+# Returns [selector, tagName] for the fields it could not fill, so they can
+# be filled one by one with Playwright's auto-waiting.
+FILL_FORM_SCRIPT = """
+fields => {
+    const pending = [];
+    for (const [selector, value] of fields) {
+        let element = null;
+        try {
+            element = document.querySelector(selector);
+        } catch (error) {
+            // Not a CSS selector (e.g. a Playwright text selector)
+        }
+        if (!element || element.disabled || element.readOnly) {
+            pending.push([selector, element ? element.tagName : null]);
+            continue;
+        }
+        if (element.tagName === "SELECT") {
+            const option = Array.from(element.options).find(
+                o => o.value === value || o.label === value
+            );
+            if (!option) {
+                pending.push([selector, element.tagName]);
+                continue;
+            }
+            element.value = option.value;
+        } else {
+            // Use the native setter so frameworks tracking the value notice the change
+            const prototype = element.tagName === "TEXTAREA"
+                ? HTMLTextAreaElement.prototype
+                : HTMLInputElement.prototype;
+            Object.getOwnPropertyDescriptor(prototype, "value").set.call(element, value);
+            element.dispatchEvent(new Event("input", { bubbles: true }));
+        }
+        element.dispatchEvent(new Event("change", { bubbles: true }));
+    }
+    return pending;
+}
+"""
+
+# Reads the text (or input value) of named fields inside every matched item
+EXTRACT_ITEMS_SCRIPT = """
+(items, fields) => items.map(item => {
+    const record = {};
+    for (const [name, selector] of Object.entries(fields)) {
+        const element = item.querySelector(selector);
+        if (!element) {
+            record[name] = "";
+        } else if (element.tagName === "INPUT" || element.tagName === "SELECT") {
+            record[name] = element.value;
+        } else {
+            record[name] = (element.textContent || "").trim();
+        }
+    }
+    return record;
+})
+"""
+
+# Resets a form and removes the errors shown for the last submission
+RESET_FORM_SCRIPT = """
+(form, errorSelector) => {
+    form.reset();
+    document.querySelectorAll(errorSelector).forEach(error => error.remove());
+}
+"""
+
+# Gets the message of the first field the browser's own validation would stop
+# the form on, or null when the form would be sent
+BROWSER_VALIDATION_SCRIPT = """
+form => {
+    if (form.noValidate) {
+        return null;
+    }
+    const invalid = Array.from(form.elements).find(field => field.willValidate && !field.validity.valid);
+    return invalid ? invalid.validationMessage || "invalid" : null;
+}
+"""
+
+
+def is_select(selector: str, tag_name: Optional[str]) -> bool:
+    """Guess whether a field left over by fill_form is a dropdown."""
+    return tag_name == "SELECT" or (tag_name is None and selector.startswith("select"))
+
+
+def record_form_fill(form_name: str, fields: int, fallback_fields: int, seconds: float) -> None:
+    """Record the timing of a fill_form call."""
+    stats = session_stats.section("forms").setdefault(form_name, {})
+    stats["fills"] = stats.get("fills", 0) + 1
+    stats["fields"] = stats.get("fields", 0) + fields
+    stats["fallback_fields"] = stats.get("fallback_fields", 0) + fallback_fields
+    stats["seconds"] = stats.get("seconds", 0.0) + seconds
@@ -0,0 +1,59 @@
+"""
+Named start states for ``@pytest.mark.start_state`` (see utils/start_state_pool.py).
+"""
+
+from pages.checkout_page import CheckoutPage
+from pages.login_page import LoginPage
+from pages.product_page import ProductPage
+from utils.start_state_pool import StartState
+
+SHIPPING_ADDRESS = {
+    "first_name": "John",
+    "last_name": "Doe",
+    "email": "john.doe@example.com",
+    "phone": "555-1234",
+    "address": "123 Main St",
+    "city": "New York",
+    "state": "NY",
+    "zip_code": "10001",
+}
+
+
+def _search_laptops(product_page: ProductPage) -> None:
+    """Search the product listing for laptops."""
+    product_page.navigate()
+    product_page.search_product("Laptop")
+
+
+def _checkout_with_cart(checkout_page: CheckoutPage) -> None:
+    """Put a laptop in the cart and go to the checkout form."""
+    _search_laptops(ProductPage(checkout_page.page))
+    ProductPage(checkout_page.page).add_first_product_to_cart()
+    checkout_page.navigate()
+
+
+START_STATES = {
+    state.name: state
+    for state in (
+        StartState("login", LoginPage, navigate=LoginPage.navigate),
+        StartState("products", ProductPage, navigate=ProductPage.navigate),
+        StartState("laptop_search", ProductPage, navigate=_search_laptops),
+        StartState("checkout", CheckoutPage, navigate=CheckoutPage.navigate),
+        # Several navigations, so the end state is saved (see utils/checkpoints.py)
+        StartState(
+            "checkout_with_cart",
+            CheckoutPage,
+            navigate=_checkout_with_cart,
+            checkpoint=True,
+            check=CheckoutPage.has_order_items,
+        ),
+        StartState(
+            "checkout_with_address",
+            CheckoutPage,
+            navigate=_checkout_with_cart,
+            fill=lambda checkout_page: checkout_page.fill_shipping_address(**SHIPPING_ADDRESS),
+            checkpoint=True,
+            check=CheckoutPage.has_order_items,
+        ),
+    )
+}
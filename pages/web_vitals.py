@@ -0,0 +1,183 @@
+"""
+Web vitals and navigation timing of every navigate().
+
+An init script observes largest-contentful-paint and layout-shift entries
+from the start of each document; after a page object's ``navigate()`` is
+ready, one ``evaluate`` call reads them together with Navigation Timing,
+paint timings and transfer sizes. Samples are tagged with the route (the
+path passed to ``navigate``) and checked against per-route budgets, which
+warn about or fail the test when a metric is over its threshold. Failures
+are collected rather than raised, so the test's own steps run to the end,
+and the page fixture fails the test with them at teardown.
+"""
+
+import inspect
+import json
+import os
+import statistics
+import time
+import warnings
+from dataclasses import dataclass
+from typing import Awaitable, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+from utils import session_stats
+
+STATS_SECTION = "web_vitals"
+METRICS = ("ttfb", "fcp", "lcp", "dcl", "load", "cls", "transfer", "requests")
+
+INIT_SCRIPT = """
+(() => {
+    const vitals = window.__webVitals = { lcp: 0, cls: 0 };
+    try {
+        new PerformanceObserver(list => {
+            for (const entry of list.getEntries()) vitals.lcp = entry.startTime;
+        }).observe({ type: "largest-contentful-paint", buffered: true });
+        new PerformanceObserver(list => {
+            for (const entry of list.getEntries()) {
+                if (!entry.hadRecentInput) vitals.cls += entry.value;
+            }
+        }).observe({ type: "layout-shift", buffered: true });
+    } catch (error) {
+        // Entry types not supported by this browser
+    }
+})();
+"""
+
+# Waits one frame so the paint that made the page ready is reported
+_COLLECT_SCRIPT = """
+async () => {
+    await new Promise(resolve => requestAnimationFrame(() => setTimeout(resolve)));
+    const navigation = performance.getEntriesByType("navigation")[0];
+    const paints = Object.fromEntries(
+        performance.getEntriesByType("paint").map(entry => [entry.name, entry.startTime])
+    );
+    const resources = performance.getEntriesByType("resource");
+    const vitals = window.__webVitals || {};
+    const ms = value => (value > 0 ? Math.round(value) : null);
+    return {
+        ttfb: navigation ? ms(navigation.responseStart) : null,
+        fcp: ms(paints["first-contentful-paint"]),
+        lcp: ms(vitals.lcp),
+        dcl: navigation ? ms(navigation.domContentLoadedEventEnd) : null,
+        load: navigation ? ms(navigation.loadEventEnd) : null,
+        cls: vitals.cls === undefined ? null : Math.round(vitals.cls * 1000) / 1000,
+        transfer: resources.reduce(
+            (total, entry) => total + (entry.transferSize || 0),
+            navigation ? navigation.transferSize : 0
+        ),
+        requests: resources.length + (navigation ? 1 : 0),
+    };
+}
+"""
+
+
+class WebVitalsBudgetWarning(UserWarning):
+    """A route went over the warning threshold of a budget."""
+
+
+@dataclass(frozen=True)
+class Budget:
+    """Thresholds for one metric (ms, except cls, transfer in bytes and requests)."""
+
+    metric: str
+    warn: Optional[float] = None
+    fail: Optional[float] = None
+
+    def __post_init__(self):
+        if self.metric not in METRICS:
+            raise ValueError(f"Unknown web vitals metric {self.metric!r}, expected one of {METRICS}")
+
+
+def route_of(path: str) -> str:
+    """Get the route a navigate() path belongs to, e.g. "/products" for "/products?sort=name"."""
+    return urlsplit(path).path or "/"
+
+
+class WebVitalsCollector:
+    """Collects the web vitals of a test's navigations (a navigation hook, see BasePage)."""
+
+    def __init__(self, test_id: str, budgets: Dict[str, Sequence[Budget]]):
+        """Check samples against ``budgets``, which map routes (or "*" for all) to budgets."""
+        self.test_id = test_id
+        self.budgets = budgets
+        # Metrics over their fail threshold, reported when the test ends
+        self.violations: List[str] = []
+
+    def __call__(self, page_object, path: str) -> Optional[Awaitable[None]]:
+        """Collect and check the web vitals after a navigation; async page objects get an awaitable."""
+        metrics = page_object.page.evaluate(_COLLECT_SCRIPT)
+        if inspect.isawaitable(metrics):
+            return self._record_async(page_object, path, metrics)
+        self._record(page_object, path, metrics)
+        return None
+
+    async def _record_async(self, page_object, path: str, metrics: Awaitable[dict]) -> None:
+        """Record the metrics of an async page object once they arrive."""
+        self._record(page_object, path, await metrics)
+
+    def _record(self, page_object, path: str, metrics: dict) -> None:
+        """Add a navigation's sample and keep the metrics over their fail threshold."""
+        route = route_of(path)
+        session_stats.append(
+            STATS_SECTION,
+            "samples",
+            {"test": self.test_id, "page": type(page_object).__name__, "route": route, **metrics},
+        )
+        self.violations.extend(self.check(route, metrics))
+
+    def check(self, route: str, metrics: Dict[str, Optional[float]]) -> List[str]:
+        """Warn about metrics over their warning threshold; returns those over their fail threshold."""
+        violations = []
+        for budget in [*self.budgets.get(route, ()), *self.budgets.get("*", ())]:
+            value = metrics.get(budget.metric)
+            if value is None:
+                continue
+            if budget.fail is not None and value > budget.fail:
+                violations.append(f"{route} {budget.metric} is {value}, over its budget of {budget.fail}")
+            elif budget.warn is not None and value > budget.warn:
+                warnings.warn(
+                    WebVitalsBudgetWarning(f"{route} {budget.metric} is {value}, over {budget.warn}")
+                )
+        return violations
+
+
+def write_run_file(samples: List[dict], directory: str) -> str:
+    """Write a run's samples as compact JSON lines to a new file; returns its path."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, time.strftime("web-vitals-%Y%m%d-%H%M%S.jsonl"))
+    with open(path, "w") as run_file:
+        for sample in samples:
+            run_file.write(json.dumps(sample, separators=(",", ":")) + "\n")
+    return path
+
+
+def format_summary(stats: dict) -> List[str]:
+    """Summarize the samples per route: medians, and p95 of the paint metrics."""
+    by_route: Dict[str, List[dict]] = {}
+    for sample in stats.get("samples", []):
+        by_route.setdefault(sample["route"], []).append(sample)
+
+    def values(samples: List[dict], metric: str) -> List[float]:
+        return sorted(sample[metric] for sample in samples if sample.get(metric) is not None)
+
+    def median(samples: List[dict], metric: str) -> str:
+        found = values(samples, metric)
+        return f"{statistics.median(found):g}" if found else "-"
+
+    def p95(samples: List[dict], metric: str) -> str:
+        found = values(samples, metric)
+        return f"{found[min(len(found) - 1, int(len(found) * 0.95))]:g}" if found else "-"
+
+    lines = [
+        f"{'route':<20}{'navs':>6}{'ttfb':>7}{'fcp':>7}{'lcp':>7}{'lcp p95':>9}{'cls':>7}{'KiB':>7}"
+    ]
+    for route, samples in sorted(by_route.items()):
+        transfer = values(samples, "transfer")
+        lines.append(
+            f"{route:<20}{len(samples):>6}{median(samples, 'ttfb'):>7}{median(samples, 'fcp'):>7}"
+            f"{median(samples, 'lcp'):>7}{p95(samples, 'lcp'):>9}{median(samples, 'cls'):>7}"
+            f"{(statistics.median(transfer) / 1024 if transfer else 0):>7.0f}"
+        )
+    lines.append("medians in ms, except cls")
+    return lines
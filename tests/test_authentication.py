@@ -5,6 +5,14 @@ Authentication tests for login and registration functionality.
 import pytest
 from pages.login_page import LoginPage
 
+# Case name -> (login details, words one of which the error must contain)
+VALIDATION_CASES = {
+    "empty_email": ({"email": "", "password": "TestPassword123!"}, ("required", "email")),
+    "empty_password": ({"email": "testuser@example.com", "password": ""}, ("required", "password")),
+    "empty_credentials": ({"email": "", "password": ""}, ("required",)),
+}
+CASE_FIELDS = {name: fields for name, (fields, _) in VALIDATION_CASES.items()}
+
 
 class TestAuthentication:
     """Test suite for authentication features."""
@@ -33,28 +41,14 @@ class TestAuthentication:
         assert "Invalid credentials" in error_message or "incorrect" in error_message.lower()
 
     @pytest.mark.regression
-    def test_empty_email_login(self, login_page: LoginPage):
-        """Test login with empty email field."""
-        login_page.navigate()
-        login_page.login("", "TestPassword123!")
-        error_message = login_page.get_error_message()
-        assert "required" in error_message.lower() or "email" in error_message.lower()
-
-    @pytest.mark.regression
-    def test_empty_password_login(self, login_page: LoginPage):
-        """Test login with empty password field."""
-        login_page.navigate()
-        login_page.login("testuser@example.com", "")
-        error_message = login_page.get_error_message()
-        assert "required" in error_message.lower() or "password" in error_message.lower()
-
-    @pytest.mark.regression
-    def test_empty_credentials_login(self, login_page: LoginPage):
-        """Test login with both email and password empty."""
-        login_page.navigate()
-        login_page.login("", "")
-        error_message = login_page.get_error_message()
-        assert "required" in error_message.lower()
+    @pytest.mark.parametrize("case", VALIDATION_CASES)
+    def test_login_validation(self, case, validation_results):
+        """Test that login rejects empty fields with a matching error."""
+        # All cases are submitted on one load of the login form, then checked one by one
+        errors = validation_results("login", CASE_FIELDS)
+        assert errors[case], f"The login was accepted for {case}"
+        expected_words = VALIDATION_CASES[case][1]
+        assert any(word in errors[case].lower() for word in expected_words), errors[case]
 
     @pytest.mark.ui
     def test_login_page_elements_visible(self, login_page: LoginPage):
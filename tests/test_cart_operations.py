@@ -2,9 +2,23 @@
 Shopping cart operations tests.
 """
 
+import asyncio
 import pytest
 from pages.product_page import ProductPage
 from pages.cart_page import CartPage
+from pages.aio import AsyncCartPage, AsyncProductPage
+from utils.async_runner import AsyncRunner
+
+
+async def add_first_search_result(page, term: str) -> bool:
+    """Search in a tab and add the first result to the cart; returns whether there was one."""
+    product_page = AsyncProductPage(page)
+    await product_page.navigate()
+    await product_page.search_product(term)
+    if await product_page.get_product_count() == 0:
+        return False
+    await product_page.add_first_product_to_cart()
+    return True
 
 
 class TestCartOperations:
@@ -28,109 +42,96 @@ class TestCartOperations:
         assert cart_page.is_cart_empty()
 
     @pytest.mark.regression
-    def test_remove_item_from_cart(self, product_page: ProductPage, cart_page: CartPage):
+    def test_remove_item_from_cart(self, cart_with_items):
         """Test removing an item from the cart."""
-        product_page.navigate()
-        product_page.search_product("Laptop")
-        
-        if product_page.get_product_count() > 0:
-            product_page.add_first_product_to_cart()
-            cart_page.navigate()
-            initial_count = cart_page.get_cart_item_count()
-            
-            cart_page.remove_first_item()
-            # Cart should have one fewer item
-            assert cart_page.get_cart_item_count() < initial_count
+        cart_page = cart_with_items(("LAPTOP-001", 1))
+        initial_count = cart_page.get_cart_item_count()
+
+        cart_page.remove_first_item()
+        # Cart should have one fewer item
+        assert cart_page.get_cart_item_count() < initial_count
 
     @pytest.mark.regression
-    def test_update_item_quantity(self, product_page: ProductPage, cart_page: CartPage):
+    def test_update_item_quantity(self, cart_with_items):
         """Test updating the quantity of an item in the cart."""
-        product_page.navigate()
-        product_page.search_product("Laptop")
-        
-        if product_page.get_product_count() > 0:
-            product_page.add_first_product_to_cart()
-            cart_page.navigate()
-            cart_page.update_item_quantity(0, "3")
-            # Quantity should be updated
-            assert cart_page.page.url  # Page should be valid
+        cart_page = cart_with_items(("LAPTOP-001", 1))
+        cart_page.update_item_quantity(0, "3")
+        # Quantity should be updated
+        assert cart_page.page.url  # Page should be valid
 
     @pytest.mark.ui
-    def test_cart_displays_item_details(self, product_page: ProductPage, cart_page: CartPage):
+    def test_cart_displays_item_details(self, cart_with_items):
         """Test that cart displays item price and quantity."""
-        product_page.navigate()
-        product_page.search_product("Laptop")
-        
-        if product_page.get_product_count() > 0:
-            product_page.add_first_product_to_cart()
-            cart_page.navigate()
-            
-            assert cart_page.get_first_item_price() != ""
-            assert cart_page.get_first_item_quantity() != ""
+        cart_page = cart_with_items(("LAPTOP-001", 1))
+
+        assert cart_page.get_first_item_price() != ""
+        assert cart_page.get_first_item_quantity() != ""
 
     @pytest.mark.regression
-    def test_cart_totals_calculation(self, product_page: ProductPage, cart_page: CartPage):
+    def test_cart_totals_calculation(self, cart_with_items):
         """Test that cart calculates subtotal, tax, and total correctly."""
-        product_page.navigate()
-        product_page.search_product("Laptop")
-        
-        if product_page.get_product_count() > 0:
-            product_page.add_first_product_to_cart()
-            cart_page.navigate()
-            
-            subtotal = cart_page.get_subtotal()
-            tax = cart_page.get_tax()
-            total = cart_page.get_total()
-            
-            assert subtotal != ""
-            assert tax != ""
-            assert total != ""
+        cart_page = cart_with_items(("LAPTOP-001", 1))
+
+        subtotal = cart_page.get_subtotal()
+        tax = cart_page.get_tax()
+        total = cart_page.get_total()
+
+        assert subtotal != ""
+        assert tax != ""
+        assert total != ""
 
     @pytest.mark.regression
-    def test_continue_shopping_navigation(self, product_page: ProductPage, cart_page: CartPage, page):
+    def test_continue_shopping_navigation(self, cart_with_items, page):
         """Test continuing shopping from cart."""
-        product_page.navigate()
-        product_page.search_product("Laptop")
-        
-        if product_page.get_product_count() > 0:
-            product_page.add_first_product_to_cart()
-            cart_page.navigate()
-            cart_page.click_continue_shopping()
-            
-            # Should navigate back to products page
-            assert "/products" in page.url or "/shop" in page.url
+        cart_page = cart_with_items(("LAPTOP-001", 1))
+        cart_page.click_continue_shopping()
+
+        # Should navigate back to products page
+        assert "/products" in page.url or "/shop" in page.url
 
     @pytest.mark.slow
-    def test_add_multiple_products_to_cart(self, product_page: ProductPage, cart_page: CartPage):
-        """Test adding multiple different products to the cart."""
-        product_page.navigate()
-        product_page.search_product("Laptop")
-        
-        if product_page.get_product_count() > 0:
-            product_page.add_first_product_to_cart()
-            product_page.navigate()
-            product_page.search_product("Mouse")
-            
-            if product_page.get_product_count() > 0:
-                product_page.add_first_product_to_cart()
-                cart_page.navigate()
-                
-                # Cart should have at least 2 items
-                assert cart_page.get_cart_item_count() >= 2
+    def test_add_multiple_products_to_cart(self, aio: AsyncRunner, base_url: str):
+        """Test adding multiple different products to the cart from two tabs at once."""
+
+        async def scenario():
+            laptop_tab, mouse_tab = await aio.open_tabs(2, prime_url=base_url)
+            added = await asyncio.gather(
+                add_first_search_result(laptop_tab, "Laptop"), add_first_search_result(mouse_tab, "Mouse")
+            )
+            cart_page = AsyncCartPage(laptop_tab)
+            await cart_page.navigate()
+            return added, await cart_page.get_cart_item_count()
+
+        added, item_count = aio.run(scenario())
+        assert all(added), f"No search result to add in some tabs: {added}"
+        # Both tabs share the session, so the cart should have at least 2 items
+        assert item_count >= 2
 
     @pytest.mark.regression
-    def test_cart_persistence_after_navigation(self, product_page: ProductPage, cart_page: CartPage):
+    def test_concurrent_adds_of_same_product(self, aio: AsyncRunner, base_url: str):
+        """Test that adding the same product from several tabs at once loses no update."""
+        tab_count = 4
+
+        async def scenario():
+            tabs = await aio.open_tabs(tab_count, prime_url=base_url)
+            added = await asyncio.gather(*(add_first_search_result(tab, "Laptop") for tab in tabs))
+            cart_page = AsyncCartPage(tabs[0])
+            await cart_page.navigate()
+            return added, await cart_page.get_items()
+
+        added, items = aio.run(scenario())
+        assert all(added), f"No search result to add in some tabs: {added}"
+        assert len(items) == 1
+        assert items[0].quantity == tab_count
+
+    @pytest.mark.regression
+    def test_cart_persistence_after_navigation(self, cart_with_items, product_page: ProductPage):
         """Test that cart items persist after navigating away and back."""
+        cart_page = cart_with_items(("LAPTOP-001", 1))
+        initial_count = cart_page.get_cart_item_count()
+
         product_page.navigate()
-        product_page.search_product("Laptop")
-        
-        if product_page.get_product_count() > 0:
-            product_page.add_first_product_to_cart()
-            cart_page.navigate()
-            initial_count = cart_page.get_cart_item_count()
-            
-            product_page.navigate()
-            cart_page.navigate()
-            
-            # Cart should still have the same items
-            assert cart_page.get_cart_item_count() == initial_count
+        cart_page.navigate()
+
+        # Cart should still have the same items
+        assert cart_page.get_cart_item_count() == initial_count
@@ -3,112 +3,51 @@ Checkout process tests.
 """
 
 import pytest
-from pages.product_page import ProductPage
 from pages.cart_page import CartPage
 from pages.checkout_page import CheckoutPage
 
+VALID_ORDER = {
+    "first_name": "John",
+    "last_name": "Doe",
+    "email": "john.doe@example.com",
+    "phone": "555-1234",
+    "address": "123 Main St",
+    "city": "New York",
+    "state": "NY",
+    "zip_code": "10001",
+    "card_number": "4111111111111111",
+    "expiry": "12/25",
+    "cvv": "123",
+}
+
+# Case name -> (checkout details, words one of which the error must contain)
+VALIDATION_CASES = {
+    "missing_first_name": ({**VALID_ORDER, "first_name": ""}, ("required", "first name")),
+    "invalid_email": ({**VALID_ORDER, "email": "invalid-email"}, ("email", "invalid")),
+    "invalid_phone": ({**VALID_ORDER, "phone": "invalid"}, ("phone", "invalid")),
+    "invalid_card_number": ({**VALID_ORDER, "card_number": "1234567890123456"}, ("card", "payment")),
+    "expired_card": ({**VALID_ORDER, "expiry": "01/20"}, ("expired", "card")),
+    "invalid_cvv": ({**VALID_ORDER, "cvv": "99"}, ("cvv", "security")),
+}
+CASE_FIELDS = {name: fields for name, (fields, _) in VALIDATION_CASES.items()}
+
 
 class TestCheckout:
     """Test suite for checkout functionality."""
 
     @pytest.mark.smoke
+    @pytest.mark.start_state("checkout")
     def test_checkout_page_loads(self, checkout_page: CheckoutPage):
         """Test that checkout page loads successfully."""
-        checkout_page.navigate()
         assert checkout_page.is_order_summary_visible()
 
     @pytest.mark.regression
-    def test_complete_checkout_happy_path(
-        self, product_page: ProductPage, cart_page: CartPage, checkout_page: CheckoutPage, page
-    ):
+    def test_complete_checkout_happy_path(self, cart_with_items, checkout_page: CheckoutPage, page):
         """Test completing a full checkout process."""
-        product_page.navigate()
-        product_page.search_product("Laptop")
-        
-        if product_page.get_product_count() > 0:
-            product_page.add_first_product_to_cart()
-            cart_page.navigate()
-            cart_page.click_checkout()
-            
-            checkout_page.complete_checkout(
-                first_name="John",
-                last_name="Doe",
-                email="john.doe@example.com",
-                phone="555-1234",
-                address="123 Main St",
-                city="New York",
-                state="NY",
-                zip_code="10001",
-                card_number="4111111111111111",
-                expiry="12/25",
-                cvv="123",
-            )
-            
-            # Should show success message or redirect to confirmation page
-            assert "success" in page.url.lower() or "confirmation" in page.url.lower() or checkout_page.get_success_message() != ""
-
-    @pytest.mark.regression
-    def test_checkout_missing_first_name(self, checkout_page: CheckoutPage):
-        """Test checkout with missing first name."""
-        checkout_page.navigate()
-        checkout_page.fill_shipping_address(
-            first_name="",
-            last_name="Doe",
-            email="john.doe@example.com",
-            phone="555-1234",
-            address="123 Main St",
-            city="New York",
-            state="NY",
-            zip_code="10001",
-        )
-        checkout_page.place_order()
-        
-        error_message = checkout_page.get_error_message()
-        assert "required" in error_message.lower() or "first name" in error_message.lower()
-
-    @pytest.mark.regression
-    def test_checkout_invalid_email(self, checkout_page: CheckoutPage):
-        """Test checkout with invalid email format."""
-        checkout_page.navigate()
-        checkout_page.fill_shipping_address(
-            first_name="John",
-            last_name="Doe",
-            email="invalid-email",
-            phone="555-1234",
-            address="123 Main St",
-            city="New York",
-            state="NY",
-            zip_code="10001",
-        )
-        checkout_page.place_order()
-        
-        error_message = checkout_page.get_error_message()
-        assert "email" in error_message.lower() or "invalid" in error_message.lower()
+        cart_page = cart_with_items(("LAPTOP-001", 1))
+        cart_page.click_checkout()
 
-    @pytest.mark.regression
-    def test_checkout_invalid_phone(self, checkout_page: CheckoutPage):
-        """Test checkout with invalid phone number."""
-        checkout_page.navigate()
-        checkout_page.fill_shipping_address(
-            first_name="John",
-            last_name="Doe",
-            email="john.doe@example.com",
-            phone="invalid",
-            address="123 Main St",
-            city="New York",
-            state="NY",
-            zip_code="10001",
-        )
-        checkout_page.place_order()
-        
-        error_message = checkout_page.get_error_message()
-        assert "phone" in error_message.lower() or "invalid" in error_message.lower()
-
-    @pytest.mark.regression
-    def test_checkout_invalid_card_number(self, checkout_page: CheckoutPage):
-        """Test checkout with invalid credit card number."""
-        checkout_page.navigate()
-        checkout_page.fill_shipping_address(
+        checkout_page.complete_checkout(
             first_name="John",
             last_name="Doe",
             email="john.doe@example.com",
@@ -117,77 +56,36 @@ class TestCheckout:
             city="New York",
             state="NY",
             zip_code="10001",
-        )
-        checkout_page.fill_payment_info(
-            card_number="1234567890123456",
+            card_number="4111111111111111",
             expiry="12/25",
             cvv="123",
         )
-        checkout_page.place_order()
-        
-        error_message = checkout_page.get_error_message()
-        assert "card" in error_message.lower() or "payment" in error_message.lower()
 
-    @pytest.mark.regression
-    def test_checkout_expired_card(self, checkout_page: CheckoutPage):
-        """Test checkout with an expired credit card."""
-        checkout_page.navigate()
-        checkout_page.fill_shipping_address(
-            first_name="John",
-            last_name="Doe",
-            email="john.doe@example.com",
-            phone="555-1234",
-            address="123 Main St",
-            city="New York",
-            state="NY",
-            zip_code="10001",
-        )
-        checkout_page.fill_payment_info(
-            card_number="4111111111111111",
-            expiry="01/20",
-            cvv="123",
-        )
-        checkout_page.place_order()
-        
-        error_message = checkout_page.get_error_message()
-        assert "expired" in error_message.lower() or "card" in error_message.lower()
+        # Should show success message or redirect to confirmation page
+        assert "success" in page.url.lower() or "confirmation" in page.url.lower() or checkout_page.get_success_message() != ""
 
     @pytest.mark.regression
-    def test_checkout_invalid_cvv(self, checkout_page: CheckoutPage):
-        """Test checkout with invalid CVV."""
-        checkout_page.navigate()
-        checkout_page.fill_shipping_address(
-            first_name="John",
-            last_name="Doe",
-            email="john.doe@example.com",
-            phone="555-1234",
-            address="123 Main St",
-            city="New York",
-            state="NY",
-            zip_code="10001",
-        )
-        checkout_page.fill_payment_info(
-            card_number="4111111111111111",
-            expiry="12/25",
-            cvv="99",
-        )
-        checkout_page.place_order()
-        
-        error_message = checkout_page.get_error_message()
-        assert "cvv" in error_message.lower() or "security" in error_message.lower()
+    @pytest.mark.parametrize("case", VALIDATION_CASES)
+    def test_checkout_validation(self, case, validation_results):
+        """Test that checkout rejects invalid details with a matching error."""
+        # All cases are submitted on one load of the checkout form, then checked one by one
+        errors = validation_results("checkout_with_cart", CASE_FIELDS)
+        assert errors[case], f"The checkout was accepted for {case}"
+        expected_words = VALIDATION_CASES[case][1]
+        assert any(word in errors[case].lower() for word in expected_words), errors[case]
 
     @pytest.mark.regression
+    @pytest.mark.start_state("checkout")
     def test_checkout_select_shipping_method(self, checkout_page: CheckoutPage):
         """Test selecting different shipping methods."""
-        checkout_page.navigate()
         checkout_page.select_shipping_method("express")
         # Should update shipping method without error
         assert checkout_page.page.url  # Page should be valid
 
     @pytest.mark.regression
+    @pytest.mark.start_state("checkout")
     def test_back_to_cart_from_checkout(self, checkout_page: CheckoutPage, cart_page: CartPage, page):
         """Test navigating back to cart from checkout."""
-        checkout_page.navigate()
         checkout_page.click_back_to_cart()
         
         # Should navigate back to cart page
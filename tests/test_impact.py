@@ -0,0 +1,78 @@
+"""
+Test impact analysis tests.
+"""
+
+from utils.impact import MODULE_CODE, behaviour_changes, is_affected, source_symbols, symbol_of_test
+
+PAGE_SOURCE = '''
+"""Docstring."""
+import os
+
+BASE = "x"
+
+
+class CartPage(BasePage):
+    """Cart."""
+
+    ITEMS = ".cart-item"
+
+    def count(self):
+        return 1
+'''
+
+
+class TestImpact:
+    """Test suite for the symbol comparison and test selection."""
+
+    def test_source_symbols_splits_methods_and_constants(self):
+        """Test that methods and class constants are symbols of their own."""
+        symbols = source_symbols(PAGE_SOURCE)
+
+        assert set(symbols) == {"CartPage.ITEMS", "CartPage.count", MODULE_CODE}
+
+    def test_source_symbols_ignore_formatting_comments_and_docstrings(self):
+        """Test that only changes to the code change a symbol."""
+        reformatted = PAGE_SOURCE.replace("return 1", "return (1)  # one").replace('"""Cart."""', '"""Shopping cart."""')
+
+        assert source_symbols(reformatted) == source_symbols(PAGE_SOURCE)
+
+    def test_source_symbols_track_each_change(self):
+        """Test that a change shows up in the symbol it was made in only."""
+        before = source_symbols(PAGE_SOURCE)
+        locator_changed = source_symbols(PAGE_SOURCE.replace('".cart-item"', '".line-item"'))
+        module_changed = source_symbols(PAGE_SOURCE.replace('BASE = "x"', 'BASE = "y"'))
+
+        assert {name for name in before if before[name] != locator_changed[name]} == {"CartPage.ITEMS"}
+        assert {name for name in before if before[name] != module_changed[name]} == {MODULE_CODE}
+
+    def test_source_symbols_of_invalid_source(self):
+        """Test that source that does not parse is one module-level symbol."""
+        assert source_symbols("def broken(:") == {MODULE_CODE: "def broken(:"}
+
+    def test_symbol_of_test(self):
+        """Test that node ids map to their test function, parameters and all."""
+        assert symbol_of_test("tests/test_cart.py::TestCart::test_add") == "tests.test_cart:TestCart.test_add"
+        assert symbol_of_test("tests/test_cart.py::test_add[case-1]") == "tests.test_cart:test_add"
+
+    def test_is_affected(self):
+        """Test the selection rules for a recorded test."""
+        test_id = "tests/test_cart.py::TestCart::test_add"
+        dependencies = ["pages.cart_page:CartPage.count", "pages.cart_page:CartPage.ITEMS"]
+
+        assert not is_affected(test_id, dependencies, set())
+        assert not is_affected(test_id, dependencies, {"pages.login_page:LoginPage.login"})
+        assert is_affected(test_id, dependencies, {"pages.cart_page:CartPage.ITEMS"})
+        assert is_affected(test_id, dependencies, {f"pages.cart_page:{MODULE_CODE}"})
+        assert is_affected(test_id, dependencies, {"tests.test_cart:TestCart.test_add"})
+        assert is_affected(test_id, dependencies, {f"tests.test_cart:{MODULE_CODE}"})
+        assert not is_affected(test_id, dependencies, {"tests.test_cart:TestCart.test_remove"})
+
+    def test_unrecorded_test_is_affected(self):
+        """Test that a test missing from the index always runs."""
+        assert is_affected("tests/test_new.py::test_it", None, set())
+
+    def test_behaviour_changes_ignore_documentation_only(self):
+        """Test that any unanalysed change but documentation selects every test."""
+        changed = ["README.md", "docs/guide.rst", ".gitignore", "conftest.py", "fixtures/test_users.json", "utils/x.py"]
+
+        assert behaviour_changes(changed) == ["conftest.py", "fixtures/test_users.json", "utils/x.py"]
@@ -0,0 +1,115 @@
+"""
+Page object timing tests.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pages import instrumentation
+from utils import method_hooks
+
+
+class FakeClock:
+    """A perf_counter_ns the dummy page objects move forward."""
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class DummyPage:
+    """A page object whose steps take a known time."""
+
+    def __init__(self, clock: FakeClock):
+        self.clock = clock
+
+    def step(self):
+        self.clock.now += 10
+        self.inner()
+        self.clock.now += 5
+
+    def inner(self):
+        self.clock.now += 100
+
+
+class DummyChildPage(DummyPage):
+    """A page object overriding a step and calling the original through super()."""
+
+    def inner(self):
+        self.clock.now += 1
+        super().inner()
+
+    async def load(self):
+        self.clock.now += 7
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    """Time the dummy page objects with a fake clock, leaving the session's timings alone."""
+    clock = FakeClock()
+    monkeypatch.setattr(instrumentation, "time", SimpleNamespace(perf_counter_ns=clock))
+    monkeypatch.setattr(instrumentation, "_timings", {})
+    monkeypatch.setattr(instrumentation, "_current_test", "")
+    listening = instrumentation._time_call in method_hooks._listeners
+    instrumentation.instrument(DummyPage)
+    yield clock
+    if not listening:
+        instrumentation.uninstrument()
+
+
+class TestInstrumentation:
+    """Test suite for the page object timings."""
+
+    def test_self_time_excludes_instrumented_callees(self, clock: FakeClock):
+        """Test that a step's self time leaves out the time of the steps it calls."""
+        instrumentation.set_current_test("test_a")
+        DummyChildPage(clock).step()
+
+        timings = instrumentation.collect()["tests"]["test_a"]
+
+        assert timings["DummyChildPage.step"] == {"calls": 1, "total_ns": 116, "self_ns": 15, "max_ns": 116}
+        # The override and the method it calls through super() count as one call
+        assert timings["DummyChildPage.inner"] == {"calls": 1, "total_ns": 101, "self_ns": 101, "max_ns": 101}
+
+    def test_async_steps_record_total_time(self, clock: FakeClock):
+        """Test that async steps are timed, with their total time as self time."""
+        instrumentation.set_current_test("test_a")
+        asyncio.run(DummyChildPage(clock).load())
+
+        timings = instrumentation.collect()["tests"]["test_a"]
+
+        assert timings == {"DummyChildPage.load": {"calls": 1, "total_ns": 7, "self_ns": 7, "max_ns": 7}}
+
+    def test_collect_moves_timings_per_test(self, clock: FakeClock):
+        """Test that collect groups the timings by test and clears them."""
+        instrumentation.set_current_test("test_a")
+        DummyPage(clock).inner()
+        instrumentation.set_current_test("test_b")
+        DummyPage(clock).inner()
+        DummyPage(clock).inner()
+
+        stats = instrumentation.collect()
+
+        assert stats["tests"]["test_a"]["DummyPage.inner"]["calls"] == 1
+        assert stats["tests"]["test_b"]["DummyPage.inner"]["calls"] == 2
+        assert instrumentation.collect() == {"tests": {}}
+
+    def test_by_step_adds_up_tests(self):
+        """Test that by_step sums the calls and times of a step over tests and keeps the longest call."""
+        stats = {
+            "tests": {
+                "test_a": {"LoginPage.login": {"calls": 1, "total_ns": 30, "self_ns": 10, "max_ns": 30}},
+                "test_b": {
+                    "LoginPage.login": {"calls": 2, "total_ns": 50, "self_ns": 20, "max_ns": 40},
+                    "CartPage.navigate": {"calls": 1, "total_ns": 5, "self_ns": 5, "max_ns": 5},
+                },
+            }
+        }
+
+        assert instrumentation.by_step(stats) == {
+            "LoginPage.login": {"calls": 3, "total_ns": 80, "self_ns": 30, "max_ns": 40},
+            "CartPage.navigate": {"calls": 1, "total_ns": 5, "self_ns": 5, "max_ns": 5},
+        }
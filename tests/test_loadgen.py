@@ -0,0 +1,44 @@
+"""
+Load generation tests.
+"""
+
+import json
+import pytest
+from fake_app import FakeApp
+from loadgen import STEPS, LatencyHistogram, LoadSettings, UserSettings, run
+
+
+class TestLoadGeneration:
+    """Test suite for the load generator."""
+
+    def test_histogram_percentiles(self):
+        """Test that percentiles are within the bucket precision and survive merging."""
+        histogram = LatencyHistogram()
+        for ms in range(1, 1001):
+            histogram.record(ms)
+        histogram.record_error()
+
+        merged = LatencyHistogram.from_dict(histogram.to_dict())
+        merged.merge(histogram)
+
+        assert merged.count == 2000
+        assert merged.errors == 2
+        assert merged.percentile(50) == pytest.approx(500, rel=0.02)
+        assert merged.percentile(99) == pytest.approx(990, rel=0.02)
+
+    @pytest.mark.slow
+    def test_virtual_users_against_fake_app(self, tmp_path):
+        """Test running virtual users through the whole flow against the fake storefront."""
+        output = tmp_path / "load.jsonl"
+        user = UserSettings(email="testuser@example.com", password="TestPassword123!", iterations=2)
+
+        with FakeApp() as app:
+            settings = LoadSettings(base_url=app.url, user=user, users=2, processes=2, interval=1.0)
+            totals = run(settings, str(output))
+
+        for step in STEPS:
+            assert totals[step].count == 4
+            assert totals[step].errors == 0
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert {record["step"] for record in records if record["type"] == "total"} == set(STEPS)
+        assert all(record["p50"] <= record["p95"] <= record["p99"] for record in records)
@@ -0,0 +1,107 @@
+"""
+Duration-aware scheduling tests.
+"""
+
+import pytest
+from utils.scheduling import DEFAULT_SECONDS, DurationStore, LptScheduling, lpt_makespan
+
+
+class FakeCache:
+    """In-memory stand-in for the pytest cache."""
+
+    def __init__(self, values=None):
+        self.values = dict(values or {})
+
+    def get(self, key, default):
+        return self.values.get(key, default)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+
+class FakeConfig:
+    """Just enough of a pytest config for LoadScheduling."""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+
+    def getvalue(self, name):
+        return [f"{self.workers}*popen"] if name == "tx" else None
+
+    def getoption(self, name):
+        return None
+
+
+class FakeNode:
+    """A worker that remembers the tests it was sent."""
+
+    shutting_down = False
+
+    def __init__(self, name: str):
+        self.gateway = type("Gateway", (), {"id": name})()
+        self.sent = []
+
+    def send_runtest_some(self, indices):
+        self.sent.extend(indices)
+
+    def shutdown(self):
+        self.shutting_down = True
+
+
+class TestScheduling:
+    """Test suite for the LPT scheduler and its duration history."""
+
+    def test_lpt_makespan(self):
+        """Test that the longest tests are spread over the workers first."""
+        assert lpt_makespan([4, 3, 3, 2], 2) == 6
+        # LPT is a heuristic: 5+4 and 3+3+3 would take 9
+        assert lpt_makespan([5, 4, 3, 3, 3], 2) == 10
+        assert lpt_makespan([2, 2, 2], 1) == 6
+        assert lpt_makespan([], 3) == 0
+        # At least one worker, even when none is given
+        assert lpt_makespan([1, 2], 0) == 3
+
+    def test_estimate_uses_history_then_marker_factors(self):
+        """Test that known tests keep their duration and new ones scale the median by their markers."""
+        store = DurationStore(FakeCache({"scheduling/durations": {"a": 1.0, "b": 3.0, "c": 8.0}}))
+
+        estimates = store.estimate(["c", "new", "slow_new"], {"slow_new": 5.0})
+
+        assert estimates == [8.0, 3.0, 15.0]
+
+    def test_estimate_without_cache(self):
+        """Test that a store without a cache (-p no:cacheprovider) estimates every test as the default."""
+        store = DurationStore(None)
+        store.add("a", 1.0)
+        store.save()
+
+        assert store.estimate(["a"], {}) == [DEFAULT_SECONDS]
+
+    def test_save_smooths_durations(self):
+        """Test that a new duration is averaged with the previous one."""
+        cache = FakeCache({"scheduling/durations": {"a": 2.0}})
+        store = DurationStore(cache)
+        store.add("a", 3.0)
+        store.add("a", 1.0)
+        store.add("b", 1.5)
+        store.save()
+
+        assert cache.values["scheduling/durations"] == {"a": pytest.approx(3.0), "b": 1.5}
+
+    def test_schedule_hands_out_longest_first(self):
+        """Test that the pending tests are ordered longest first and each worker gets two."""
+        collection = ["short", "long", "medium", "tiny", "longest"]
+        history = {"short": 2.0, "long": 10.0, "medium": 5.0, "tiny": 1.0, "longest": 20.0}
+        scheduler = LptScheduling(FakeConfig(2), store=DurationStore(FakeCache({"scheduling/durations": history})))
+        nodes = [FakeNode("gw0"), FakeNode("gw1")]
+        for node in nodes:
+            scheduler.add_node(node)
+            scheduler.add_node_collection(node, collection)
+
+        scheduler.schedule()
+
+        sent = [collection[index] for node in nodes for index in node.sent]
+        assert sent == ["longest", "long", "medium", "short"]
+        assert [collection[index] for index in scheduler.pending] == ["tiny"]
+        assert scheduler.from_history == 5
+        assert scheduler.predicted_makespan == 20.0
@@ -0,0 +1,73 @@
+"""
+Web vitals budget and summary tests.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pages.web_vitals import Budget, WebVitalsBudgetWarning, WebVitalsCollector, format_summary, route_of
+
+BUDGETS = {
+    "*": (Budget("lcp", warn=2500, fail=4000),),
+    "/checkout": (Budget("cls", warn=0.1, fail=0.25),),
+}
+
+
+class TestWebVitals:
+    """Test suite for the web vitals budgets and report."""
+
+    def test_route_of_drops_query_and_fragment(self):
+        """Test that samples of one path are grouped whatever their query string."""
+        assert route_of("/products?sort=name") == "/products"
+        assert route_of("/checkout#payment") == "/checkout"
+        assert route_of("") == "/"
+
+    def test_check_returns_failures_instead_of_raising(self):
+        """Test that metrics over their fail threshold are returned, for the route and for every route."""
+        collector = WebVitalsCollector("test", BUDGETS)
+
+        violations = collector.check("/checkout", {"lcp": 4500, "cls": 0.3})
+
+        assert violations == [
+            "/checkout cls is 0.3, over its budget of 0.25",
+            "/checkout lcp is 4500, over its budget of 4000",
+        ]
+
+    def test_check_warns_under_the_fail_threshold(self):
+        """Test that a metric between the thresholds warns without failing, and missing metrics are skipped."""
+        collector = WebVitalsCollector("test", BUDGETS)
+
+        with pytest.warns(WebVitalsBudgetWarning, match="lcp is 3000"):
+            violations = collector.check("/products", {"lcp": 3000, "cls": None})
+
+        assert violations == []
+        assert collector.check("/products", {"lcp": None}) == []
+
+    def test_async_page_objects_are_collected_when_awaited(self):
+        """Test that an async page object's navigation gets an awaitable recording its sample."""
+
+        async def evaluate(script):
+            return {"lcp": 4500}
+
+        collector = WebVitalsCollector("test", BUDGETS)
+        page_object = SimpleNamespace(page=SimpleNamespace(evaluate=evaluate))
+
+        asyncio.run(collector(page_object, "/products"))
+
+        assert collector.violations == ["/products lcp is 4500, over its budget of 4000"]
+
+    def test_format_summary(self):
+        """Test that samples are summarized per route with medians and the LCP p95."""
+        samples = [
+            {"route": "/products", "ttfb": 100, "fcp": 200, "lcp": lcp, "cls": 0.0, "transfer": 2048}
+            for lcp in (300, 400, 500)
+        ]
+        samples.append({"route": "/cart", "ttfb": 50, "fcp": None, "lcp": None, "cls": None, "transfer": None})
+
+        lines = format_summary({"samples": samples})
+
+        assert lines[0].split() == ["route", "navs", "ttfb", "fcp", "lcp", "lcp", "p95", "cls", "KiB"]
+        assert lines[1].split() == ["/cart", "1", "50", "-", "-", "-", "-", "0"]
+        assert lines[2].split() == ["/products", "3", "100", "200", "400", "500", "0", "2"]
+        assert lines[-1] == "medians in ms, except cls"
@@ -0,0 +1,3 @@
+"""
+Test infrastructure helpers shared by the fixtures in conftest.py.
+"""
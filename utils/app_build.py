@@ -0,0 +1,54 @@
+"""
+Build id of the application under test.
+
+Anything cached from the app (saved checkpoints, test results) must not
+outlive a deploy. The build id comes from, in order:
+
+* ``APP_BUILD``, when it is set,
+* the body of ``APP_BUILD_URL`` (e.g. a /version endpoint), hashed unless
+  it is a short single line,
+* the ``APP_BUILD_HEADER`` header (default ``X-App-Build``, which the fake
+  storefront sends) of the app's home page, else its ``ETag``.
+"""
+
+import functools
+import hashlib
+import os
+import urllib.error
+import urllib.request
+
+BUILD_HEADER = "X-App-Build"
+UNKNOWN_BUILD = "unknown"
+
+
+@functools.lru_cache(maxsize=None)
+def get_build(base_url: str) -> str:
+    """Get the build id of the app at ``base_url``, or "unknown"."""
+    if os.getenv("APP_BUILD"):
+        return os.environ["APP_BUILD"]
+    if os.getenv("APP_BUILD_URL"):
+        return _build_from_endpoint(os.environ["APP_BUILD_URL"])
+    request = urllib.request.Request(base_url, method="HEAD")
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            headers = response.headers
+    except urllib.error.HTTPError as error:
+        # Error pages are served by the same build
+        headers = error.headers
+    except (OSError, ValueError):
+        return UNKNOWN_BUILD
+    return headers.get(os.getenv("APP_BUILD_HEADER", BUILD_HEADER)) or headers.get("ETag") or UNKNOWN_BUILD
+
+
+def _build_from_endpoint(url: str) -> str:
+    """Get the build id from the body of a version endpoint."""
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = response.read().decode(errors="replace").strip()
+    except (OSError, ValueError):
+        return UNKNOWN_BUILD
+    if not body:
+        return UNKNOWN_BUILD
+    if len(body) <= 64 and "\n" not in body:
+        return body
+    return hashlib.sha256(body.encode()).hexdigest()[:16]
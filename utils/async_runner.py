@@ -0,0 +1,115 @@
+"""
+Async Playwright running next to the sync suite.
+
+The sync API keeps its own event loop on the main thread, so the async
+driver and browser live on a dedicated event loop thread. Sync tests hand
+coroutines to ``AsyncRunner.run`` and get their results back, which lets one
+test drive many contexts concurrently with ``asyncio.gather``, or several
+tabs of one context (``open_tabs``), the way a user with many tabs shares
+one session and cart.
+
+With browser server endpoints (``--browser-servers`` or the browser daemon),
+the runner connects to a server instead of launching its own browser, and
+the suite's ``prepare_context`` hook sets up every context it creates the way
+the sync fixtures set up theirs (resource policy, web vitals script).
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from playwright.async_api import Browser, BrowserType, Error, BrowserContext, Page, Playwright, async_playwright
+
+
+class AsyncRunner:
+    """Owns an event loop thread with an async Playwright browser."""
+
+    def __init__(
+        self,
+        browser_name: str = "chromium",
+        launch_options: Optional[Dict[str, Any]] = None,
+        context_args: Optional[Dict[str, Any]] = None,
+        endpoints: Optional[List[str]] = None,
+    ):
+        """Start the event loop thread; the browser is launched (or, with ``endpoints``, connected) on first use."""
+        self.browser_name = browser_name
+        self.launch_options = launch_options or {"headless": True}
+        self.context_args = context_args or {}
+        self.endpoints = endpoints or []
+        # Called with every new context before it is handed out
+        self.prepare_context: Optional[Callable[[BrowserContext], Awaitable]] = None
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._contexts: List[BrowserContext] = []
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="async-playwright", daemon=True)
+        self._thread.start()
+
+    def run(self, coroutine: Awaitable, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the runner's loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout)
+
+    async def browser(self) -> Browser:
+        """Get the async browser, launching or connecting it on first use."""
+        if self._browser is None or not self._browser.is_connected():
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            browser_type = getattr(self._playwright, self.browser_name)
+            if self.endpoints:
+                self._browser = await self._connect(browser_type)
+            else:
+                self._browser = await browser_type.launch(**self.launch_options)
+        return self._browser
+
+    async def _connect(self, browser_type: BrowserType) -> Browser:
+        """Connect to the first reachable browser server."""
+        errors = []
+        for endpoint in self.endpoints:
+            try:
+                return await browser_type.connect(endpoint)
+            except Error as error:
+                errors.append(f"{endpoint}: {error.message}")
+        raise RuntimeError(f"No browser server is reachable: {'; '.join(errors)}")
+
+    async def new_context(self, **context_args) -> BrowserContext:
+        """Create a context that is closed by ``close_contexts``."""
+        browser = await self.browser()
+        context = await browser.new_context(**{**self.context_args, **context_args})
+        self._contexts.append(context)
+        if self.prepare_context is not None:
+            await self.prepare_context(context)
+        return context
+
+    async def open_tabs(self, count: int, prime_url: Optional[str] = None, **context_args) -> List[Page]:
+        """Open ``count`` pages in one new context, closed by ``close_contexts``.
+
+        With ``prime_url``, the context requests it first, so the tabs start
+        with the app's session cookie. Otherwise tabs whose first requests run
+        concurrently could each be given a session (and a cart) of their own.
+        """
+        context = await self.new_context(**context_args)
+        if prime_url is not None:
+            # The context's request API shares its cookies with the tabs
+            response = await context.request.get(prime_url)
+            await response.dispose()
+        return list(await asyncio.gather(*(context.new_page() for _ in range(count))))
+
+    async def close_contexts(self) -> None:
+        """Close every context created since the last call."""
+        contexts, self._contexts = self._contexts, []
+        await asyncio.gather(*(context.close() for context in contexts), return_exceptions=True)
+
+    def close(self) -> None:
+        """Close the browser, stop the driver and the event loop thread."""
+        self.run(self._shutdown())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def _shutdown(self) -> None:
+        """Close everything owned by the runner."""
+        await self.close_contexts()
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
@@ -0,0 +1,147 @@
+"""
+Login-state cache for authenticated tests.
+
+A user persona is logged in through the UI once per run, the resulting
+storage state (cookies and localStorage) is saved to disk, and later
+contexts are started from that file instead of logging in again. A file
+lock makes sure only one pytest-xdist worker performs the login.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Dict, Optional, Set
+
+from playwright.sync_api import BrowserContext
+
+from utils import session_stats
+from utils.file_lock import FileLock
+from utils.state_reset import restore_local_storage
+
+STATS_SECTION = "auth_cache"
+
+
+def load_personas(path: str) -> Dict[str, Dict[str, str]]:
+    """Load the user personas (name to credentials) from a JSON file."""
+    with open(path) as personas_file:
+        return json.load(personas_file)
+
+
+class AuthStateCache:
+    """Creates, stores and validates saved login states per persona."""
+
+    def __init__(
+        self,
+        cache_dir: str,
+        login: Callable[[str, str], BrowserContext],
+        ttl_seconds: float = 1800,
+        probe_url: Optional[str] = None,
+    ):
+        """Configure the cache.
+
+        ``login`` performs a UI login and returns the logged-in context.
+        ``probe_url`` is a page that redirects to the login page (or returns
+        401/403) once the session is no longer valid.
+        """
+        self.cache_dir = cache_dir
+        self.login = login
+        self.ttl_seconds = ttl_seconds
+        self.probe_url = probe_url
+        self._probed: Set[str] = set()
+
+    def storage_state(self, email: str, password: str) -> Dict:
+        """Get a valid storage state for the given credentials."""
+        key = self._key(email, password)
+        state = self._load(key)
+        if state is not None:
+            session_stats.add(STATS_SECTION, "hits")
+            return state
+
+        with FileLock(self._path(key) + ".lock"):
+            # Another worker may have logged in while we waited for the lock
+            state = self._load(key)
+            if state is not None:
+                session_stats.add(STATS_SECTION, "hits")
+                return state
+            state = self._login_and_save(key, email, password)
+        session_stats.add(STATS_SECTION, "logins")
+        return state
+
+    def apply(self, context: BrowserContext, email: str, password: str) -> None:
+        """Make an existing context logged in as the given user.
+
+        The saved localStorage is put back once per tab, so what the app
+        stores after that (cart, preferences, tokens) is kept on later loads.
+        """
+        state = self.storage_state(email, password)
+        key = self._key(email, password)
+        self._add_cookies(context, state)
+        if self.probe_url and key not in self._probed:
+            self._probed.add(key)
+            if not self._session_alive(context):
+                session_stats.add(STATS_SECTION, "stale_sessions")
+                self.invalidate(email, password)
+                context.clear_cookies()
+                state = self.storage_state(email, password)
+                self._add_cookies(context, state)
+        restore_local_storage(context, state)
+
+    def invalidate(self, email: str, password: str) -> None:
+        """Drop the saved state for the given credentials."""
+        try:
+            os.remove(self._path(self._key(email, password)))
+        except FileNotFoundError:
+            pass
+
+    def _login_and_save(self, key: str, email: str, password: str) -> Dict:
+        """Log in through the UI and save the resulting storage state."""
+        context = self.login(email, password)
+        try:
+            state = context.storage_state()
+        finally:
+            context.close()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as state_file:
+            json.dump(state, state_file)
+        os.replace(temp_path, self._path(key))
+        return state
+
+    def _load(self, key: str) -> Optional[Dict]:
+        """Load a saved state if it exists and has not expired."""
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                return None
+            with open(path) as state_file:
+                state = json.load(state_file)
+        except (OSError, ValueError):
+            return None
+        now = time.time()
+        for cookie in state.get("cookies", []):
+            # Session cookies have expires == -1
+            if 0 < cookie.get("expires", -1) < now:
+                return None
+        return state
+
+    def _session_alive(self, context: BrowserContext) -> bool:
+        """Check that the saved session is still accepted by the app."""
+        response = context.request.get(self.probe_url, max_redirects=0)
+        if response.status in (401, 403):
+            return False
+        location = response.headers.get("location", "")
+        return not (300 <= response.status < 400 and "/login" in location)
+
+    def _add_cookies(self, context: BrowserContext, state: Dict) -> None:
+        """Load the cookies of a saved state into a context."""
+        if state.get("cookies"):
+            context.add_cookies(state["cookies"])
+
+    def _key(self, email: str, password: str) -> str:
+        """Get the cache key for a set of credentials."""
+        return hashlib.sha256(f"{email}\0{password}".encode()).hexdigest()[:16]
+
+    def _path(self, key: str) -> str:
+        """Get the path of the saved state for a cache key."""
+        return os.path.join(self.cache_dir, f"{key}.json")
@@ -0,0 +1,244 @@
+"""
+Warm browser kept running between pytest runs.
+
+The daemon starts a Playwright browser server (see utils/browser_servers.py)
+and answers on a Unix socket with its WebSocket endpoint. A pytest run
+that finds the socket connects to the warm browser instead of launching
+one, and keeps its socket connection open until it ends. Once no run has
+been connected for ``idle_timeout`` seconds, the daemon stops the browser
+and exits.
+
+Daemons started at the same time (e.g. by two runs with ``--browser-daemon
+start``) take a file lock before binding the socket: a daemon that finds
+another one answering exits, and only a socket nobody answers on is
+replaced. On exit, a daemon removes the socket only if it is still the one
+it bound.
+
+Usage:
+    python -m utils.browser_daemon start [--idle-timeout 900] [--headed]
+    python -m utils.browser_daemon status
+    python -m utils.browser_daemon stop
+"""
+
+import argparse
+import json
+import os
+import selectors
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Optional, Tuple
+
+from utils.browser_servers import LocalBrowserServer
+from utils.file_lock import FileLock
+
+DEFAULT_IDLE_TIMEOUT = 900
+
+
+def socket_path(browser_name: str = "chromium", headless: bool = True) -> str:
+    """Get the socket of the daemon for a browser, per user."""
+    user = os.getuid() if hasattr(os, "getuid") else os.getenv("USERNAME", "user")
+    mode = "headless" if headless else "headed"
+    return os.path.join(tempfile.gettempdir(), f"playwright-daemon-{user}-{browser_name}-{mode}.sock")
+
+
+class DaemonLease:
+    """A connection to a running daemon; the daemon stays up while it is open."""
+
+    def __init__(self, connection: socket.socket, info: dict, connect_seconds: float):
+        """Wrap an open connection and the daemon's answer to it."""
+        self._connection = connection
+        self.ws_endpoint: str = info["ws_endpoint"]
+        # How long the daemon took to start its browser, i.e. what a cold launch costs
+        self.cold_start_seconds: float = info["cold_start_seconds"]
+        self.pid: int = info["pid"]
+        self.connect_seconds = connect_seconds
+
+    def close(self) -> None:
+        """Let the daemon count idle time from now."""
+        self._connection.close()
+
+
+def connect(path: str, timeout: float = 2.0) -> Optional[DaemonLease]:
+    """Connect to the daemon at ``path``; returns None when none is running."""
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+        return None
+    started = time.perf_counter()
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.settimeout(timeout)
+    try:
+        connection.connect(path)
+        connection.sendall(b"hello\n")
+        info = json.loads(connection.makefile("r").readline())
+    except (OSError, ValueError):
+        # A socket left behind by a daemon that died
+        connection.close()
+        return None
+    connection.settimeout(None)
+    return DaemonLease(connection, info, time.perf_counter() - started)
+
+
+def spawn(
+    path: str, browser_name: str, headless: bool, idle_timeout: float, timeout: float = 60.0
+) -> Optional[DaemonLease]:
+    """Start a daemon in the background and connect to it."""
+    command = [
+        sys.executable, "-m", "utils.browser_daemon", "serve",
+        "--browser", browser_name, "--socket", path, "--idle-timeout", str(idle_timeout),
+    ]
+    if not headless:
+        command.append("--headed")
+    subprocess.Popen(
+        command,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        # Outlive the pytest run that started it
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        lease = connect(path)
+        if lease is not None:
+            return lease
+        time.sleep(0.1)
+    return None
+
+
+def serve(path: str, browser_name: str, headless: bool, idle_timeout: float) -> None:
+    """Run the daemon until it is stopped or idle for ``idle_timeout`` seconds."""
+    started = time.perf_counter()
+    server = LocalBrowserServer(browser_name, {"headless": headless}).start()
+    info = {
+        "ws_endpoint": server.ws_endpoint,
+        "cold_start_seconds": time.perf_counter() - started,
+        "pid": os.getpid(),
+    }
+    bound = _bind(path)
+    if bound is None:
+        # Another daemon answers on the socket; runs use that one
+        server.stop()
+        return
+    listener, identity = bound
+    selector = selectors.DefaultSelector()
+    selector.register(listener, selectors.EVENT_READ)
+    clients = 0
+    idle_since = time.monotonic()
+    try:
+        while server.is_running():
+            if not clients and time.monotonic() - idle_since > idle_timeout:
+                break
+            for key, _ in selector.select(timeout=1.0):
+                if key.fileobj is listener:
+                    connection, _ = listener.accept()
+                    selector.register(connection, selectors.EVENT_READ)
+                    clients += 1
+                    continue
+                connection = key.fileobj
+                command = connection.recv(64).strip()
+                if command == b"hello":
+                    connection.sendall(json.dumps(info).encode() + b"\n")
+                elif command == b"stop":
+                    return
+                else:
+                    # The run ended (or the client sent nothing we know)
+                    selector.unregister(connection)
+                    connection.close()
+                    clients -= 1
+                    if not clients:
+                        idle_since = time.monotonic()
+    finally:
+        listener.close()
+        with FileLock(path + ".lock"):
+            if _file_identity(path) == identity:
+                os.unlink(path)
+        server.stop()
+
+
+def _bind(path: str) -> Optional[Tuple[socket.socket, Tuple[int, int]]]:
+    """Listen on the socket unless another daemon answers there; returns the listener and the socket file's identity."""
+    with FileLock(path + ".lock"):
+        lease = connect(path)
+        if lease is not None:
+            lease.close()
+            return None
+        if os.path.exists(path):
+            # Left behind by a daemon that died
+            os.unlink(path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(path)
+        listener.listen()
+        return listener, _file_identity(path)
+
+
+def _file_identity(path: str) -> Optional[Tuple[int, int]]:
+    """Get the device and inode of a file, or None when it does not exist."""
+    try:
+        info = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return info.st_dev, info.st_ino
+
+
+def stop(path: str) -> bool:
+    """Ask the daemon at ``path`` to stop; returns whether one was running."""
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+        return False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            connection.connect(path)
+            connection.sendall(b"stop\n")
+        except OSError:
+            return False
+    return True
+
+
+def format_summary(lease: DaemonLease, connects: int, connect_seconds: float) -> str:
+    """Build the end-of-session report line of a run that used the daemon.
+
+    ``connects`` and ``connect_seconds`` are the browser connections of the
+    run (one per xdist worker); each would otherwise have launched a browser.
+    """
+    saved = connects * lease.cold_start_seconds - connect_seconds - lease.connect_seconds
+    return (
+        f"browser daemon (pid {lease.pid}): {connects} warm browser connections in "
+        f"{connect_seconds + lease.connect_seconds:.2f}s instead of cold launches of "
+        f"~{lease.cold_start_seconds:.2f}s each, ~{max(saved, 0):.1f}s of startup saved"
+    )
+
+
+def main():
+    """Start, stop or check the daemon."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("start", "stop", "status", "serve"))
+    parser.add_argument("--browser", default=os.getenv("BROWSER", "chromium"), help="browser to keep warm")
+    parser.add_argument("--headed", action="store_true", help="show the browser")
+    parser.add_argument(
+        "--idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT, help="seconds without a run before exiting"
+    )
+    parser.add_argument("--socket", help="socket path (defaults to one per user and browser)")
+    args = parser.parse_args()
+    path = args.socket or socket_path(args.browser, not args.headed)
+
+    if args.command == "serve":
+        serve(path, args.browser, not args.headed, args.idle_timeout)
+    elif args.command == "stop":
+        print("Stopped the browser daemon" if stop(path) else "No browser daemon is running")
+    else:
+        lease = connect(path)
+        if lease is None and args.command == "start":
+            lease = spawn(path, args.browser, not args.headed, args.idle_timeout)
+            if lease is None:
+                sys.exit("The browser daemon did not start")
+        if lease is None:
+            print("No browser daemon is running")
+        else:
+            print(f"Browser daemon (pid {lease.pid}) serves {lease.ws_endpoint} at {path}")
+            lease.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Worker-scoped browser pool.
+
+One Playwright driver and one browser are shared by all tests running in a
+process (one per pytest-xdist worker). Each test gets a fresh
+``BrowserContext``, and the browser is recycled after a number of contexts
+or once the browser processes grow past a memory limit.
+"""
+
+import os
+import time
+from typing import Any, Dict, Optional
+
+from playwright.sync_api import Browser, BrowserContext, Playwright
+
+from utils import session_stats
+
+try:
+    import psutil
+except ImportError:  # psutil is optional
+    psutil = None
+
+STATS_SECTION = "browser_pool"
+
+
+def _child_rss_bytes() -> Optional[int]:
+    """Get the resident memory of all processes spawned by this one.
+
+    That covers the Playwright driver and the browser processes it launched.
+    Returns None when the platform gives no way to measure it.
+    """
+    if psutil is not None:
+        children = psutil.Process().children(recursive=True)
+        total = 0
+        for child in children:
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+
+    if not os.path.isdir("/proc"):
+        return None
+
+    parents: Dict[int, int] = {}
+    rss: Dict[int, int] = {}
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as stat_file:
+                fields = stat_file.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        # Fields after the command name: state, ppid, ..., rss is field 24.
+        parents[int(entry)] = int(fields[1])
+        rss[int(entry)] = int(fields[21]) * page_size
+
+    root = os.getpid()
+    total = 0
+    for pid in rss:
+        ancestor = parents.get(pid)
+        while ancestor and ancestor != root:
+            ancestor = parents.get(ancestor)
+        if ancestor == root:
+            total += rss[pid]
+    return total
+
+
+class BrowserPool:
+    """Hands out fresh browser contexts from a shared, recyclable browser."""
+
+    def __init__(
+        self,
+        playwright: Playwright,
+        browser_name: str = "chromium",
+        launch_options: Optional[Dict[str, Any]] = None,
+        max_contexts: int = 0,
+        max_rss_mb: int = 0,
+    ):
+        """Configure the pool; the browser is launched on first use.
+
+        ``max_contexts`` and ``max_rss_mb`` of 0 disable the matching
+        recycling rule.
+        """
+        self.playwright = playwright
+        self.browser_type = getattr(playwright, browser_name)
+        self.launch_options = launch_options or {"headless": True}
+        self.max_contexts = max_contexts
+        self.max_rss_bytes = max_rss_mb * 1024 * 1024
+        self._browser: Optional[Browser] = None
+        self._shared_context: Optional[BrowserContext] = None
+        self._contexts_since_launch = 0
+
+    @property
+    def browser(self) -> Browser:
+        """Get the current browser, launching it if needed."""
+        if self._browser is None or not self._browser.is_connected():
+            self._launch()
+        return self._browser
+
+    def new_context(self, **context_args) -> BrowserContext:
+        """Create a fresh browser context from the current browser."""
+        if self._needs_recycle():
+            self.recycle()
+        context = self.browser.new_context(**context_args)
+        self._contexts_since_launch += 1
+        session_stats.add(STATS_SECTION, "contexts")
+        return context
+
+    def shared_context(self, **context_args) -> BrowserContext:
+        """Get the worker-wide context that is reused between tests.
+
+        It is created on first use and again after the browser is recycled.
+        """
+        if self._needs_recycle():
+            self.recycle()
+        if self._shared_context is None:
+            self._shared_context = self.browser.new_context(**context_args)
+            session_stats.add(STATS_SECTION, "contexts")
+        else:
+            session_stats.add(STATS_SECTION, "context_reuses")
+        self._contexts_since_launch += 1
+        return self._shared_context
+
+    def is_shared(self, context: BrowserContext) -> bool:
+        """Check whether a context is the worker-wide reused one."""
+        return context is self._shared_context
+
+    def recycle(self) -> None:
+        """Close the current browser so the next context gets a new one."""
+        if self._browser is not None:
+            session_stats.add(STATS_SECTION, "recycles")
+            self._close_browser()
+
+    def close(self) -> None:
+        """Close the browser owned by the pool."""
+        self._close_browser()
+
+    def _launch(self) -> None:
+        """Launch a new browser and record how long it took."""
+        started = time.perf_counter()
+        self._browser = self.browser_type.launch(**self.launch_options)
+        session_stats.add(STATS_SECTION, "launches")
+        session_stats.add(STATS_SECTION, "launch_seconds", time.perf_counter() - started)
+        self._contexts_since_launch = 0
+
+    def _close_browser(self) -> None:
+        """Close the browser, ignoring a browser that already went away."""
+        if self._browser is not None and self._browser.is_connected():
+            self._browser.close()
+        self._browser = None
+        self._shared_context = None
+
+    def _needs_recycle(self) -> bool:
+        """Check whether the current browser should be replaced."""
+        if self._browser is None:
+            return False
+        if self.max_contexts and self._contexts_since_launch >= self.max_contexts:
+            return True
+        if self.max_rss_bytes:
+            rss = _child_rss_bytes()
+            if rss is not None and rss > self.max_rss_bytes:
+                return True
+        return False
+
+
+def format_summary(stats: Dict[str, Any]) -> str:
+    """Build the end-of-session report line for the pool.
+
+    Time saved is estimated against launching a driver and a browser for
+    every context, which is what per-test fixtures used to do.
+    """
+    launches = stats.get("launches", 0)
+    contexts = stats.get("contexts", 0)
+    if not launches:
+        return "browser pool: no browser launched"
+    driver_starts = stats.get("driver_starts", 0)
+    driver_seconds = stats.get("driver_start_seconds", 0.0)
+    launch_seconds = stats.get("launch_seconds", 0.0)
+    per_context = launch_seconds / launches
+    if driver_starts:
+        per_context += driver_seconds / driver_starts
+    saved = contexts * per_context - (launch_seconds + driver_seconds)
+    return (
+        f"browser pool: {contexts} contexts served by {launches} browser launches "
+        f"({stats.get('recycles', 0)} recycles, {driver_starts} driver starts), "
+        f"avg launch {launch_seconds / launches:.2f}s, ~{max(saved, 0):.1f}s of startup saved"
+    )
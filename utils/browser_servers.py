@@ -0,0 +1,287 @@
+"""
+Browsers on remote Playwright browser servers.
+
+``RemoteBrowserPool`` is a drop-in for ``BrowserPool`` that connects to a
+list of browser servers (``BrowserType.connect``) instead of launching a
+local browser, so the browsers of a CI run can live on other machines:
+
+* each new context goes to the connected server with the fewest open
+  contexts,
+* connected servers are checked every ``check_seconds``; a server whose
+  connection drops or that stops accepting TCP connections is marked down
+  and the next contexts go to the others. It is reconnected once it
+  accepts connections again, tried at most every ``retry_seconds``,
+* contexts, peak concurrency, busy time and lost connections are counted
+  per server.
+
+``LocalBrowserServer`` starts a browser server on this machine with the
+Playwright CLI (``launch-server``), as a stand-in for a remote node.
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from playwright.sync_api import Browser, BrowserContext, Error, Playwright
+
+from utils import session_stats
+
+STATS_SECTION = "browser_servers"
+
+
+class LocalBrowserServer:
+    """A Playwright browser server started on localhost."""
+
+    def __init__(self, browser_name: str = "chromium", launch_options: Optional[Dict[str, Any]] = None):
+        """Configure the server; ``launch_options`` are passed to the browser (e.g. headless)."""
+        self.browser_name = browser_name
+        self.launch_options = launch_options or {"headless": True}
+        self.ws_endpoint = ""
+        self._process: Optional[subprocess.Popen] = None
+
+    def start(self) -> "LocalBrowserServer":
+        """Start the server and wait for its WebSocket endpoint."""
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as config_file:
+            json.dump({**self.launch_options, "port": 0, "host": "127.0.0.1"}, config_file)
+        # A file rather than a pipe, so browser logs cannot fill it up and block the server
+        errors = tempfile.TemporaryFile("w+")
+        try:
+            self._process = subprocess.Popen(
+                [sys.executable, "-m", "playwright", "launch-server",
+                 "--browser", self.browser_name, "--config", config_file.name],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=errors,
+                text=True,
+            )
+            # The CLI prints the endpoint once the browser is up
+            self.ws_endpoint = self._process.stdout.readline().strip()
+        finally:
+            os.unlink(config_file.name)
+        if not self.ws_endpoint.startswith("ws"):
+            self.stop()
+            errors.seek(0)
+            raise RuntimeError(f"Could not start a {self.browser_name} browser server: {errors.read().strip()}")
+        errors.close()
+        return self
+
+    def is_running(self) -> bool:
+        """Check whether the server process is still up."""
+        return self._process is not None and self._process.poll() is None
+
+    def stop(self) -> None:
+        """Stop the server and its browser."""
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+        self._process = None
+
+
+@dataclass
+class _Endpoint:
+    """A browser server and the pool's connection to it."""
+
+    url: str
+    browser: Optional[Browser] = None
+    # Open contexts and when they were created
+    active: Dict[BrowserContext, float] = field(default_factory=dict)
+    # When to try connecting again after the server was lost or unreachable
+    retry_at: float = 0.0
+    # When a connected server is next checked for reachability
+    check_at: float = 0.0
+
+
+class RemoteBrowserPool:
+    """Hands out browser contexts from the least loaded of several browser servers."""
+
+    def __init__(
+        self,
+        playwright: Playwright,
+        endpoints: List[str],
+        browser_name: str = "chromium",
+        connect_timeout_ms: float = 30000,
+        retry_seconds: float = 10,
+        check_seconds: float = 30,
+    ):
+        """Use the browser servers at ``endpoints`` (WebSocket URLs); servers are connected on first use."""
+        if not endpoints:
+            raise ValueError("RemoteBrowserPool needs at least one browser server endpoint")
+        self.browser_type = getattr(playwright, browser_name)
+        self.connect_timeout_ms = connect_timeout_ms
+        self.retry_seconds = retry_seconds
+        self.check_seconds = check_seconds
+        self._endpoints = [_Endpoint(url) for url in endpoints]
+        self._shared_context: Optional[BrowserContext] = None
+        self._closing = False
+
+    @property
+    def browser(self) -> Browser:
+        """Get the browser of the least loaded server, connecting to servers as needed."""
+        return self._pick().browser
+
+    def new_context(self, **context_args) -> BrowserContext:
+        """Create a browser context on the least loaded server."""
+        for _ in range(len(self._endpoints)):
+            endpoint = self._pick()
+            try:
+                context = endpoint.browser.new_context(**context_args)
+            except Error:
+                # The server went away between the health check and the call
+                self._mark_down(endpoint)
+                continue
+            self._track(endpoint, context)
+            return context
+        raise RuntimeError(f"No browser server could create a context: {self._describe()}")
+
+    def shared_context(self, **context_args) -> BrowserContext:
+        """Get the worker-wide context that is reused between tests."""
+        if self._shared_context is not None and self._shared_context.browser.is_connected():
+            session_stats.add("browser_pool", "context_reuses")
+        else:
+            self._shared_context = self.new_context(**context_args)
+        return self._shared_context
+
+    def is_shared(self, context: BrowserContext) -> bool:
+        """Check whether a context is the worker-wide reused one."""
+        return context is self._shared_context
+
+    def recycle(self) -> None:
+        """Drop the connections so the next contexts reconnect (the servers keep their browsers)."""
+        self._disconnect()
+
+    def close(self) -> None:
+        """Disconnect from every server."""
+        self._closing = True
+        self._disconnect()
+
+    def _pick(self) -> _Endpoint:
+        """Get a connected server with the fewest open contexts."""
+        now = time.monotonic()
+        for endpoint in self._endpoints:
+            if endpoint.browser is None:
+                if endpoint.retry_at <= now:
+                    self._connect(endpoint)
+            elif endpoint.check_at <= now:
+                # A dropped WebSocket disconnects the browser, but an unreachable host may not
+                if not endpoint.browser.is_connected() or not _accepts_connections(endpoint.url):
+                    _count(endpoint.url, "lost")
+                    self._mark_down(endpoint, failed=True)
+                else:
+                    endpoint.check_at = now + self.check_seconds
+        connected = [endpoint for endpoint in self._endpoints if endpoint.browser is not None]
+        if not connected:
+            raise RuntimeError(f"No browser server is reachable: {self._describe()}")
+        # Ties go to the server that served fewest contexts, so load spreads from the start
+        return min(connected, key=lambda endpoint: (len(endpoint.active), _stats(endpoint.url).get("contexts", 0)))
+
+    def _connect(self, endpoint: _Endpoint) -> None:
+        """Connect to a server if it is up; otherwise try again after retry_seconds."""
+        if not _accepts_connections(endpoint.url):
+            self._mark_down(endpoint, failed=True)
+            return
+        started = time.perf_counter()
+        try:
+            browser = self.browser_type.connect(endpoint.url, timeout=self.connect_timeout_ms)
+        except Error:
+            self._mark_down(endpoint, failed=True)
+            return
+        browser.on("disconnected", lambda _: self._lost(endpoint, browser))
+        endpoint.browser = browser
+        endpoint.check_at = time.monotonic() + self.check_seconds
+        _count(endpoint.url, "connects")
+        _count(endpoint.url, "connect_seconds", time.perf_counter() - started)
+
+    def _lost(self, endpoint: _Endpoint, browser: Browser) -> None:
+        """Mark a server down when its connection drops (not when the pool closes it)."""
+        if endpoint.browser is browser and not self._closing:
+            _count(endpoint.url, "lost")
+            self._mark_down(endpoint)
+
+    def _mark_down(self, endpoint: _Endpoint, failed: bool = False) -> None:
+        """Stop handing out a server's browser until it is checked again."""
+        if failed:
+            _count(endpoint.url, "failed_checks")
+        for context in list(endpoint.active):
+            self._untrack(endpoint, context)
+        endpoint.browser = None
+        endpoint.retry_at = time.monotonic() + self.retry_seconds
+
+    def _track(self, endpoint: _Endpoint, context: BrowserContext) -> None:
+        """Count a new context against its server until it closes."""
+        endpoint.active[context] = time.perf_counter()
+        context.on("close", lambda _: self._untrack(endpoint, context))
+        counters = _stats(endpoint.url)
+        counters["contexts"] = counters.get("contexts", 0) + 1
+        counters["peak_active"] = max(counters.get("peak_active", 0), len(endpoint.active))
+
+    def _untrack(self, endpoint: _Endpoint, context: BrowserContext) -> None:
+        """Stop counting a closed context and add its lifetime to the server's busy time."""
+        opened = endpoint.active.pop(context, None)
+        if opened is not None:
+            _count(endpoint.url, "busy_seconds", time.perf_counter() - opened)
+
+    def _disconnect(self) -> None:
+        """Close the connections to all servers."""
+        for endpoint in self._endpoints:
+            browser = endpoint.browser
+            for context in list(endpoint.active):
+                self._untrack(endpoint, context)
+            endpoint.browser = None
+            if browser is not None and browser.is_connected():
+                browser.close()
+        self._shared_context = None
+
+    def _describe(self) -> str:
+        """List the servers for an error message."""
+        return ", ".join(endpoint.url for endpoint in self._endpoints)
+
+
+def _accepts_connections(url: str, timeout: float = 2.0) -> bool:
+    """Check that a server accepts TCP connections before a full connect."""
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == "wss" else 80)
+    try:
+        with socket.create_connection((parts.hostname, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def _stats(url: str) -> Dict[str, Any]:
+    """Get the counters of a server."""
+    return session_stats.section(STATS_SECTION).setdefault(url, {})
+
+
+def _count(url: str, key: str, value: float = 1) -> None:
+    """Add to a counter of a server."""
+    counters = _stats(url)
+    counters[key] = counters.get(key, 0) + value
+
+
+def format_summary(stats: dict, wall_seconds: float) -> List[str]:
+    """Report how the contexts were spread over the servers.
+
+    Utilization is the time contexts were open on a server divided by the
+    run's wall time, so it can exceed 100% with several contexts at once.
+    The peak is the sum of each worker's peak.
+    """
+    lines = [f"{'browser server':<40}{'contexts':>9}{'peak':>6}{'busy s':>9}{'util':>7}{'connects':>10}{'lost':>6}"]
+    for url, server in sorted(stats.items()):
+        busy = server.get("busy_seconds", 0.0)
+        utilization = busy / wall_seconds if wall_seconds else 0.0
+        lines.append(
+            f"{url:<40}{server.get('contexts', 0):>9}{server.get('peak_active', 0):>6}{busy:>9.1f}"
+            f"{utilization:>7.0%}{server.get('connects', 0):>10}{server.get('lost', 0):>6}"
+        )
+    return lines
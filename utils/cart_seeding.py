@@ -0,0 +1,115 @@
+"""
+Cart seeding without going through the product pages.
+
+Carts are described declaratively as SKUs and quantities and built
+through the product pages (searching each product and adding it, which
+works against any deployment), through the app's cart API (using the
+browser context's own request context, so the session cookie is shared
+with the browser) or by injecting a client-side cart into localStorage.
+
+The cart API is not part of every deployment (the fake storefront has
+it); when it answers 404 the seeder switches to the product pages.
+"""
+
+import json
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from playwright.sync_api import BrowserContext
+
+from utils.state_reset import origin_of
+
+CartItemSpec = Union[str, Tuple[str, int], Dict[str, Union[str, int]]]
+
+SEED_MODES = ("ui", "api", "storage")
+
+# Stores the cart before any page script runs, on pages of the app origin
+_STORAGE_SCRIPT = """
+(([key, items, origin]) => {
+    if (window.location.origin === origin) {
+        window.localStorage.setItem(key, JSON.stringify(items));
+    }
+})(%s);
+"""
+
+
+def normalize_items(items: Iterable[CartItemSpec]) -> List[Dict[str, Union[str, int]]]:
+    """Turn "SKU", ("SKU", quantity) or {"sku", "quantity"} specs into dicts."""
+    normalized = []
+    for item in items:
+        if isinstance(item, str):
+            sku, quantity = item, 1
+        elif isinstance(item, dict):
+            sku, quantity = item["sku"], item.get("quantity", 1)
+        else:
+            sku, quantity = item
+        if int(quantity) < 1:
+            raise ValueError(f"Quantity for {sku} must be at least 1, got {quantity}")
+        normalized.append({"sku": sku, "quantity": int(quantity)})
+    return normalized
+
+
+def load_product_titles(path: str) -> Dict[str, str]:
+    """Map the SKUs of a product catalogue file to their titles."""
+    with open(path, encoding="utf-8") as products_file:
+        return {product["sku"]: product["title"] for product in json.load(products_file)}
+
+
+class CartSeeder:
+    """Builds cart state directly for a browser context."""
+
+    def __init__(
+        self,
+        context: BrowserContext,
+        base_url: str,
+        mode: str = "ui",
+        api_path: str = "/api/cart/items",
+        storage_key: str = "cart",
+        add_through_ui: Optional[Callable[[str, int], None]] = None,
+    ):
+        """Configure how the cart is seeded; ``add_through_ui(sku, quantity)`` adds an item on the product pages."""
+        if mode not in SEED_MODES:
+            raise ValueError(f"Unknown cart seed mode {mode!r}, expected one of {SEED_MODES}")
+        self.context = context
+        self.base_url = base_url.rstrip("/")
+        self.mode = mode
+        self.api_path = api_path
+        self.storage_key = storage_key
+        self.add_through_ui = add_through_ui
+
+    def seed(self, items: Iterable[CartItemSpec]) -> None:
+        """Put the given items into the cart."""
+        items = normalize_items(items)
+        if self.mode == "api":
+            items = self._seed_through_api(items)
+        if self.mode == "storage":
+            self._seed_through_storage(items)
+        elif items:
+            self._seed_through_ui(items)
+
+    def _seed_through_api(self, items: List[Dict[str, Union[str, int]]]) -> List[Dict[str, Union[str, int]]]:
+        """Add each item with a request that shares the context's cookies; returns the items left for the UI."""
+        url = f"{self.base_url}{self.api_path}"
+        for index, item in enumerate(items):
+            response = self.context.request.post(url, data=item)
+            if response.status == 404 and index == 0:
+                # No cart API on this deployment: use the product pages from now on
+                self.mode = "ui"
+                return items
+            if not response.ok:
+                raise RuntimeError(
+                    f"Seeding {item['sku']} through {url} failed: "
+                    f"{response.status} {response.text()[:200]}"
+                )
+        return []
+
+    def _seed_through_ui(self, items: List[Dict[str, Union[str, int]]]) -> None:
+        """Add each item on the product pages, as a user would."""
+        if self.add_through_ui is None:
+            raise RuntimeError("Seeding carts through the product pages needs add_through_ui")
+        for item in items:
+            self.add_through_ui(item["sku"], item["quantity"])
+
+    def _seed_through_storage(self, items: List[Dict[str, Union[str, int]]]) -> None:
+        """Inject the cart into localStorage before the app's scripts run."""
+        payload = json.dumps([self.storage_key, items, origin_of(self.base_url)])
+        self.context.add_init_script(_STORAGE_SCRIPT % payload)
@@ -0,0 +1,204 @@
+"""
+Saved checkpoints of multi-step setup flows.
+
+A checkpoint is the URL and storage state (cookies and localStorage) of a
+context at the end of a start state's navigation steps, for states
+declared with ``checkpoint=True``. It is saved to disk, keyed by:
+
+* the source of the state's navigation steps,
+* the source of the project modules they use (the page objects and their
+  base classes),
+* the build of the app (see utils/app_build.py),
+
+so editing a page object or deploying a new build invalidates it.
+Restoring it into a new context takes the storage and one navigation
+instead of the whole flow. When the state's ``check`` fails on the
+restored page (e.g. the server forgot the session), the flow is run again
+and the checkpoint replaced. A file lock makes sure only one pytest-xdist
+worker records a checkpoint.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import sys
+import sysconfig
+import time
+from types import CodeType
+from typing import Dict, Iterator, List, Optional
+
+from playwright.sync_api import Page
+
+from utils import session_stats
+from utils.file_lock import FileLock
+from utils.start_state_pool import StartState
+from utils.state_reset import restore_local_storage
+
+STATS_SECTION = "checkpoints"
+
+# Modules outside these directories belong to the project
+_LIBRARY_DIRS = tuple(
+    os.path.realpath(sysconfig.get_paths()[name]) for name in ("stdlib", "platstdlib", "purelib", "platlib")
+)
+
+
+class CheckpointCache:
+    """Records, stores and restores checkpoints of start states."""
+
+    def __init__(self, cache_dir: str, build: str, ttl_seconds: float = 1800):
+        """Keep checkpoints of the app ``build`` in ``cache_dir`` for ``ttl_seconds``."""
+        self.cache_dir = cache_dir
+        self.build = build
+        self.ttl_seconds = ttl_seconds
+        self._keys: Dict[str, str] = {}
+
+    def enter(self, page: Page, state: StartState) -> None:
+        """Bring the page of a new context into a start state, from its checkpoint if possible."""
+        key = self.key(state)
+        checkpoint = self._load(key)
+        if checkpoint is None:
+            with FileLock(self._path(key) + ".lock"):
+                # Another worker may have recorded it while we waited for the lock
+                checkpoint = self._load(key)
+                if checkpoint is None:
+                    self._record(page, state, key)
+                    return
+        if self._restore(page, state, checkpoint):
+            return
+        session_stats.add(STATS_SECTION, "stale")
+        page.context.clear_cookies()
+        # This tab already had the restore script run, so it will not put these back
+        page.evaluate("() => localStorage.clear()")
+        with FileLock(self._path(key) + ".lock"):
+            self._record(page, state, key)
+
+    def key(self, state: StartState) -> str:
+        """Get the cache key of a state's checkpoint."""
+        if state.name not in self._keys:
+            digest = hashlib.sha256(f"{state.name}\0{self.build}".encode())
+            for source in _flow_sources(state):
+                digest.update(b"\0" + source.encode())
+            self._keys[state.name] = f"{state.name}-{digest.hexdigest()[:16]}"
+        return self._keys[state.name]
+
+    def _record(self, page: Page, state: StartState, key: str) -> None:
+        """Run the state's flow, then save the checkpoint before the in-page steps."""
+        started = time.perf_counter()
+        page_object = state.page_class(page)
+        state.navigate(page_object)
+        checkpoint = {"url": page.url, "build": self.build, "storage_state": page.context.storage_state()}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+        os.replace(temp_path, self._path(key))
+        if state.fill is not None:
+            state.fill(page_object)
+        session_stats.add(STATS_SECTION, "recorded")
+        session_stats.add(STATS_SECTION, "record_seconds", time.perf_counter() - started)
+
+    def _restore(self, page: Page, state: StartState, checkpoint: dict) -> bool:
+        """Load a checkpoint into the page's context; returns whether the page passed the check."""
+        started = time.perf_counter()
+        storage_state = checkpoint["storage_state"]
+        if storage_state.get("cookies"):
+            page.context.add_cookies(storage_state["cookies"])
+        restore_local_storage(page.context, storage_state)
+        page_object = state.page_class(page)
+        page_object.wait_until_ready(lambda: page.goto(checkpoint["url"], wait_until="commit"))
+        if state.check is not None and not state.check(page_object):
+            return False
+        if state.fill is not None:
+            state.fill(page_object)
+        session_stats.add(STATS_SECTION, "restored")
+        session_stats.add(STATS_SECTION, "restore_seconds", time.perf_counter() - started)
+        return True
+
+    def _load(self, key: str) -> Optional[dict]:
+        """Load a saved checkpoint if it exists and has not expired."""
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                return None
+            with open(path) as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+        except (OSError, ValueError):
+            return None
+        now = time.time()
+        for cookie in checkpoint["storage_state"].get("cookies", []):
+            # Session cookies have expires == -1
+            if 0 < cookie.get("expires", -1) < now:
+                return None
+        return checkpoint
+
+    def _path(self, key: str) -> str:
+        """Get the path of the checkpoint for a cache key."""
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+
+def _source(func) -> str:
+    """Get the source of a function, or its bytecode when there is no source."""
+    try:
+        return inspect.getsource(func)
+    except (OSError, TypeError):
+        return func.__code__.co_code.hex()
+
+
+def _code_names(code: CodeType) -> Iterator[str]:
+    """Get the global names a code object and the functions defined in it use."""
+    yield from code.co_names
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            yield from _code_names(const)
+
+
+def _flow_sources(state: StartState) -> List[str]:
+    """Get the source of the state's navigation steps and of the project code they use.
+
+    Functions they call are followed, and page objects (with their base
+    classes) and other classes count with their whole module.
+    """
+    functions: Dict[str, str] = {}
+    modules = {cls.__module__ for cls in state.page_class.__mro__}
+    pending = [state.navigate]
+    while pending:
+        func = pending.pop()
+        name = f"{func.__module__}.{func.__qualname__}"
+        if name in functions or not _is_project_module(sys.modules.get(func.__module__)):
+            continue
+        functions[name] = _source(func)
+        for global_name in _code_names(func.__code__):
+            value = func.__globals__.get(global_name)
+            if inspect.isfunction(value):
+                pending.append(value)
+            elif inspect.ismodule(value):
+                modules.add(value.__name__)
+            elif inspect.isclass(value):
+                modules.add(value.__module__)
+    sources = [functions[name] for name in sorted(functions)]
+    for module_name in sorted(modules):
+        module = sys.modules.get(module_name)
+        if _is_project_module(module):
+            sources.append(inspect.getsource(module))
+    return sources
+
+
+def _is_project_module(module) -> bool:
+    """Check whether a module is part of the project rather than Python or a library."""
+    path = getattr(module, "__file__", None)
+    if not path:
+        return False
+    path = os.path.realpath(path)
+    return not any(path.startswith(library_dir + os.sep) for library_dir in _LIBRARY_DIRS)
+
+
+def format_summary(stats: dict) -> str:
+    """Build the end-of-session report line for the checkpoints."""
+    recorded = stats.get("recorded", 0)
+    restored = stats.get("restored", 0)
+    line = f"checkpoints: {recorded} recorded, {restored} restored, {stats.get('stale', 0)} stale"
+    if recorded and restored:
+        saved = restored * stats["record_seconds"] / recorded - stats["restore_seconds"]
+        line += f", ~{max(saved, 0):.1f}s of setup flows skipped"
+    return line
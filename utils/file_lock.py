@@ -0,0 +1,65 @@
+"""
+Minimal cross-process file lock.
+
+Used to let pytest-xdist workers share work that should only be done once
+per run. It relies on atomic exclusive file creation, so it works on any
+platform and file system without extra dependencies.
+"""
+
+import os
+import time
+
+
+class FileLock:
+    """Exclusive lock held while a lock file exists."""
+
+    def __init__(self, path: str, timeout: float = 60.0, stale_after: float = 300.0):
+        """Prepare a lock on ``path``.
+
+        A lock file older than ``stale_after`` seconds is assumed to belong
+        to a crashed process and is removed.
+        """
+        self.path = path
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self._fd = None
+
+    def acquire(self) -> None:
+        """Wait until the lock is free and take it."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                self._fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(self._fd, str(os.getpid()).encode())
+                return
+            except FileExistsError:
+                self._remove_if_stale()
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Timed out waiting for lock {self.path}")
+                time.sleep(0.05)
+
+    def release(self) -> None:
+        """Release the lock."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def _remove_if_stale(self) -> None:
+        """Remove a lock file left behind by a crashed process."""
+        try:
+            if time.time() - os.path.getmtime(self.path) > self.stale_after:
+                os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
@@ -0,0 +1,285 @@
+"""
+Failure-only traces kept in a bounded in-memory ring.
+
+While a test runs, a ``FlightRecorder`` keeps its most recent events in
+memory: page object calls, web errors and console errors, requests and
+responses, and (at the ``dom`` detail level) the page HTML after each page
+object step. Nothing is written while the test passes. When it fails
+(including attempts that a rerun plugin retries), the ring is written to
+a JSON trace next to a viewport screenshot and the HTML of the page at
+the time of the failure.
+
+Detail levels, from cheapest:
+
+* ``actions``: page object calls, navigations, web errors, console errors
+  and failed requests,
+* ``network``: also every request and response,
+* ``dom``: also the HTML of the page after every page object step of a
+  sync page object (one extra round trip per step).
+
+The ring holds at most ``max_bytes`` of event text; the oldest events are
+dropped first.
+"""
+
+import functools
+import inspect
+import json
+import os
+import re
+import reprlib
+import time
+from collections import deque
+from typing import Any, Callable, Deque, FrozenSet, List, Optional, Tuple
+
+from playwright.sync_api import BrowserContext, Error, Page
+
+from utils import method_hooks, session_stats
+
+STATS_SECTION = "flight_recorder"
+DETAILS = ("actions", "network", "dom")
+
+# Rough per-event overhead besides its text, so tiny events also count
+_EVENT_OVERHEAD = 64
+# Parameters whose values are never recorded
+_SECRET_PARAMETER = re.compile(r"pass(word)?|secret|token|cvv|card", re.IGNORECASE)
+
+_repr = reprlib.Repr()
+_repr.maxstring = 80
+_repr.maxother = 80
+
+# The recorder of the running test; page object calls are recorded there
+_current: Optional["FlightRecorder"] = None
+# Depth of the page object calls in progress, so only outer steps get a DOM snapshot
+_depth = 0
+
+
+class RingBuffer:
+    """Keeps the newest events whose total size stays within a byte budget."""
+
+    def __init__(self, max_bytes: int):
+        """Hold at most ``max_bytes`` of events."""
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.dropped = 0
+        self._events: Deque[Tuple[int, dict]] = deque()
+
+    def append(self, event: dict) -> None:
+        """Add an event, dropping the oldest ones to make room."""
+        size = _EVENT_OVERHEAD + sum(len(value) for value in event.values() if isinstance(value, str))
+        self._events.append((size, event))
+        self.size += size
+        while self.size > self.max_bytes and self._events:
+            dropped_size, _ = self._events.popleft()
+            self.size -= dropped_size
+            self.dropped += 1
+
+    def events(self) -> List[dict]:
+        """Get the events held, oldest first."""
+        return [event for _, event in self._events]
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+
+class FlightRecorder:
+    """Records the recent events of one test's browser context."""
+
+    def __init__(self, test_id: str, detail: str = "network", max_bytes: int = 1024 * 1024):
+        """Keep up to ``max_bytes`` of events at a detail level from DETAILS."""
+        if detail not in DETAILS:
+            raise ValueError(f"Unknown flight recorder detail {detail!r}, expected one of {DETAILS}")
+        self.test_id = test_id
+        self.detail = detail
+        self.ring = RingBuffer(max_bytes)
+        self.page: Optional[Page] = None
+        self._started = time.perf_counter()
+        self._listeners: List[Tuple[str, Callable]] = []
+
+    def start(self, page: Page) -> None:
+        """Start recording the page's context and the page object calls of the test."""
+        global _current
+        self.page = page
+        self._listen(page.context, "weberror", lambda error: self.record("weberror", error=str(error.error)))
+        self._listen(page.context, "console", self._on_console)
+        self._listen(page.context, "requestfailed", self._on_request_failed)
+        if self.detail != "actions":
+            self._listen(page.context, "request", self._on_request)
+            self._listen(page.context, "response", self._on_response)
+        _current = self
+
+    def stop(self) -> None:
+        """Stop recording; the events stay in the ring."""
+        global _current
+        if _current is self:
+            _current = None
+        for event, listener in self._listeners:
+            try:
+                self.page.context.remove_listener(event, listener)
+            except KeyError:
+                pass
+        self._listeners.clear()
+        session_stats.add(STATS_SECTION, "tests")
+        session_stats.add(STATS_SECTION, "dropped_events", self.ring.dropped)
+
+    def record(self, kind: str, **fields: Any) -> None:
+        """Add an event to the ring."""
+        self.ring.append({"t": round(time.perf_counter() - self._started, 4), "type": kind, **fields})
+
+    def dump(self, directory: str, outcome: str) -> str:
+        """Write the trace, a screenshot and the page HTML of a failed test; returns the folder."""
+        path = _unique_dir(os.path.join(directory, _safe_name(self.test_id)))
+        os.makedirs(path)
+        if self.page is not None and not self.page.is_closed():
+            try:
+                self.page.screenshot(path=os.path.join(path, "screenshot.png"), timeout=5000)
+                with open(os.path.join(path, "page.html"), "w") as html_file:
+                    html_file.write(self.page.content())
+            except Error:
+                # The page crashed or is stuck; the trace is still worth having
+                pass
+        trace = {
+            "test": self.test_id,
+            "outcome": outcome,
+            "url": self.page.url if self.page is not None else None,
+            "detail": self.detail,
+            "max_bytes": self.ring.max_bytes,
+            "dropped_events": self.ring.dropped,
+            "events": self.ring.events(),
+        }
+        with open(os.path.join(path, "trace.json"), "w") as trace_file:
+            json.dump(trace, trace_file, indent=1)
+        session_stats.add(STATS_SECTION, "dumps")
+        return path
+
+    def _listen(self, context: BrowserContext, event: str, listener: Callable) -> None:
+        """Subscribe to a context event until stop()."""
+        context.on(event, listener)
+        self._listeners.append((event, listener))
+
+    def _on_console(self, message) -> None:
+        """Record console errors and warnings (or every message at the network level and above)."""
+        if self.detail != "actions" or message.type in ("error", "warning"):
+            self.record("console", level=message.type, text=message.text)
+
+    def _on_request(self, request) -> None:
+        """Record a request."""
+        self.record("request", method=request.method, url=request.url, resource=request.resource_type)
+
+    def _on_response(self, response) -> None:
+        """Record a response."""
+        self.record("response", status=response.status, url=response.url)
+
+    def _on_request_failed(self, request) -> None:
+        """Record a request that got no response."""
+        self.record("requestfailed", method=request.method, url=request.url, failure=request.failure or "")
+
+    def _snapshot(self) -> None:
+        """Add the page HTML to the ring."""
+        if self.page is None or self.page.is_closed():
+            return
+        try:
+            html = self.page.content()
+        except Error:
+            return
+        # One snapshot may take at most a quarter of the ring, so it cannot push out everything else
+        limit = self.ring.max_bytes // 4
+        self.record("dom", url=self.page.url, html=html[:limit], truncated=len(html) > limit)
+
+
+def record_actions(*base_classes: type) -> int:
+    """Record the public method calls of page object classes (and their subclasses); returns how many are wrapped."""
+    return method_hooks.watch(base_classes, _record_call)
+
+
+def stop_recording_actions() -> None:
+    """Stop recording the method calls."""
+    method_hooks.unwatch(_record_call)
+
+
+@functools.lru_cache(maxsize=None)
+def _secret_arguments(func: Callable) -> FrozenSet[int]:
+    """Get the positions of a method's arguments (after self) whose values are never recorded."""
+    parameters = list(inspect.signature(func).parameters)[1:]
+    return frozenset(index for index, parameter in enumerate(parameters) if _SECRET_PARAMETER.search(parameter))
+
+
+def _record_call(page_object, name: str, func: Callable, args: tuple, kwargs: dict) -> Optional[Callable[[], None]]:
+    """Record a page object call in the current test's ring; returns what takes the DOM snapshot after it."""
+    global _depth
+    recorder = _current
+    if recorder is None:
+        return None
+    recorder.record(
+        "action", step=f"{type(page_object).__name__}.{name}", args=_describe(args, kwargs, _secret_arguments(func))
+    )
+    if inspect.iscoroutinefunction(func):
+        return None
+    _depth += 1
+
+    def finish() -> None:
+        global _depth
+        _depth -= 1
+        if _depth == 0 and recorder.detail == "dom":
+            recorder._snapshot()
+
+    return finish
+
+
+def _describe(args: tuple, kwargs: dict, secret: FrozenSet[int]) -> str:
+    """Describe the arguments of a call, hiding secrets (including values typed into secret fields)."""
+    shown = []
+    target = args[0] if args and isinstance(args[0], str) else _locator_selector(args[0]) if args else None
+    for index, value in enumerate(args):
+        hidden = index in secret or (
+            # fill(selector, text) and the like: hide what goes into a password field
+            index > 0 and target is not None and _SECRET_PARAMETER.search(target)
+        )
+        if hidden:
+            shown.append("***")
+        elif isinstance(value, dict):
+            # fill_form({selector: value}) and validation cases
+            masked = {key: "***" if _SECRET_PARAMETER.search(str(key)) else item for key, item in value.items()}
+            shown.append(_repr.repr(masked))
+        elif _locator_selector(value) is not None:
+            shown.append(f"locator({_repr.repr(_locator_selector(value))})")
+        else:
+            shown.append(_repr.repr(value))
+    for key, value in kwargs.items():
+        shown.append(f"{key}=***" if _SECRET_PARAMETER.search(key) else f"{key}={_repr.repr(value)}")
+    return ", ".join(shown)
+
+
+def _locator_selector(value: Any) -> Optional[str]:
+    """Get the selector of a Locator (sync or async), or None for anything else."""
+    if type(value).__name__ != "Locator":
+        return None
+    match = re.search(r"selector=(['\"])(.*)\1>$", repr(value))
+    return match.group(2) if match else ""
+
+
+def _safe_name(test_id: str) -> str:
+    """Turn a test id into a folder name."""
+    return re.sub(r"[^\w.\-\[\]]+", "_", test_id).strip("_")[:150]
+
+
+def _unique_dir(path: str) -> str:
+    """Get a folder path that does not exist yet, numbering retried attempts."""
+    candidate = path
+    attempt = 1
+    while os.path.exists(candidate):
+        attempt += 1
+        candidate = f"{path}-{attempt}"
+    return candidate
+
+
+def format_summary(stats: dict, directory: str) -> str:
+    """Build the end-of-session report line for the flight recorder."""
+    line = (
+        f"flight recorder: {stats.get('tests', 0)} tests recorded, "
+        f"{stats.get('dumps', 0)} failure traces written"
+    )
+    if stats.get("dumps"):
+        line += f" to {directory}"
+    if stats.get("dropped_events"):
+        line += f", {stats['dropped_events']} old events dropped to stay within the memory cap"
+    return line
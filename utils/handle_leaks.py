@@ -0,0 +1,77 @@
+"""
+Leak check for JS and element handles.
+
+A ``JSHandle`` or ``ElementHandle`` keeps its object alive in the browser
+until it is disposed or its document goes away, and every handle costs a
+round trip to create. The page objects act through Locators, which hold
+none, so a test should not leave handles behind.
+
+At teardown, the handles the Playwright client still holds for the test
+page's frames are counted and compared with the count when the page was
+handed to the test (parked and reused pages may bring some along). Handles
+of console message arguments belong to the page, not to a frame, and are
+not counted.
+
+Playwright has no public API for this, so the count walks the client's
+private object tree (``_impl_obj``, ``_objects``, ``_type``), as laid out
+in Playwright 1.40.0. Should a release change it, the count is unknown and
+the test is listed as unchecked instead of failing.
+"""
+
+from typing import List, Optional
+
+from playwright.sync_api import Page
+
+from utils import session_stats
+
+STATS_SECTION = "handle_leaks"
+# "report" lists the tests that leaked, "fail" also fails them, "off" skips the check
+MODES = ("report", "fail", "off")
+_HANDLE_TYPES = ("JSHandle", "ElementHandle")
+
+
+def count_live_handles(page: Page) -> Optional[int]:
+    """Count the handles the client holds in a page's frames and their handles; None when it cannot tell."""
+    if page.is_closed():
+        return 0
+    live = 0
+    try:
+        pending = [frame._impl_obj for frame in page.frames]
+        while pending:
+            channel_owner = pending.pop()
+            for child in channel_owner._objects.values():
+                if child._type in _HANDLE_TYPES:
+                    live += 1
+                pending.append(child)
+    except AttributeError:
+        return None
+    return live
+
+
+def check(page: Page, test_id: str, baseline: Optional[int]) -> int:
+    """Record how many handles a test left alive on its page; returns that number (0 when unknown)."""
+    live = count_live_handles(page)
+    if live is None or baseline is None:
+        session_stats.add(STATS_SECTION, "unknown")
+        return 0
+    leaked = max(live - baseline, 0)
+    session_stats.add(STATS_SECTION, "checked")
+    if leaked:
+        session_stats.section(STATS_SECTION).setdefault("tests", {})[test_id] = leaked
+    return leaked
+
+
+def format_summary(stats: dict, limit: int = 5) -> List[str]:
+    """Build the end-of-session report of the handle leak check."""
+    leaks = stats.get("tests", {})
+    # Tests whose handles could not be counted (see count_live_handles)
+    unknown = f", {stats['unknown']} unknown" if stats.get("unknown") else ""
+    if not leaks:
+        return [f"handle leaks: none in {stats.get('checked', 0)} tests{unknown}"]
+    lines = [
+        f"handle leaks: {len(leaks)} of {stats.get('checked', 0)} tests left "
+        f"{sum(leaks.values())} JS handles alive at teardown{unknown}"
+    ]
+    for test_id, leaked in sorted(leaks.items(), key=lambda item: -item[1])[:limit]:
+        lines.append(f"  {leaked:>4}  {test_id}")
+    return lines
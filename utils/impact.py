@@ -0,0 +1,291 @@
+"""
+Test impact analysis for page objects and tests.
+
+While recording, every call of a page object method adds to the running
+test's dependencies:
+
+* the method, as ``module:Class.method`` of the class that defines it,
+* the upper-case constants (locators, READY, FORM_FIELDS...) the method's
+  code reads, as ``module:Class.CONSTANT`` of the class that defines them
+  (for async page objects, the sync page object they share locators with).
+
+The dependencies of the tests that ran are merged into an index on disk,
+so partial runs keep it up to date.
+
+To select tests, the ``pages/`` and ``tests/`` files changed since a git
+revision are compared with their old version symbol by symbol (AST, so
+formatting and comments do not count). A test is affected when:
+
+* a method or constant it depends on changed,
+* code at module level (imports, scripts, helper functions) changed in a
+  page module it depends on, or in its own test module,
+* its own test function changed, or it is not in the index yet.
+
+Other changed files (conftest.py, utils/, fake_app/, fixtures/, the
+requirements...) are not analysed. Unless they are documentation, any of
+them can change what every test does, so then every test is selected.
+"""
+
+import ast
+import functools
+import inspect
+import json
+import os
+import subprocess
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from utils import method_hooks
+
+STATS_SECTION = "impact"
+# Symbol of a module's top-level code outside classes
+MODULE_CODE = "<module>"
+# Files whose symbols are compared
+ANALYSED_DIRS = ("pages", "tests")
+# Changed files that cannot change what a test does
+DOCUMENTATION_SUFFIXES = (".md", ".rst")
+DOCUMENTATION_FILES = ("LICENSE", ".gitignore")
+DOCUMENTATION_DIRS = ("docs",)
+
+_recording = False
+_current: Optional[Set[str]] = None
+# Test id -> dependencies recorded in this process
+_dependencies: Dict[str, Set[str]] = {}
+
+
+def set_current_test(test_id: str) -> None:
+    """Record the following page object calls as dependencies of a test (while recording)."""
+    global _current
+    if _recording:
+        _current = _dependencies.setdefault(test_id, set())
+
+
+def depend(symbol: str) -> None:
+    """Add a dependency to the running test (e.g. module code the wrapper cannot see)."""
+    if _current is not None:
+        _current.add(symbol)
+
+
+def record_dependencies(*base_classes: type) -> int:
+    """Record the public method calls of the page object classes and their subclasses; returns how many are wrapped."""
+    global _recording
+    _recording = True
+    return method_hooks.watch(base_classes, _record_call)
+
+
+def stop_recording() -> None:
+    """Stop recording the method calls."""
+    global _recording, _current
+    method_hooks.unwatch(_record_call)
+    _recording = False
+    _current = None
+
+
+def collect() -> dict:
+    """Move the recorded dependencies into a stats dictionary (see utils/session_stats.py)."""
+    tests = {test_id: sorted(symbols) for test_id, symbols in _dependencies.items()}
+    _dependencies.clear()
+    return {"tests": tests}
+
+
+def _constant_names(code) -> Set[str]:
+    """Get the upper-case names a code object (and the code defined in it) reads."""
+    names = {name for name in code.co_names if name.isupper()}
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _constant_names(const)
+    return names
+
+
+def _record_call(page_object, name: str, func: Callable, args: tuple, kwargs: dict) -> None:
+    """Add a called method and its constants to the running test."""
+    if _current is not None:
+        _current.update(_method_symbols(type(page_object), func))
+
+
+@functools.lru_cache(maxsize=None)
+def _method_symbols(page_class: type, func: Callable) -> FrozenSet[str]:
+    """Get the symbols of a method and of the constants it reads, which resolve per page class."""
+    method = f"{func.__module__}:{func.__qualname__}"
+    return frozenset({method, *_constant_symbols(page_class, _constant_names(func.__code__))})
+
+
+def _constant_symbols(page_class: type, names: Iterable[str]) -> Set[str]:
+    """Get the symbols of the classes that define the constants a page class reads."""
+    symbols = set()
+    # Async page objects get their locators copied from the sync page object
+    sources = [*getattr(page_class, "sync_page_class", object).__mro__, *page_class.__mro__]
+    for name in names:
+        for klass in sources:
+            if name in vars(klass) and klass is not object:
+                symbols.add(f"{klass.__module__}:{klass.__qualname__}.{name}")
+                break
+    return symbols
+
+
+def symbol_of_test(test_id: str) -> str:
+    """Get the symbol of a test function: ``tests.test_cart:TestCart.test_add`` for its node id."""
+    path, _, name = test_id.partition("::")
+    qualname = name.split("[", 1)[0].replace("::", ".")
+    return f"{module_name(path)}:{qualname}"
+
+
+def module_name(path: str) -> str:
+    """Turn a file path relative to the repository into a module name."""
+    return os.path.splitext(path)[0].replace("/", ".").replace(os.sep, ".")
+
+
+def source_symbols(source: str) -> Dict[str, str]:
+    """Map the symbols of a module's source to a dump of their AST.
+
+    Methods and class-level assignments are symbols of their own; anything
+    else at module or class level goes into the MODULE_CODE symbol.
+    """
+    symbols: Dict[str, str] = {}
+    module_code = []
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return {MODULE_CODE: source}
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            module_code.append(ast.dump(node))
+            continue
+        header = ast.ClassDef(
+            name=node.name, bases=node.bases, keywords=node.keywords, body=[], decorator_list=node.decorator_list
+        )
+        module_code.append(ast.dump(header))
+        for statement in node.body:
+            if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                symbols[f"{node.name}.{statement.name}"] = ast.dump(statement)
+            elif isinstance(statement, ast.Assign) and all(isinstance(t, ast.Name) for t in statement.targets):
+                for target in statement.targets:
+                    symbols[f"{node.name}.{target.id}"] = ast.dump(statement.value)
+            elif isinstance(statement, ast.AnnAssign) and isinstance(statement.target, ast.Name):
+                symbols[f"{node.name}.{statement.target.id}"] = ast.dump(statement)
+            elif not (isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Constant)):
+                # Anything but a docstring
+                module_code.append(ast.dump(statement))
+    symbols[MODULE_CODE] = "\n".join(module_code)
+    return symbols
+
+
+def _git(root: str, *args: str) -> str:
+    """Run a git command in the repository and return its output."""
+    return subprocess.run(
+        ["git", *args], cwd=root, capture_output=True, text=True, check=True
+    ).stdout
+
+
+def changed_symbols(root: str, revision: str) -> Tuple[Set[str], List[str]]:
+    """Compare pages/ and tests/ with a git revision.
+
+    Returns the changed symbols (added and removed ones included) and the
+    other changed files, which are not analysed.
+    """
+    try:
+        files = _git(root, "diff", "--name-only", revision, "--").split()
+    except subprocess.CalledProcessError as error:
+        raise ValueError(f"Cannot diff against {revision!r}: {error.stderr.strip()}")
+    changed: Set[str] = set()
+    others = []
+    for path in files:
+        if not path.endswith(".py") or path.split("/", 1)[0] not in ANALYSED_DIRS:
+            others.append(path)
+            continue
+        try:
+            old_source = _git(root, "show", f"{revision}:{path}")
+        except subprocess.CalledProcessError:
+            old_source = ""
+        try:
+            with open(os.path.join(root, path)) as source_file:
+                new_source = source_file.read()
+        except FileNotFoundError:
+            new_source = ""
+        old_symbols, new_symbols = source_symbols(old_source), source_symbols(new_source)
+        module = module_name(path)
+        for symbol in set(old_symbols) | set(new_symbols):
+            if old_symbols.get(symbol) != new_symbols.get(symbol):
+                changed.add(f"{module}:{symbol}")
+    return changed, others
+
+
+def behaviour_changes(paths: Iterable[str]) -> List[str]:
+    """Get the files among unanalysed changes that can change what tests do (all but documentation)."""
+    return [
+        path
+        for path in paths
+        if not path.endswith(DOCUMENTATION_SUFFIXES)
+        and os.path.basename(path) not in DOCUMENTATION_FILES
+        and path.split("/", 1)[0] not in DOCUMENTATION_DIRS
+    ]
+
+
+def is_affected(test_id: str, dependencies: Optional[Iterable[str]], changed: Set[str]) -> bool:
+    """Check whether a test must run after the changes, given the dependencies of its function."""
+    if dependencies is None:
+        # Never recorded
+        return True
+    symbol = symbol_of_test(test_id)
+    test_module = symbol.split(":", 1)[0]
+    if symbol in changed or f"{test_module}:{MODULE_CODE}" in changed:
+        return True
+    for dependency in dependencies:
+        if dependency in changed or f"{dependency.split(':', 1)[0]}:{MODULE_CODE}" in changed:
+            return True
+    return False
+
+
+class ImpactIndex:
+    """Dependencies of each test function, stored as one symbol table and symbol numbers per function.
+
+    Parametrized cases share their function's entry: a module-scoped
+    fixture runs its page object calls during the first case only.
+    """
+
+    def __init__(self, path: str):
+        """Load the index at ``path`` (an empty one if it does not exist)."""
+        self.path = path
+        self.tests: Dict[str, List[str]] = {}
+        try:
+            with open(path) as index_file:
+                data = json.load(index_file)
+        except (OSError, ValueError):
+            return
+        symbols = data["symbols"]
+        self.tests = {test: [symbols[number] for number in numbers] for test, numbers in data["tests"].items()}
+
+    def dependencies(self, test_id: str) -> Optional[List[str]]:
+        """Get the recorded dependencies of a test's function, or None."""
+        return self.tests.get(symbol_of_test(test_id))
+
+    def update(self, tests: Dict[str, Iterable[str]]) -> None:
+        """Replace the dependencies of the test functions that ran, from their node ids."""
+        ran: Dict[str, Set[str]] = {}
+        for test_id, symbols in tests.items():
+            ran.setdefault(symbol_of_test(test_id), set()).update(symbols)
+        for test, symbols in ran.items():
+            self.tests[test] = sorted(symbols)
+
+    def prune(self, root: str) -> None:
+        """Forget the tests of files that no longer exist."""
+        self.tests = {
+            test: symbols
+            for test, symbols in self.tests.items()
+            if os.path.exists(os.path.join(root, test.split(":", 1)[0].replace(".", os.sep) + ".py"))
+        }
+
+    def save(self) -> None:
+        """Write the index."""
+        symbols = sorted({symbol for test_symbols in self.tests.values() for symbol in test_symbols})
+        numbers = {symbol: number for number, symbol in enumerate(symbols)}
+        data = {
+            "symbols": symbols,
+            "tests": {
+                test: [numbers[symbol] for symbol in test_symbols] for test, test_symbols in sorted(self.tests.items())
+            },
+        }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as index_file:
+            json.dump(data, index_file, separators=(",", ":"))
+        os.replace(temp_path, self.path)
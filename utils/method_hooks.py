@@ -0,0 +1,102 @@
+"""
+One wrapper around the page object methods, shared by the tools that watch them.
+
+The timings (pages/instrumentation.py), the flight recorder
+(utils/flight_recorder.py) and the impact recording (utils/impact.py) each
+register a listener instead of wrapping the methods themselves. The public
+methods of the page object classes are wrapped once, when the first listener
+is added, and put back when the last one is removed, so nothing is wrapped
+while every tool is off and there are no layers to undo in order.
+
+A listener is called before each method call with the page object, the
+method name, the original function and the call's arguments. It may return
+a callable, which is called when the method returns or raises. Listeners
+are called in the order they were added and their callables in the reverse
+order, so the last listener added sits closest to the method.
+"""
+
+import functools
+import inspect
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# (page object, method name, function, args, kwargs) -> callable run when the method ends, or None
+Listener = Callable[[object, str, Callable, tuple, dict], Optional[Callable[[], None]]]
+
+_listeners: List[Listener] = []
+# (class, method name) -> original function, to undo the wrapping
+_originals: Dict[Tuple[type, str], Callable] = {}
+
+
+def watch(base_classes: Iterable[type], listener: Listener) -> int:
+    """Call a listener on the public method calls of the classes and their subclasses; returns how many are wrapped."""
+    if listener not in _listeners:
+        _listeners.append(listener)
+    for base_class in base_classes:
+        for cls in [base_class, *_subclasses(base_class)]:
+            for name, value in list(vars(cls).items()):
+                if name.startswith("_") or not inspect.isfunction(value) or (cls, name) in _originals:
+                    continue
+                _originals[(cls, name)] = value
+                setattr(cls, name, _wrap(name, value))
+    return len(_originals)
+
+
+def unwatch(listener: Listener) -> None:
+    """Stop calling a listener; the original methods are put back once no listener is left."""
+    if listener in _listeners:
+        _listeners.remove(listener)
+    if _listeners:
+        return
+    for (cls, name), func in _originals.items():
+        setattr(cls, name, func)
+    _originals.clear()
+
+
+def _subclasses(cls: type) -> List[type]:
+    """Get all subclasses of a class, recursively."""
+    found = []
+    for subclass in cls.__subclasses__():
+        found.append(subclass)
+        found.extend(_subclasses(subclass))
+    return found
+
+
+def _enter(page_object, name: str, func: Callable, args: tuple, kwargs: dict) -> List[Callable[[], None]]:
+    """Tell the listeners a method is called; returns what to call when it ends."""
+    finishers = []
+    for listener in _listeners:
+        finish = listener(page_object, name, func, args, kwargs)
+        if finish is not None:
+            finishers.append(finish)
+    return finishers
+
+
+def _exit(finishers: List[Callable[[], None]]) -> None:
+    """Tell the listeners a method ended."""
+    for finish in reversed(finishers):
+        finish()
+
+
+def _wrap(name: str, func: Callable) -> Callable:
+    """Wrap a sync or async method so the listeners see its calls."""
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def watched_async(self, *args, **kwargs):
+            finishers = _enter(self, name, func, args, kwargs)
+            try:
+                return await func(self, *args, **kwargs)
+            finally:
+                _exit(finishers)
+
+        return watched_async
+
+    @functools.wraps(func)
+    def watched(self, *args, **kwargs):
+        finishers = _enter(self, name, func, args, kwargs)
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            _exit(finishers)
+
+    return watched
@@ -0,0 +1,224 @@
+"""
+HAR record and replay of the application's network traffic.
+
+In record mode every test context writes a HAR through Playwright's built-in
+recorder, and the entries are merged into one HAR per test module (or per
+route, the first path segment of the request URL) under a file lock, so
+pytest-xdist workers can record together. Entries are tagged with the test
+that made them.
+
+In replay mode every request is answered from the recordings through
+``context.route``. The HAR entries are indexed by method, URL and a hash of
+the request body, so a lookup costs the same however large the recordings
+grow. A test first gets the responses it recorded itself, in recorded order,
+and otherwise those of any test; requests without a recording are aborted
+and reported at the end of the run.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from playwright.sync_api import BrowserContext, Route
+
+from utils import session_stats
+from utils.file_lock import FileLock
+
+MODES = ("live", "record", "replay")
+SCOPES = ("module", "route")
+STATS_SECTION = "network"
+
+# Headers about the body's wire encoding; the HAR stores the body decoded
+_SKIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+Key = Tuple[str, str, str]
+
+
+def request_key(method: str, url: str, body: Optional[bytes]) -> Key:
+    """Get the lookup key of a request: method, URL and body hash."""
+    return method.upper(), url, hashlib.sha1(body or b"").hexdigest()
+
+
+def _entry_key(entry: dict) -> Key:
+    """Get the lookup key of a HAR entry."""
+    request = entry["request"]
+    text = request.get("postData", {}).get("text")
+    return request_key(request["method"], request["url"], text.encode() if text is not None else None)
+
+
+def _har_name(scope: str, owner: str, url: str) -> str:
+    """Get the HAR file an entry belongs to."""
+    if scope == "module":
+        return owner
+    segment = urlsplit(url).path.strip("/").split("/", 1)[0]
+    return re.sub(r"[^\w.-]", "_", segment) or "root"
+
+
+def _fulfill_args(response: dict) -> dict:
+    """Turn a HAR response into ``route.fulfill`` arguments."""
+    headers: Dict[str, str] = {}
+    for header in response.get("headers", []):
+        name = header["name"].lower()
+        if name in _SKIPPED_HEADERS or name.startswith(":"):
+            continue
+        if name in headers:
+            # Playwright splits multiple Set-Cookie headers on newlines
+            separator = "\n" if name == "set-cookie" else ", "
+            headers[name] = f"{headers[name]}{separator}{header['value']}"
+        else:
+            headers[name] = header["value"]
+    content = response.get("content", {})
+    text = content.get("text", "")
+    body = base64.b64decode(text) if content.get("encoding") == "base64" else text.encode()
+    return {"status": response["status"], "headers": headers, "body": body}
+
+
+class HarRecorder:
+    """Records each test's traffic and merges it into the shared HAR files."""
+
+    def __init__(self, har_dir: str, scope: str = "module"):
+        """Record into ``har_dir/<scope>/``."""
+        self.har_dir = os.path.join(har_dir, scope)
+        self.scope = scope
+        self._temp_dir = tempfile.mkdtemp(prefix="har-")
+        self._pending: Dict[str, str] = {}
+
+    def context_args(self, test_id: str) -> dict:
+        """Get the context arguments that make Playwright record a HAR for a test."""
+        path = os.path.join(self._temp_dir, hashlib.sha1(test_id.encode()).hexdigest()[:16] + ".har")
+        self._pending[test_id] = path
+        return {"record_har_path": path, "record_har_content": "embed"}
+
+    def attach(self, context: BrowserContext, test_id: str, owner: str) -> None:
+        """Nothing to do; recording is set up through the context arguments."""
+
+    def finish(self, test_id: str, owner: str) -> None:
+        """Merge a test's HAR, written when its context closed, into the recordings."""
+        path = self._pending.pop(test_id)
+        with open(path) as har_file:
+            entries = json.load(har_file)["log"]["entries"]
+        os.remove(path)
+
+        by_file: Dict[str, List[dict]] = defaultdict(list)
+        for entry in entries:
+            entry["_test"] = test_id
+            by_file[_har_name(self.scope, owner, entry["request"]["url"])].append(entry)
+        for name, file_entries in by_file.items():
+            self._merge(os.path.join(self.har_dir, f"{name}.har"), test_id, file_entries)
+        session_stats.add(STATS_SECTION, "recorded", len(entries))
+
+    def _merge(self, path: str, test_id: str, entries: List[dict]) -> None:
+        """Replace a test's entries in a HAR file."""
+        with FileLock(path + ".lock"):
+            try:
+                with open(path) as har_file:
+                    har = json.load(har_file)
+            except FileNotFoundError:
+                har = {"log": {"version": "1.2", "creator": {"name": "pytest"}, "entries": []}}
+            har["log"]["entries"] = [
+                entry for entry in har["log"]["entries"] if entry.get("_test") != test_id
+            ] + entries
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as har_file:
+                json.dump(har, har_file)
+            os.replace(temp_path, path)
+
+    def close(self) -> None:
+        """Remove the directory Playwright wrote the tests' HARs to."""
+        shutil.rmtree(self._temp_dir, ignore_errors=True)
+
+
+class HarReplayer:
+    """Answers requests from the recorded HAR files."""
+
+    def __init__(self, har_dir: str, scope: str = "module"):
+        """Replay from ``har_dir/<scope>/``."""
+        self.har_dir = os.path.join(har_dir, scope)
+        self.scope = scope
+        # HAR file set -> key -> test id (None for any test) -> entries in recorded order
+        self._indexes: Dict[str, Dict[Key, Dict[Optional[str], List[dict]]]] = {}
+
+    def context_args(self, test_id: str) -> dict:
+        """No extra context arguments are needed to replay."""
+        return {}
+
+    def attach(self, context: BrowserContext, test_id: str, owner: str) -> None:
+        """Serve every request of a context from the recordings."""
+        index = self._index(owner)
+        served: Dict[Key, int] = defaultdict(int)
+
+        def handle(route: Route) -> None:
+            request = route.request
+            key = request_key(request.method, request.url, request.post_data_buffer)
+            recorded = index.get(key, {})
+            entries = recorded.get(test_id) or recorded.get(None)
+            if not entries:
+                session_stats.append(STATS_SECTION, "unmatched", f"{request.method} {request.url} ({test_id})")
+                route.abort()
+                return
+            # Repeated requests get the recorded responses in order, then the last one
+            entry = entries[min(served[key], len(entries) - 1)]
+            served[key] += 1
+            session_stats.add(STATS_SECTION, "replayed")
+            route.fulfill(**_fulfill_args(entry["response"]))
+
+        context.route("**/*", handle)
+
+    def finish(self, test_id: str, owner: str) -> None:
+        """Nothing to do after a replayed test."""
+
+    def close(self) -> None:
+        """Nothing to clean up after replaying."""
+
+    def _index(self, owner: str) -> Dict[Key, Dict[Optional[str], List[dict]]]:
+        """Get the index of the HAR files a test module replays from, building it once."""
+        names = self._har_names(owner)
+        cache_key = "\0".join(names)
+        if cache_key not in self._indexes:
+            index: Dict[Key, Dict[Optional[str], List[dict]]] = {}
+            for name in names:
+                for entry in self._load(os.path.join(self.har_dir, f"{name}.har")):
+                    if entry["response"].get("status", 0) <= 0:
+                        continue  # Aborted or failed requests
+                    recorded = index.setdefault(_entry_key(entry), {})
+                    recorded.setdefault(entry.get("_test"), []).append(entry)
+                    recorded.setdefault(None, []).append(entry)
+            self._indexes[cache_key] = index
+        return self._indexes[cache_key]
+
+    def _har_names(self, owner: str) -> List[str]:
+        """Get the HAR files a test module replays from: its own, or every route's."""
+        if self.scope == "module":
+            return [owner]
+        if not os.path.isdir(self.har_dir):
+            return []
+        return sorted(name[: -len(".har")] for name in os.listdir(self.har_dir) if name.endswith(".har"))
+
+    def _load(self, path: str) -> List[dict]:
+        """Load the entries of a HAR file, if it exists."""
+        try:
+            with open(path) as har_file:
+                return json.load(har_file)["log"]["entries"]
+        except FileNotFoundError:
+            return []
+
+
+def format_summary(stats: dict) -> List[str]:
+    """Summarize the record and replay stats."""
+    lines = []
+    if stats.get("recorded"):
+        lines.append(f"network: {stats['recorded']} requests recorded")
+    if "replayed" in stats or "unmatched" in stats:
+        unmatched = stats.get("unmatched", [])
+        lines.append(f"network: {stats.get('replayed', 0)} responses replayed, {len(unmatched)} unmatched requests")
+        lines.extend(f"  unmatched: {request}" for request in unmatched[:20])
+        if len(unmatched) > 20:
+            lines.append(f"  ... and {len(unmatched) - 20} more")
+    return lines
@@ -0,0 +1,158 @@
+"""
+Declarative blocking of resources the tests never look at.
+
+A policy is a sequence of rules, each blocking, stubbing or allowing requests
+by resource type and URL glob; the first matching rule wins and requests no
+rule matches are allowed. The global rules live in conftest.py, and page
+objects put their own rules in front of them with ``RESOURCE_POLICY`` (e.g.
+the product listing drops product images). The rules of the page object that
+navigated last apply.
+
+Blocked requests are never downloaded, so their size is estimated from the
+Content-Length seen for the same URL in runs where resources were allowed.
+"""
+
+import base64
+import fnmatch
+import weakref
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Optional, Sequence, Tuple
+
+from playwright.sync_api import Page, Response, Route
+
+ACTIONS = ("block", "stub", "allow")
+STATS_SECTION = "resources"
+
+# Smallest valid GIF, served for stubbed images
+_EMPTY_GIF = base64.b64decode("R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7")
+_STUBS = {
+    "image": ("image/gif", _EMPTY_GIF),
+    "script": ("application/javascript", b""),
+    "stylesheet": ("text/css", b""),
+}
+
+# Rules of the page object that navigated each page last
+_page_rules: "weakref.WeakKeyDictionary[Page, tuple]" = weakref.WeakKeyDictionary()
+
+
+@dataclass(frozen=True)
+class Rule:
+    """What to do with requests of some resource types and URLs."""
+
+    action: str
+    resource_types: FrozenSet[str] = frozenset()
+    url: Optional[str] = None
+
+    def __post_init__(self):
+        if self.action not in ACTIONS:
+            raise ValueError(f"Unknown resource action {self.action!r}, expected one of {ACTIONS}")
+
+    def matches(self, resource_type: str, url: str) -> bool:
+        """Check whether the rule applies to a request."""
+        return (not self.resource_types or resource_type in self.resource_types) and (
+            self.url is None or fnmatch.fnmatchcase(url, self.url)
+        )
+
+
+def block(*resource_types: str, url: Optional[str] = None) -> Rule:
+    """Abort matching requests."""
+    return Rule("block", frozenset(resource_types), url)
+
+
+def stub(*resource_types: str, url: Optional[str] = None) -> Rule:
+    """Answer matching requests with an empty response of the right type."""
+    return Rule("stub", frozenset(resource_types), url)
+
+
+def allow(*resource_types: str, url: Optional[str] = None) -> Rule:
+    """Let matching requests through, e.g. as an exception to a later rule."""
+    return Rule("allow", frozenset(resource_types), url)
+
+
+def decide(rules: Sequence[Rule], resource_type: str, url: str) -> str:
+    """Get the action of the first rule matching a request."""
+    for rule in rules:
+        if rule.matches(resource_type, url):
+            return rule.action
+    return "allow"
+
+
+def use_page_rules(page, rules: Sequence[Rule]) -> None:
+    """Make a page object's rules apply to a page (called when it navigates)."""
+    _page_rules[page] = tuple(rules)
+
+
+class ResourcePolicy:
+    """Applies the global rules, and those of the current page object, to pages."""
+
+    def __init__(self, rules: Sequence[Rule], sizes: Optional[Dict[str, int]] = None):
+        """Use ``rules`` everywhere; ``sizes`` maps URLs to known response sizes."""
+        self.rules = tuple(rules)
+        self.sizes = sizes or {}
+
+    def install(self, page: Page) -> Dict[str, int]:
+        """Route a page's requests through the policy.
+
+        Returns the page's counters of avoided requests and bytes, updated
+        as the page loads.
+        """
+        handle, avoided = self.handler(page)
+        page.route("**/*", handle)
+        return avoided
+
+    def handler(self, page=None) -> Tuple[Callable, Dict[str, int]]:
+        """Get a route handler applying the policy, and its counters of avoided requests and bytes.
+
+        Without ``page``, the page object rules are those of the page that
+        sent each request, so the handler can be routed on a whole context.
+        The handler returns the route call, which the async API awaits.
+        """
+        avoided = {"requests": 0, "bytes": 0, "unsized": 0}
+
+        def handle(route: Route):
+            request = route.request
+            sender = page if page is not None else request.frame.page
+            action = decide(_page_rules.get(sender, ()) + self.rules, request.resource_type, request.url)
+            if action == "allow":
+                return route.fallback()
+            avoided["requests"] += 1
+            size = self.sizes.get(request.url)
+            if size is None:
+                avoided["unsized"] += 1
+            else:
+                avoided["bytes"] += size
+            if action == "block":
+                return route.abort("blockedbyclient")
+            content_type, body = _STUBS.get(request.resource_type, ("text/plain", b""))
+            return route.fulfill(status=200, content_type=content_type, body=body)
+
+        return handle, avoided
+
+
+def learn_sizes(page: Page, sizes: Dict[str, int]) -> None:
+    """Note the Content-Length of every response a page (or a whole context) receives."""
+
+    def on_response(response: Response) -> None:
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            sizes[response.url] = int(length)
+
+    page.on("response", on_response)
+
+
+def format_summary(stats: dict, limit: int = 10) -> list:
+    """Summarize the avoided requests, per test with the largest savings first."""
+    tests = stats.get("tests", {})
+    requests = sum(test["requests"] for test in tests.values())
+    total_bytes = sum(test["bytes"] for test in tests.values())
+    unsized = sum(test["unsized"] for test in tests.values())
+    lines = [
+        f"{requests} requests avoided in {len(tests)} tests, "
+        f"{total_bytes / 1024:.0f} KiB known ({unsized} of unknown size)"
+    ]
+    ranked = sorted(tests.items(), key=lambda item: (item[1]["bytes"], item[1]["requests"]), reverse=True)
+    for test_id, test in ranked[:limit]:
+        lines.append(f"  {test_id}: {test['requests']} requests, {test['bytes'] / 1024:.0f} KiB")
+    if len(ranked) > limit:
+        lines.append(f"  ... and {len(ranked) - limit} more tests")
+    return lines
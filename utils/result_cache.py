@@ -0,0 +1,139 @@
+"""
+Cached passes of unchanged tests.
+
+A test that passed is not run again while nothing it depends on changed.
+Its result key combines:
+
+* the build of the app under test (see utils/app_build.py),
+* the test's own function and the module-level code of its test module
+  (AST, so formatting and comments do not count; see utils/impact.py),
+* the source of every other project module loaded when the tests are
+  collected (conftest.py, page objects, the utils behind the fixtures, the
+  fake storefront) and the files of the test data directory, so any change
+  outside the test modules runs every test again,
+* the run settings that change what a test does (app URL, browser,
+  network mode, state reset, cart seeding, resource policy, start states,
+  checkpoints, browser servers).
+
+On a hit the test gets a skip marker at collection, so it is reported as a
+cached pass without setting up any fixture and no browser is launched for it. A pass is reused for at most
+``max_age_seconds``; any other outcome removes it. Entries live in the
+pytest cache, one per test, so xdist workers never write the same file.
+"""
+
+import hashlib
+import inspect
+import os
+import sys
+import time
+from typing import Optional
+
+from utils import session_stats
+from utils.app_build import UNKNOWN_BUILD
+from utils.checkpoints import _is_project_module
+from utils.impact import MODULE_CODE, source_symbols
+
+STATS_SECTION = "result_cache"
+CACHE_PREFIX = "result_cache/"
+
+
+class ResultCache:
+    """Stores the result keys of passed tests and recognizes unchanged ones."""
+
+    def __init__(self, cache, build: str, settings: str, data_dir: str, max_age_seconds: float = 86400):
+        """Keep passes in the pytest ``cache`` for the app ``build``, run ``settings`` and test data."""
+        self.cache = cache
+        self.build = build
+        self.settings = settings
+        self.data_dir = data_dir
+        self.max_age_seconds = max_age_seconds
+        self._project_hash: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether results can be cached; not when a deploy cannot be told apart."""
+        return self.build != UNKNOWN_BUILD
+
+    def key(self, item) -> Optional[str]:
+        """Get the result key of a test, or None when it cannot be cached."""
+        function = getattr(item, "function", None)
+        module = getattr(item, "module", None)
+        if not self.enabled or function is None or module is None:
+            return None
+        try:
+            test_symbols = source_symbols(inspect.getsource(module))
+        except (OSError, TypeError):
+            return None
+        qualname = function.__qualname__
+        digest = hashlib.sha256(
+            "\0".join(
+                (
+                    item.nodeid,
+                    self.build,
+                    self.settings,
+                    self.project_hash(),
+                    test_symbols.get(MODULE_CODE, ""),
+                    test_symbols.get(qualname, ""),
+                )
+            ).encode()
+        )
+        return digest.hexdigest()
+
+    def project_hash(self) -> str:
+        """Hash the loaded project modules other than test modules, and the test data files."""
+        if self._project_hash is None:
+            paths = {
+                os.path.realpath(module.__file__)
+                for module in list(sys.modules.values())
+                if _is_project_module(module) and not os.path.basename(module.__file__).startswith("test_")
+            }
+            if os.path.isdir(self.data_dir):
+                paths.update(os.path.join(self.data_dir, name) for name in os.listdir(self.data_dir))
+            digest = hashlib.sha256()
+            for path in sorted(paths):
+                digest.update(f"{path}\0{_file_hash(path)}\0".encode())
+            self._project_hash = digest.hexdigest()
+        return self._project_hash
+
+    def hit(self, nodeid: str, key: str) -> bool:
+        """Check whether a test passed with the same key recently enough."""
+        entry = self.cache.get(_cache_key(nodeid), None)
+        if not entry or entry.get("key") != key or time.time() - entry["passed_at"] > self.max_age_seconds:
+            session_stats.add(STATS_SECTION, "misses")
+            return False
+        session_stats.add(STATS_SECTION, "hits")
+        session_stats.add(STATS_SECTION, "saved_seconds", entry.get("seconds", 0.0))
+        return True
+
+    def store(self, nodeid: str, key: str, seconds: float) -> None:
+        """Remember that a test passed."""
+        self.cache.set(_cache_key(nodeid), {"key": key, "passed_at": time.time(), "seconds": seconds})
+        session_stats.add(STATS_SECTION, "stored")
+
+    def forget(self, nodeid: str) -> None:
+        """Drop the cached pass of a test that did not pass."""
+        if self.cache.get(_cache_key(nodeid), None):
+            self.cache.set(_cache_key(nodeid), None)
+
+
+def _cache_key(nodeid: str) -> str:
+    """Get the pytest cache key of a test's entry."""
+    return CACHE_PREFIX + hashlib.sha256(nodeid.encode()).hexdigest()[:24]
+
+
+def _file_hash(path: str) -> str:
+    """Hash a file's content, or return "" when there is none."""
+    try:
+        with open(path, "rb") as source_file:
+            return hashlib.sha256(source_file.read()).hexdigest()
+    except OSError:
+        return ""
+
+
+def format_summary(stats: dict, build: str) -> str:
+    """Build the end-of-session report line for the result cache."""
+    return (
+        f"result cache (build {build}): {stats.get('hits', 0)} cached passes, "
+        f"{stats.get('misses', 0)} tests run, {stats.get('stored', 0)} passes stored, "
+        f"~{stats.get('saved_seconds', 0.0):.1f}s of test time skipped"
+    )
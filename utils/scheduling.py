@@ -0,0 +1,155 @@
+"""
+Duration-aware scheduling of tests over pytest-xdist workers.
+
+Every run records how long each test took (setup, call and teardown) in the
+pytest cache, smoothed over runs. With ``-n``, ``LptScheduling`` hands out
+tests longest first: each worker is kept two tests ahead and takes the
+longest remaining test whenever it finishes one, which is the longest
+processing time (LPT) heuristic, applied as the run goes so that wrong
+estimates are absorbed.
+
+Tests without history are estimated from their markers, relative to the
+median of the known durations. The xdist controller does not collect tests,
+so workers write those marker estimates to a file the scheduler reads.
+"""
+
+import heapq
+import json
+import os
+import statistics
+import time
+from typing import Dict, Iterable, List, Optional
+
+from xdist.scheduler import LoadScheduling
+
+CACHE_KEY = "scheduling/durations"
+# Weight of the latest run in the smoothed duration
+SMOOTHING = 0.5
+# Assumed duration of a test when nothing has been recorded yet
+DEFAULT_SECONDS = 5.0
+# Duration of a test without history, relative to a typical test, by marker
+MARKER_FACTORS = {"slow": 5.0, "smoke": 0.5}
+
+
+def marker_factor(marker_names: Iterable[str]) -> float:
+    """Get how much longer than a typical test a test with these markers is expected to take."""
+    factors = [MARKER_FACTORS[name] for name in marker_names if name in MARKER_FACTORS]
+    return max(factors) if factors else 1.0
+
+
+def lpt_makespan(durations: Iterable[float], workers: int) -> float:
+    """Get the makespan of assigning the durations longest first to the least loaded worker."""
+    loads = [0.0] * max(1, workers)
+    for duration in sorted(durations, reverse=True):
+        heapq.heappush(loads, heapq.heappop(loads) + duration)
+    return max(loads)
+
+
+class DurationStore:
+    """Test durations of earlier runs, kept in the pytest cache."""
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.history: Dict[str, float] = cache.get(CACHE_KEY, {}) if cache is not None else {}
+        self.current: Dict[str, float] = {}
+        self.by_worker: Dict[str, float] = {}
+
+    def add(self, test_id: str, seconds: float, worker: str = "main") -> None:
+        """Add the duration of a test phase in this run."""
+        self.current[test_id] = self.current.get(test_id, 0.0) + seconds
+        self.by_worker[worker] = self.by_worker.get(worker, 0.0) + seconds
+
+    def estimate(self, test_ids: List[str], factors: Dict[str, float]) -> List[float]:
+        """Estimate test durations from history, or from marker factors."""
+        typical = statistics.median(self.history.values()) if self.history else DEFAULT_SECONDS
+        return [
+            self.history[test_id] if test_id in self.history else typical * factors.get(test_id, 1.0)
+            for test_id in test_ids
+        ]
+
+    def save(self) -> None:
+        """Merge this run's durations into the history."""
+        if self.cache is None or not self.current:
+            return
+        for test_id, seconds in self.current.items():
+            previous = self.history.get(test_id)
+            self.history[test_id] = (
+                seconds if previous is None else SMOOTHING * seconds + (1 - SMOOTHING) * previous
+            )
+        self.cache.set(CACHE_KEY, self.history)
+
+
+def write_marker_factors(directory: str, worker_id: str, factors: Dict[str, float]) -> None:
+    """Save a worker's marker estimates for the scheduler."""
+    path = os.path.join(directory, f"{worker_id}.json")
+    with open(f"{path}.tmp", "w") as factors_file:
+        json.dump(factors, factors_file)
+    os.replace(f"{path}.tmp", path)
+
+
+def read_marker_factors(directory: str) -> Dict[str, float]:
+    """Load the marker estimates written by the workers."""
+    factors: Dict[str, float] = {}
+    for name in os.listdir(directory):
+        if name.endswith(".json"):
+            with open(os.path.join(directory, name)) as factors_file:
+                factors.update(json.load(factors_file))
+    return factors
+
+
+class LptScheduling(LoadScheduling):
+    """Load scheduling that hands out the longest tests first."""
+
+    def __init__(self, config, log=None, store: Optional[DurationStore] = None, factors_dir: str = ""):
+        super().__init__(config, log)
+        self.store = store or DurationStore(None)
+        self.factors_dir = factors_dir
+        self.estimates: List[float] = []
+        self.from_history = 0
+        self.predicted_makespan: Optional[float] = None
+        self.started: Optional[float] = None
+
+    def schedule(self) -> None:
+        """Order the pending tests longest first, then start two on each worker."""
+        assert self.collection_is_completed
+        if self.collection is not None:
+            for node in self.nodes:
+                self.check_schedule(node)
+            return
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+
+        self.collection = next(iter(self.node2collection.values()))
+        factors = read_marker_factors(self.factors_dir) if self.factors_dir else {}
+        self.estimates = self.store.estimate(self.collection, factors)
+        self.from_history = sum(test_id in self.store.history for test_id in self.collection)
+        self.started = time.monotonic()
+        self.predicted_makespan = lpt_makespan(self.estimates, len(self.nodes))
+        self.pending[:] = sorted(range(len(self.collection)), key=lambda index: -self.estimates[index])
+        for node in self.nodes:
+            self.check_schedule(node)
+
+    def check_schedule(self, node, duration: float = 0) -> None:
+        """Keep a worker two tests ahead, so it always gets the longest remaining test next."""
+        if node.shutting_down:
+            return
+        if self.pending:
+            # A worker only starts a test once it knows the one after it
+            missing = 2 - len(self.node2pending[node])
+            if missing > 0:
+                self._send_tests(node, missing)
+        else:
+            node.shutdown()
+
+
+def format_summary(scheduler: LptScheduling) -> List[str]:
+    """Compare the predicted makespan with what the run took."""
+    busiest = max(scheduler.store.by_worker.values(), default=0.0)
+    wall = time.monotonic() - scheduler.started
+    return [
+        f"predicted makespan {scheduler.predicted_makespan:.1f}s, actual {busiest:.1f}s "
+        f"(busiest worker), {wall:.1f}s wall",
+        f"{scheduler.from_history}/{len(scheduler.collection)} tests estimated from history, "
+        f"the rest from markers",
+    ]
@@ -0,0 +1,56 @@
+"""
+Run-wide statistics collected by the fixtures and reported at session end.
+
+Stats are plain nested dictionaries so they can travel from pytest-xdist
+workers to the controller through ``workeroutput``. Numbers are summed,
+lists are concatenated and dictionaries are merged recursively.
+"""
+
+from typing import Any, Dict
+
+_stats: Dict[str, Any] = {}
+
+
+def section(name: str) -> Dict[str, Any]:
+    """Return the (mutable) stats dictionary for a section."""
+    return _stats.setdefault(name, {})
+
+
+def add(name: str, key: str, value: float = 1) -> None:
+    """Add a value to a numeric counter."""
+    stats = section(name)
+    stats[key] = stats.get(key, 0) + value
+
+
+def append(name: str, key: str, item: Any) -> None:
+    """Append an item to a list entry."""
+    section(name).setdefault(key, []).append(item)
+
+
+def snapshot() -> Dict[str, Any]:
+    """Get a copy of all collected stats."""
+    return _merge({}, _stats)
+
+
+def merge(other: Dict[str, Any]) -> None:
+    """Merge stats received from another process into this one."""
+    _merge(_stats, other)
+
+
+def reset() -> None:
+    """Forget all collected stats."""
+    _stats.clear()
+
+
+def _merge(target: Dict[str, Any], source: Dict[str, Any]) -> Dict[str, Any]:
+    """Recursively merge ``source`` into ``target``."""
+    for key, value in source.items():
+        if isinstance(value, dict):
+            _merge(target.setdefault(key, {}), value)
+        elif isinstance(value, list):
+            target.setdefault(key, []).extend(value)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            target[key] = target.get(key, 0) + value
+        else:
+            target[key] = value
+    return target
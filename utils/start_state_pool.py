@@ -0,0 +1,190 @@
+"""
+Warm pages parked in the states tests start from.
+
+Tests that declare the same start state (``@pytest.mark.start_state``)
+share one context per worker, parked on a page that is already in that
+state. The first test of a state builds it from scratch and the checkpoint
+is taken: the page URL and the context storage. Every later test gets the
+same page back after a reset to that checkpoint: cookies and storage are
+cleared and restored, the page returns to the checkpoint URL (warm HTTP
+cache, open connections) and the in-page steps of the state, such as
+filling a form, are redone.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from playwright.sync_api import BrowserContext, Error, Page
+
+from utils import session_stats
+from utils.browser_pool import BrowserPool
+from utils.state_reset import (
+    clear_context_state,
+    mark_local_storage_restored,
+    origin_of,
+    restore_local_storage,
+)
+
+STATS_SECTION = "start_states"
+
+
+@dataclass(frozen=True)
+class StartState:
+    """A named point tests start from: a page object and the steps that reach it."""
+
+    name: str
+    page_class: type
+    # Steps that end on the state's URL, so going back to that URL restores them
+    navigate: Callable[[Any], None]
+    # Steps that only change the page (e.g. filling a form), redone after every reset
+    fill: Optional[Callable[[Any], None]] = None
+    # Save the state after the navigation steps to disk (see utils/checkpoints.py)
+    checkpoint: bool = False
+    # Whether a page restored from a checkpoint really is in this state
+    check: Optional[Callable[[Any], bool]] = None
+
+    def setup(self, page: Page) -> None:
+        """Bring a page into this state from scratch."""
+        page_object = self.page_class(page)
+        self.navigate(page_object)
+        if self.fill is not None:
+            self.fill(page_object)
+
+    def restore(self, page: Page, url: str) -> None:
+        """Bring a page back into this state from its checkpoint URL."""
+        page_object = self.page_class(page)
+        page_object.wait_until_ready(lambda: page.goto(url, wait_until="commit"))
+        if self.fill is not None:
+            self.fill(page_object)
+
+
+@dataclass
+class _Parked:
+    """A context parked in a start state, and its checkpoint."""
+
+    context: BrowserContext
+    page: Page
+    url: str
+    cookies: List[dict]
+    dirty: bool = False
+
+
+class StartStatePool:
+    """Keeps one warm page per start state and hands it to the tests of that state."""
+
+    def __init__(
+        self,
+        browser_pool: BrowserPool,
+        context_args: Dict[str, Any],
+        prepare: Optional[Callable[[Page, str], None]] = None,
+        setup: Optional[Callable[[Page, StartState], None]] = None,
+    ):
+        """Park contexts from ``browser_pool``.
+
+        ``prepare(page, name)`` runs on each new parked page, then
+        ``setup(page, state)`` brings it into the state (default:
+        ``state.setup(page)``).
+        """
+        self.browser_pool = browser_pool
+        self.context_args = context_args
+        self.prepare = prepare
+        self.setup = setup
+        self._parked: Dict[str, _Parked] = {}
+
+    def context(self, state: StartState) -> BrowserContext:
+        """Get the context parked in a state, building it if needed."""
+        parked = self._parked.get(state.name)
+        if parked is None or not parked.context.browser.is_connected():
+            parked = self._build(state)
+        return parked.context
+
+    def checkout(self, state: StartState) -> Page:
+        """Get the page parked in a state, reset to the checkpoint if a test used it."""
+        parked = self._parked.get(state.name)
+        if parked is None or not parked.context.browser.is_connected():
+            parked = self._build(state)
+        elif parked.dirty:
+            try:
+                self._reset(state, parked)
+            except Error:
+                # The last test left the page unusable; start over
+                parked = self._build(state)
+        parked.dirty = True
+        _count(state.name, "tests")
+        return parked.page
+
+    def close(self) -> None:
+        """Close the parked contexts."""
+        for name in list(self._parked):
+            self._discard(name)
+
+    def _build(self, state: StartState) -> _Parked:
+        """Build a state in a new context and take its checkpoint."""
+        self._discard(state.name)
+        started = time.perf_counter()
+        context = self.browser_pool.new_context(**self.context_args)
+        page = context.new_page()
+        if self.prepare is not None:
+            self.prepare(page, state.name)
+        if self.setup is not None:
+            self.setup(page, state)
+        else:
+            state.setup(page)
+        storage = context.storage_state()
+        if restore_local_storage(context, storage):
+            # The page already has this storage; only documents after a reset need it
+            mark_local_storage_restored(page)
+        parked = _Parked(context, page, page.url, storage["cookies"])
+        self._parked[state.name] = parked
+        _count(state.name, "builds")
+        _count(state.name, "build_seconds", time.perf_counter() - started)
+        return parked
+
+    def _reset(self, state: StartState, parked: _Parked) -> None:
+        """Bring a used parked page back to its checkpoint."""
+        started = time.perf_counter()
+        for open_page in parked.context.pages:
+            if open_page is not parked.page:
+                open_page.close()
+        clear_context_state(parked.context, [origin_of(parked.url)])
+        if parked.cookies:
+            parked.context.add_cookies(parked.cookies)
+        state.restore(parked.page, parked.url)
+        _count(state.name, "resets")
+        _count(state.name, "reset_seconds", time.perf_counter() - started)
+
+    def _discard(self, name: str) -> None:
+        """Close a parked context, ignoring one whose browser went away."""
+        parked = self._parked.pop(name, None)
+        if parked is not None and parked.context.browser.is_connected():
+            parked.context.close()
+
+
+def _count(name: str, key: str, value: float = 1) -> None:
+    """Add to a counter of a start state."""
+    counters = session_stats.section(STATS_SECTION).setdefault(name, {})
+    counters[key] = counters.get(key, 0) + value
+
+
+def format_summary(stats: dict) -> List[str]:
+    """Report how much setup the start states shared.
+
+    Time saved is estimated against building the state for every test,
+    using the average time of the builds.
+    """
+    lines = [f"{'start state':<24}{'tests':>7}{'builds':>8}{'build s':>9}{'reset s':>9}{'saved s':>9}"]
+    total_saved = 0.0
+    for name, state in sorted(stats.items()):
+        builds = state.get("builds", 0)
+        resets = state.get("resets", 0)
+        build_seconds = state.get("build_seconds", 0.0) / builds if builds else 0.0
+        reset_seconds = state.get("reset_seconds", 0.0) / resets if resets else 0.0
+        saved = resets * (build_seconds - reset_seconds)
+        total_saved += saved
+        lines.append(
+            f"{name:<24}{state.get('tests', 0):>7}{builds:>8}{build_seconds:>9.2f}"
+            f"{reset_seconds:>9.2f}{saved:>9.1f}"
+        )
+    lines.append(f"~{max(total_saved, 0):.1f}s of setup shared (build and reset times are averages)")
+    return lines
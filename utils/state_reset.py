@@ -0,0 +1,133 @@
+"""
+Application state reset strategies.
+
+Tests start from a clean slate without loading the home page first:
+
+* ``context``  - every test gets a fresh browser context (the default).
+* ``storage``  - a worker-wide context is reused and its cookies,
+  localStorage, sessionStorage and IndexedDB are cleared after each test.
+* ``navigate`` - the previous behaviour: a fresh context plus a load of the
+  home page before the test.
+
+A test picks its strategy with ``@pytest.mark.reset("storage")``.
+"""
+
+import json
+from typing import Iterable
+from urllib.parse import urlsplit
+
+from playwright.sync_api import BrowserContext, Error, Page
+
+from utils import session_stats
+
+STRATEGIES = ("context", "storage", "navigate")
+STATS_SECTION = "state_reset"
+
+# Clears the storage of the page's origin; sessionStorage is per tab but the
+# page may be reused by the next test before it is closed.
+_CLEAR_STORAGE_SCRIPT = """
+async () => {
+    window.localStorage.clear();
+    window.sessionStorage.clear();
+    if (window.indexedDB && indexedDB.databases) {
+        const databases = await indexedDB.databases();
+        await Promise.all(databases.map(db => new Promise(resolve => {
+            const request = indexedDB.deleteDatabase(db.name);
+            request.onsuccess = request.onerror = request.onblocked = resolve;
+        })));
+    }
+}
+"""
+
+# Puts saved localStorage entries back before the first script of a tab's
+# first document, and again once clear_context_state cleared the tab's
+# sessionStorage, without overwriting what the app stores afterwards
+_RESTORE_LOCAL_STORAGE_SCRIPT = """
+(origins => {
+    if (sessionStorage.getItem("__localStorageRestored")) return;
+    sessionStorage.setItem("__localStorageRestored", "1");
+    for (const { name, value } of origins[location.origin] || []) localStorage.setItem(name, value);
+})(%s);
+"""
+
+
+def origin_of(url: str) -> str:
+    """Get the origin (scheme://host:port) of a URL, or "" for non-HTTP URLs."""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        return ""
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def clear_context_state(context: BrowserContext, origins: Iterable[str] = ()) -> None:
+    """Clear cookies and web storage of a context without navigating.
+
+    Storage is cleared through each open page first. On Chromium the
+    DevTools ``Storage.clearDataForOrigin`` command is also used for the
+    given origins, which covers origins no page is showing any more.
+    """
+    all_origins = set(filter(None, origins))
+    for page in context.pages:
+        origin = origin_of(page.url)
+        if origin:
+            all_origins.add(origin)
+            _clear_page_storage(page)
+
+    if context.pages and all_origins:
+        try:
+            cdp = context.new_cdp_session(context.pages[0])
+        except Error:
+            cdp = None  # Not a Chromium browser
+        if cdp is not None:
+            for origin in all_origins:
+                cdp.send(
+                    "Storage.clearDataForOrigin",
+                    {"origin": origin, "storageTypes": "all"},
+                )
+            cdp.detach()
+
+    context.clear_cookies()
+    context.clear_permissions()
+    session_stats.add(STATS_SECTION, "storage_clears")
+
+
+def navigation_avoided() -> None:
+    """Count a test that started without loading the home page first."""
+    session_stats.add(STATS_SECTION, "navigations_avoided")
+
+
+def _clear_page_storage(page: Page) -> None:
+    """Clear the storage of the origin a page is showing."""
+    try:
+        page.evaluate(_CLEAR_STORAGE_SCRIPT)
+    except Error:
+        # The page may be closed or navigating; CDP clearing still applies
+        pass
+
+
+def restore_local_storage(context: BrowserContext, storage_state: dict) -> bool:
+    """Put the localStorage of a saved storage state back in the context's tabs.
+
+    Returns whether the state had any localStorage to restore.
+    """
+    origins = {
+        entry["origin"]: entry["localStorage"]
+        for entry in storage_state.get("origins", [])
+        if entry.get("localStorage")
+    }
+    if origins:
+        context.add_init_script(_RESTORE_LOCAL_STORAGE_SCRIPT % json.dumps(origins))
+    return bool(origins)
+
+
+def mark_local_storage_restored(page: Page) -> None:
+    """Tell the restore script that a page already has the saved localStorage."""
+    page.evaluate("() => sessionStorage.setItem('__localStorageRestored', '1')")
+
+
+def format_summary(stats: dict, context_reuses: int) -> str:
+    """Build the end-of-session report line of the state resets."""
+    return (
+        f"state reset: {stats.get('navigations_avoided', 0)} home-page navigations avoided, "
+        f"{context_reuses} context reuses, {stats.get('storage_clears', 0)} storage clears"
+    )